@@ -0,0 +1,211 @@
+"""Persistent response cache for the Raspberry Pi Information Screen.
+
+   Screens can use the cache so that, after a restart, they can show the
+   last data they received straight away rather than waiting for (or
+   failing to get) a fresh copy from the web.
+
+   Entries are stored as JSON files in the "cache" folder, keyed by any
+   string (usually the url of the request). Each entry records when it was
+   stored so the caller can decide whether it's fresh enough. Files are
+   written atomically so a crash can't leave a half written entry, and the
+   least recently used entries are deleted once the folder grows beyond
+   MAX_SIZE bytes.
+
+   Most screens will want cached_fetch which combines the cache with the
+   background fetch service:
+
+       from core.cache import cached_fetch
+
+       self.job = cached_fetch(url, self.loadData, ttl=30 * 60,
+                               on_result=self.drawData)
+
+   If there is a cached value then drawData is called with it immediately.
+   If that value is older than ttl (or there isn't one), loadData is run in
+   the background and drawData is called again with the new value.
+"""
+import hashlib
+import json
+import os
+import time
+from threading import Lock, get_ident
+
+from kivy.logger import Logger
+
+from core.fetch import fetch
+
+# Folder where the cache files are kept
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(
+                         os.path.abspath(__file__))), "cache")
+
+# Maximum total size of the cache files (bytes)
+MAX_SIZE = 10 * 1024 * 1024
+
+
+class ResponseCache(object):
+    """Simple key-value store on disk. Safe to use from several threads."""
+    def __init__(self, path=CACHE_DIR, max_size=MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.lock = Lock()
+
+    def filename(self, key):
+        """Returns the name of the file used for the key."""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, "{}.json".format(digest))
+
+    def get(self, key):
+        """Returns a tuple of (value, age in seconds) for the key or None if
+           the key isn't in the cache.
+        """
+        fname = self.filename(key)
+
+        try:
+            with open(fname, "r") as cfile:
+                entry = json.load(cfile)
+        except (IOError, OSError, ValueError):
+            return None
+
+        # Two keys could (in theory) share a file
+        if entry.get("key") != key:
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(fname, None)
+        except OSError:
+            pass
+
+        return entry["value"], time.time() - entry["stored"]
+
+    def set(self, key, value):
+        """Stores the value (which must be JSON serialisable) in the cache."""
+        fname = self.filename(key)
+
+        # Several threads (e.g. fetch workers) may store the same key at
+        # once so each one needs its own temporary file.
+        tmp = "{}.{}.{}.tmp".format(fname, os.getpid(), get_ident())
+        entry = {"key": key, "stored": time.time(), "value": value}
+
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+
+            # Write to a temporary file first so readers never see a partial
+            # entry.
+            with open(tmp, "w") as cfile:
+                json.dump(entry, cfile)
+            os.replace(tmp, fname)
+
+        except (IOError, OSError, TypeError, ValueError) as e:
+            Logger.warning("Cache: unable to store {}: {!r}".format(key, e))
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        self.evict()
+
+    def delete(self, key):
+        """Removes the key from the cache."""
+        try:
+            os.remove(self.filename(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache is no
+           bigger than max_size.
+        """
+        with self.lock:
+            entries = []
+            total = 0
+
+            try:
+                names = os.listdir(self.path)
+            except OSError:
+                return
+
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                fname = os.path.join(self.path, name)
+                try:
+                    st = os.stat(fname)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, fname))
+                total += st.st_size
+
+            # Oldest first
+            entries.sort()
+
+            while total > self.max_size and entries:
+                _, size, fname = entries.pop(0)
+                try:
+                    os.remove(fname)
+                except OSError:
+                    pass
+                total -= size
+
+
+# The shared cache is created the first time it's needed.
+_cache = None
+_cache_lock = Lock()
+
+
+def get_cache():
+    """Returns the shared ResponseCache instance."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+
+    return _cache
+
+
+def cached_fetch(key, func, *args, ttl=3600, max_age=None, on_result=None,
+                 on_error=None, **kwargs):
+    """Returns cached data for the key straight away and refreshes it in the
+       background if it's older than ttl seconds.
+
+       on_result is called with the cached value (if there is one) before
+       this function returns, and again with the new value once func has
+       run. A result of None is passed on but not stored.
+
+       Cached values older than max_age seconds (if set) are too old to be
+       shown at all.
+
+       Returns the FetchJob for the refresh, or None if the cached value was
+       fresh enough.
+    """
+    cached = get_cache().get(key)
+
+    if cached is not None and max_age is not None and cached[1] > max_age:
+        cached = None
+
+    if cached is not None:
+        value, age = cached
+        if on_result is not None:
+            on_result(value)
+        if age < ttl:
+            return None
+
+    return refresh(key, func, *args, on_result=on_result, on_error=on_error,
+                   **kwargs)
+
+
+def refresh(key, func, *args, on_result=None, on_error=None, **kwargs):
+    """Runs func in the background and stores the result in the cache
+       (unless it's None) before passing it to on_result.
+
+       Returns the FetchJob.
+    """
+    def load():
+        value = func(*args, **kwargs)
+        if value is not None:
+            get_cache().set(key, value)
+        return value
+
+    return fetch(load, on_result=on_result, on_error=on_error)
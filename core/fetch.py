@@ -0,0 +1,148 @@
+"""Background fetch service for the Raspberry Pi Information Screen.
+
+   Screens must not do network I/O on the Kivy main thread: one slow upstream
+   would otherwise freeze touch input and animations for every screen.
+
+   Instead, a screen hands a fetch job (any callable) to the shared
+   FetchService. The job runs on a small, bounded thread pool and its result
+   is passed back to the UI thread with Clock.schedule_once.
+
+   Typical usage from a screen:
+
+       from core.fetch import fetch
+
+       def on_enter(self):
+           self.job = fetch(self.loadData, on_result=self.drawData)
+
+       def on_leave(self):
+           self.job.cancel()
+
+   The job function runs in a worker thread so it must not touch any
+   widgets. The on_result and on_error callbacks are always run on the main
+   thread.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+# Number of worker threads shared by all screens. Most jobs are waiting on
+# the network so we don't need many, but we do want a bound so a burst of
+# screens doesn't start dozens of threads on a Pi.
+MAX_WORKERS = 4
+
+
+class FetchJob(object):
+    """Handle for a job submitted to the FetchService.
+
+       Screens should keep a reference to the job so they can cancel it
+       (e.g. in on_leave).
+    """
+    def __init__(self, func, args, kwargs, on_result=None, on_error=None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+        self.done = False
+
+    def __repr__(self):
+        name = getattr(self.func, "__qualname__", repr(self.func))
+        return "<FetchJob {} (active={})>".format(name, self.active)
+
+    @property
+    def active(self):
+        """True if the job is queued or running and hasn't been cancelled."""
+        return not (self.cancelled or self.done)
+
+    def cancel(self):
+        """Cancels the job.
+
+           A job that's still queued won't run at all. A running job can't be
+           interrupted but its result is discarded so no callback is fired.
+        """
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def run(self):
+        """Runs the job. Called from a worker thread."""
+        if self.cancelled:
+            return
+
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            Clock.schedule_once(partial(self.deliver_error, e), 0)
+        else:
+            Clock.schedule_once(partial(self.deliver, result), 0)
+
+    def deliver(self, result, *args):
+        """Passes the result to the callback. Called on the main thread."""
+        self.done = True
+        if not self.cancelled and self.on_result is not None:
+            self.on_result(result)
+
+    def deliver_error(self, error, *args):
+        """Passes the exception to the error callback (or logs it if there
+           isn't one). Called on the main thread.
+        """
+        self.done = True
+        if self.cancelled:
+            return
+
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            Logger.error("Fetch: {} failed: {!r}".format(self, error))
+
+
+class FetchService(object):
+    """Runs fetch jobs on a bounded thread pool."""
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="fetch")
+
+    def submit(self, func, *args, on_result=None, on_error=None, **kwargs):
+        """Queues func(*args, **kwargs) to be run in the background.
+
+           on_result: called on the main thread with the return value.
+           on_error:  called on the main thread with the exception if the
+                      job raised one.
+
+           Returns a FetchJob which can be used to cancel the job.
+        """
+        job = FetchJob(func, args, kwargs,
+                       on_result=on_result,
+                       on_error=on_error)
+        job.future = self.executor.submit(job.run)
+        return job
+
+    def shutdown(self):
+        """Stops the service. Queued jobs are dropped."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# The shared service is created the first time it's needed.
+_service = None
+_service_lock = Lock()
+
+
+def get_fetch_service():
+    """Returns the shared FetchService instance."""
+    global _service
+
+    with _service_lock:
+        if _service is None:
+            _service = FetchService()
+
+    return _service
+
+
+def fetch(func, *args, **kwargs):
+    """Shortcut for get_fetch_service().submit(...)."""
+    return get_fetch_service().submit(func, *args, **kwargs)
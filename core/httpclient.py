@@ -0,0 +1,220 @@
+"""Shared HTTP client for the Raspberry Pi Information Screen.
+
+   Opening a new TCP (and TLS) connection for every poll is slow and costly
+   on a Pi, particularly over Wi-Fi. All screens should therefore make their
+   web requests through this module rather than calling requests directly.
+
+   The client:
+
+     - keeps one requests.Session per host so connections are kept alive and
+       reused between polls;
+     - limits the number of connections open to each host;
+     - remembers the ETag/Last-Modified headers of GET responses and sends
+       them back so that unchanged resources come back as a 304 (the cached
+       response is then returned to the caller as normal);
+     - applies a default timeout to every request; and
+     - retries failed requests with a jittered exponential backoff. Only
+       GET, HEAD and OPTIONS requests are retried unless the caller asks
+       for retries (a POST may have been acted on even if it timed out).
+
+   Typical usage:
+
+       from core.httpclient import http_get
+
+       r = http_get(url)
+       if r.status_code == 200:
+           data = r.json()
+
+   Requests block, so they should be made from a worker thread (see
+   core.fetch).
+"""
+import random
+import time
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from kivy.logger import Logger
+
+# Default (connect, read) timeout in seconds
+TIMEOUT = (5, 10)
+
+# Number of times to retry a failed request (so a request can be attempted
+# RETRIES + 1 times in total)
+RETRIES = 2
+
+# Backoff before the first retry (seconds). This doubles for each retry and
+# a random jitter of up to the same amount again is added.
+BACKOFF = 0.5
+
+# Maximum number of connections kept open to a single host
+MAX_PER_HOST = 2
+
+# Responses with these status codes are worth trying again
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Requests which are safe to repeat, so are retried by default
+IDEMPOTENT = ("GET", "HEAD", "OPTIONS")
+
+# Maximum number of responses to keep for conditional requests
+MAX_VALIDATORS = 100
+
+# The user agent sent with every request
+USER_AGENT = "RPi-InfoScreen-Kivy"
+
+
+class HTTPClient(object):
+    """Pooled HTTP client. Safe to use from several threads at once."""
+    def __init__(self, timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF,
+                 max_per_host=MAX_PER_HOST):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_per_host = max_per_host
+
+        # Sessions are keyed by (scheme, host)
+        self.sessions = {}
+
+        # Last good response for each url with a validator, keyed by url
+        self.validators = {}
+
+        self.lock = Lock()
+
+    def get_session(self, url):
+        """Returns the session for the url's host, creating it if needed."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+
+        with self.lock:
+            session = self.sessions.get(key)
+
+            if session is None:
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+
+                # pool_block means that threads will wait for a connection
+                # rather than opening more than max_per_host to the host.
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.max_per_host,
+                                      pool_block=True)
+                session.mount("{}://".format(parts.scheme), adapter)
+                self.sessions[key] = session
+
+        return session
+
+    def get_validator(self, url):
+        with self.lock:
+            return self.validators.get(url)
+
+    def set_validator(self, url, response):
+        """Stores the response if it can be used for a conditional request."""
+        if not (response.headers.get("ETag") or
+                response.headers.get("Last-Modified")):
+            return
+
+        with self.lock:
+            # Dicts keep their insertion order so drop the oldest entry once
+            # we've got too many.
+            self.validators.pop(url, None)
+            if len(self.validators) >= MAX_VALIDATORS:
+                del self.validators[next(iter(self.validators))]
+            self.validators[url] = response
+
+    def sleep(self, attempt):
+        """Waits before the next attempt."""
+        delay = self.backoff * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, delay))
+
+    def request(self, method, url, retries=None, **kwargs):
+        """Makes a request and returns a requests.Response object.
+
+           Accepts the same keyword arguments as requests.request. retries
+           is the number of times to retry a failed request. By default
+           that's the client's retries for GET, HEAD and OPTIONS and none
+           for anything else. Raises requests.RequestException if the
+           request still fails after the retries.
+        """
+        if retries is None:
+            retries = self.retries if method.upper() in IDEMPOTENT else 0
+
+        kwargs.setdefault("timeout", self.timeout)
+        session = self.get_session(url)
+
+        # We can only make conditional requests for simple GETs
+        cached = None
+        if method.upper() == "GET" and not kwargs.get("params"):
+            cached = self.get_validator(url)
+
+        if cached is not None:
+            headers = dict(kwargs.get("headers") or {})
+            if cached.headers.get("ETag"):
+                headers["If-None-Match"] = cached.headers["ETag"]
+            if cached.headers.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+            kwargs["headers"] = headers
+
+        attempt = 0
+        while True:
+            try:
+                r = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    raise
+            else:
+                if r.status_code not in RETRY_STATUS or attempt >= retries:
+                    break
+
+            self.sleep(attempt)
+            attempt += 1
+
+        # Nothing has changed so give back what we had last time.
+        if r.status_code == 304 and cached is not None:
+            Logger.debug("HTTP: {} not modified".format(url))
+            return cached
+
+        if (method.upper() == "GET" and r.status_code == 200 and
+                not kwargs.get("params")):
+            self.set_validator(url, r)
+
+        return r
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Closes all open connections."""
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+
+# The shared client is created the first time it's needed.
+_client = None
+_client_lock = Lock()
+
+
+def get_http_client():
+    """Returns the shared HTTPClient instance."""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient()
+
+    return _client
+
+
+def http_get(url, **kwargs):
+    """Shortcut for get_http_client().get(...)."""
+    return get_http_client().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    """Shortcut for get_http_client().post(...)."""
+    return get_http_client().post(url, **kwargs)
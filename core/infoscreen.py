@@ -1,4 +1,3 @@
-import imp
 import time
 from kivy.uix.floatlayout import FloatLayout
 from kivy.properties import BooleanProperty, ObjectProperty, ListProperty, StringProperty
@@ -19,8 +18,11 @@ from kivymd.uix.snackbar import Snackbar
 from kivymd.uix.slider import MDSlider
 
 from core.failedscreen import FailedScreen
-from core.getplugins import getPlugins
-from core.getoverlays import get_overlays
+from core.lifecycle import set_active, set_suspended
+from core.placeholderscreen import PlaceholderScreen
+from core.profiler import tracer
+from core import registry
+from core.registry import load_module, module_available
 from core.bottomsheet import MDBottomSheet
 
 from functools import partial
@@ -35,6 +37,10 @@ class BlackHole(object):
 # it allows developers to view more debug info in the console.
 DEBUG = True
 
+# When screens are loaded lazily, how long to wait after a screen is shown
+# before building the next screen in the rotation (seconds)
+PREBUILD_DELAY = 5
+
 
 class InfoScreen(FloatLayout, BlackHole):
     # Flag for determining whether screen is locked or not
@@ -58,6 +64,19 @@ class InfoScreen(FloatLayout, BlackHole):
         # and an index so we can loop through them:
         self.index = 0
 
+        # Should screens only be built when they're first shown?
+        lazy_config = self._config.get("lazy_load", dict())
+        self.lazy = lazy_config.get("enabled", False)
+        self.prebuild = lazy_config.get("prebuild_next", True)
+
+        # Screens which haven't been built yet (keyed by name)
+        self.pending = {}
+
+        # The screen that's being shown (see core.lifecycle) and whether the
+        # display is paused
+        self.active_screen = None
+        self.suspended = False
+
         # We want to handle failures gracefully so set up some variables
         # variable to hold the FailScreen object (if needed)
         self.failscreen = None
@@ -80,15 +99,14 @@ class InfoScreen(FloatLayout, BlackHole):
             unmet = False
 
             # Loop over dependencies and test if they exist
-            for d in w["dependencies"]:
-                try:
-                    imp.find_module(d)
-                except ImportError:
-                    # We've got at least one unmet dependency for this screen
-                    unmet = True
-                    w_dep[1].append(d)
-                    Logger.error("Unmet dependencies "
-                                 "for {} Overlay. Skipping...".format(w["name"]))
+            with tracer.span("{} dependencies".format(w["name"]), "deps"):
+                for d in w["dependencies"]:
+                    if not module_available(d):
+                        # We've got at least one unmet dependency for this screen
+                        unmet = True
+                        w_dep[1].append(d)
+                        Logger.error("Unmet dependencies "
+                                     "for {} Overlay. Skipping...".format(w["name"]))
 
             # Can we use the screen?
             if unmet:
@@ -98,13 +116,14 @@ class InfoScreen(FloatLayout, BlackHole):
             # No unmet dependencies so let's try to load the screen.
             else:
                 try:
-                    plugin = imp.load_module("overlay", *w["info"])
-                    overlay = getattr(plugin, w["overlay"])
+                    with tracer.span(w["name"], "overlay"):
+                        plugin = load_module(w["module"], w["path"])
+                        overlay = getattr(plugin, w["overlay"])
 
-                    self.overlay_mgr.add_widget(overlay(name=w["name"],
-                                                        master=self,
-                                                        params=w["params"]))
-                    Logger.info("Overlay: {} loaded.".format(w["name"]))
+                        self.overlay_mgr.add_widget(overlay(name=w["name"],
+                                                            master=self,
+                                                            params=w["params"]))
+                        Logger.info("Overlay: {} loaded.".format(w["name"]))
 
                 # Uh oh, something went wrong...
                 except Exception as e:
@@ -127,52 +146,61 @@ class InfoScreen(FloatLayout, BlackHole):
             unmet = False
 
             # Loop over dependencies and test if they exist
-            for d in p["dependencies"]:
-                try:
-                    imp.find_module(d)
-                except ImportError:
-                    # We've got at least one unmet dependency for this screen
-                    unmet = True
-                    p_dep[1].append(d)
-                    Logger.error("Unmet dependencies "
-                                 "for {} screen. Skipping...".format(p["name"]))
+            with tracer.span("{} dependencies".format(p["name"]), "deps"):
+                for d in p["dependencies"]:
+                    if not module_available(d):
+                        # We've got at least one unmet dependency for this screen
+                        unmet = True
+                        p_dep[1].append(d)
+                        Logger.error("Unmet dependencies "
+                                     "for {} screen. Skipping...".format(p["name"]))
 
             # Can we use the screen?
             if unmet:
                 # Add the tupe to our list of unmet dependencies
                 dep_fail.append(p_dep)
 
+            # If we're loading lazily then just register the screen for now.
+            # We always build the first screen as that's shown straight away.
+            elif self.lazy and self.available_screens:
+                self.add_placeholder(p)
+
             # No unmet dependencies so let's try to load the screen.
             else:
-                # This way we put the debug info to console instead of catching errors
-                if DEBUG:
-                    plugin = imp.load_module("screen", *p["info"])
-                    screen = getattr(plugin, p["screen"])
-                    self.scrmgr.add_widget(screen(name=p["name"],
-                                                  master=self,
-                                                  params=p["params"]))
-                    Logger.info("Screen: {} loaded.".format(p["name"]))
-                    # We can add the screen to our list of available screens.
-                    self.available_screens.append(p["name"])
-                else:
-                    try:
-                        plugin = imp.load_module("screen", *p["info"])
+                with tracer.span(p["name"], "screen"):
+                    # KV files aren't loaded up front when we're loading lazily
+                    if self.lazy:
+                        Builder.load_file(p["kvpath"])
+
+                    # This way we put the debug info to console instead of catching errors
+                    if DEBUG:
+                        plugin = load_module(p["module"], p["path"])
                         screen = getattr(plugin, p["screen"])
                         self.scrmgr.add_widget(screen(name=p["name"],
-                                               master=self,
-                                               params=p["params"]))
+                                                      master=self,
+                                                      params=p["params"]))
                         Logger.info("Screen: {} loaded.".format(p["name"]))
-
-                    # Uh oh, something went wrong...
-                    except Exception as e:
-                        # Add the screen name and error message to our list
-                        Logger.error("Could not import "
-                                     "{} screen. Skipping...".format(p["name"]))
-                        failed_screens.append((p["name"], repr(e)))
-
-                    else:
                         # We can add the screen to our list of available screens.
                         self.available_screens.append(p["name"])
+                    else:
+                        try:
+                            plugin = load_module(p["module"], p["path"])
+                            screen = getattr(plugin, p["screen"])
+                            self.scrmgr.add_widget(screen(name=p["name"],
+                                                   master=self,
+                                                   params=p["params"]))
+                            Logger.info("Screen: {} loaded.".format(p["name"]))
+
+                        # Uh oh, something went wrong...
+                        except Exception as e:
+                            # Add the screen name and error message to our list
+                            Logger.error("Could not import "
+                                         "{} screen. Skipping...".format(p["name"]))
+                            failed_screens.append((p["name"], repr(e)))
+
+                        else:
+                            # We can add the screen to our list of available screens.
+                            self.available_screens.append(p["name"])
 
         # If we've got any failures then let's notify the user.
         if dep_fail or failed_screens:
@@ -190,6 +218,99 @@ class InfoScreen(FloatLayout, BlackHole):
         # Update the overlay opacity to hide/show overlay depending on screen config
         self.overlay_opacity(self.scrmgr.current)
 
+        # Tell screens when they're shown and hidden
+        self.scrmgr.bind(current_screen=self.screen_changed)
+        self.screen_changed(self.scrmgr, self.scrmgr.current_screen)
+
+        # Get the next screen ready
+        self.schedule_prebuild()
+
+    def screen_changed(self, scrmgr, screen):
+        """Deactivates the screen we were showing and activates the new
+           one. Screens stop their timers, threads etc. while they're not
+           active.
+        """
+        if screen is self.active_screen:
+            return
+
+        set_active(self.active_screen, False)
+        self.active_screen = screen
+
+        if screen is not None:
+            set_suspended(screen, self.suspended)
+            set_active(screen, True)
+
+    def suspend(self):
+        """Pauses the current screen (e.g. when the app is paused)."""
+        self.suspended = True
+        set_suspended(self.active_screen, True)
+
+    def resume(self):
+        self.suspended = False
+        set_suspended(self.active_screen, False)
+
+    def add_placeholder(self, p):
+        """Registers a screen without importing or building it. The screen
+           is built the first time it's needed (see build_screen).
+        """
+        self.scrmgr.add_widget(PlaceholderScreen(name=p["name"]))
+        self.pending[p["name"]] = p
+        self.available_screens.append(p["name"])
+        Logger.info("Screen: {} registered.".format(p["name"]))
+
+    def build_screen(self, screen_name):
+        """Replaces the placeholder for a lazily loaded screen with the real
+           screen. Does nothing if the screen has already been built.
+        """
+        p = self.pending.pop(screen_name, None)
+        if p is None:
+            return
+
+        placeholder = self.scrmgr.get_screen(screen_name)
+
+        try:
+            # Import it
+            plugin = load_module(p["module"], p["path"])
+
+            # Get the reference to the screen class
+            screen = getattr(plugin, p["screen"])
+
+            # Add the KV file to the builder
+            Builder.load_file(p["kvpath"])
+
+            # Create the screen
+            built = screen(name=p["name"], master=self, params=p["params"])
+
+        # Uh oh, something went wrong...
+        except Exception as e:
+            # This way we put the debug info to console instead of catching errors
+            if DEBUG:
+                raise
+
+            # Leave the placeholder there to show the error
+            Logger.error("Could not import "
+                         "{} screen.".format(p["name"]))
+            placeholder.show_error(repr(e))
+            return
+
+        # Swap the placeholder for the real screen
+        self.scrmgr.remove_widget(placeholder)
+        self.scrmgr.add_widget(built)
+        Logger.info("Screen: {} loaded.".format(p["name"]))
+
+    def schedule_prebuild(self):
+        """Builds the next screen in the rotation shortly after the current
+           screen is shown so that it's ready when we need it.
+        """
+        if self.pending and self.prebuild:
+            Clock.unschedule(self.prebuild_next)
+            Clock.schedule_once(self.prebuild_next, PREBUILD_DELAY)
+
+    def prebuild_next(self, *args):
+        if self.available_screens:
+            index = (self.index + 1) % len(self.available_screens)
+            self.build_screen(self.available_screens[index])
+
     def toggle_lock(self, locked=None):
         if locked is None:
             self.locked = not self.locked
@@ -213,16 +334,13 @@ class InfoScreen(FloatLayout, BlackHole):
     def add_screen(self, screen_name):
 
         # Get the info we need to import this screen
-        foundscreen = [p for p in getPlugins() if p["name"] == screen_name]
+        p = registry.screens.find(screen_name)
 
         # Check we've found a screen and it's not already running
-        if foundscreen and screen_name not in self.available_screens:
-
-            # Get the details for the screen
-            p = foundscreen[0]
+        if p and screen_name not in self.available_screens:
 
             # Import it
-            plugin = imp.load_module("screen", *p["info"])
+            plugin = load_module(p["module"], p["path"])
 
             # Get the reference to the screen class
             screen = getattr(plugin, p["screen"])
@@ -249,13 +367,14 @@ class InfoScreen(FloatLayout, BlackHole):
     def remove_screen(self, screen_name):
 
         # Get the list of screens
-        foundscreen = [p for p in getPlugins(inactive=True) if p["name"] == screen_name]
+        foundscreen = registry.screens.find(screen_name, inactive=True)
 
         # Loop over list of available screens
         while screen_name in self.available_screens:
 
             # Remove screen from list of available screens
             self.available_screens.remove(screen_name)
+            self.pending.pop(screen_name, None)
 
             # Change the display to the next screen
             self.next_screen()
@@ -271,11 +390,9 @@ class InfoScreen(FloatLayout, BlackHole):
             self.scrmgr.remove_widget(c)
             del c
 
-        try:
-            # Remove the KV file from our builder
-            Builder.unload_file(foundscreen[0]["kvpath"])
-        except IndexError:
-            pass
+        # Remove the KV file from our builder
+        if foundscreen:
+            Builder.unload_file(foundscreen["kvpath"])
 
     # def remove_overlay(self, overlay_name):
     #     # Get the list of screens
@@ -320,7 +437,7 @@ class InfoScreen(FloatLayout, BlackHole):
     #
     #         try:
     #             # Import it
-    #             plugin = imp.load_module("overlay", *w["info"])
+    #             plugin = load_module(w["module"], w["path"])
     #
     #             # Get the reference to the screen class
     #             overlay = getattr(plugin, w["overlay"])
@@ -355,11 +472,16 @@ class InfoScreen(FloatLayout, BlackHole):
 
         # if we are reloading then we want to remove all kv files from builder before we add them all again
         if reload:
+            # Let each overlay stop its timers and unbind from the window
+            # first, otherwise they keep the old overlays alive.
+            for c in self.overlay_mgr.children[:]:
+                if hasattr(c, "unload"):
+                    c.unload()
             self.overlay_mgr.clear_widgets()
             for w in self._overlays:
                 Builder.unload_file(w['kvpath'])
 
-        self._overlays = get_overlays()
+        self._overlays = registry.overlays.get()
 
         dep_fail = []
         failed_screens = []
@@ -378,9 +500,7 @@ class InfoScreen(FloatLayout, BlackHole):
 
             # Loop over dependencies and test if they exist
             for d in w["dependencies"]:
-                try:
-                    imp.find_module(d)
-                except ImportError:
+                if not module_available(d):
                     # We've got at least one unmet dependency for this screen
                     unmet = True
                     w_dep[1].append(d)
@@ -395,7 +515,7 @@ class InfoScreen(FloatLayout, BlackHole):
             # No unmet dependencies so let's try to load the screen.
             else:
                 try:
-                    plugin = imp.load_module("overlay", *w["info"])
+                    plugin = load_module(w["module"], w["path"])
                     overlay = getattr(plugin, w["overlay"])
 
                     self.overlay_mgr.add_widget(overlay(name=w["name"],
@@ -424,15 +544,24 @@ class InfoScreen(FloatLayout, BlackHole):
                 inc = 1
 
             self.index = (self.index + inc) % len(self.available_screens)
+
+            # Make sure the screen has been built
+            self.build_screen(self.available_screens[self.index])
             self.scrmgr.current = self.available_screens[self.index]
 
             # Update the overlay opacity to hide/show overlay depending on screen config
             self.overlay_opacity(self.scrmgr.current)
 
+            # Get the next screen ready
+            self.schedule_prebuild()
+
     def switch_to(self, screen):
 
         if screen in self.available_screens:
 
+            # Make sure the screen has been built
+            self.build_screen(screen)
+
             # Activate the screen
             self.scrmgr.current = screen
 
@@ -442,6 +571,9 @@ class InfoScreen(FloatLayout, BlackHole):
             # Update the overlay opacity to hide/show overlay depending on screen config
             self.overlay_opacity(self.scrmgr.current)
 
+            # Get the next screen ready
+            self.schedule_prebuild()
+
     def overlay_opacity(self, screen_name):
         # Find Screen in screen manager
         c = self.scrmgr.get_screen(screen_name)
@@ -0,0 +1,262 @@
+"""Screen lifecycle for the Raspberry Pi Information Screen.
+
+   Kivy's on_enter and on_leave events aren't enough to know whether a
+   screen is really being shown: they aren't fired for screens in nested
+   ScreenManagers and they know nothing about the app being paused. As a
+   result screens kept timers, threads and sockets running while nobody
+   could see them.
+
+   Screens which inherit LifecycleScreen get four events, driven by the
+   InfoScreen:
+
+     on_activate:   the screen has become the current screen
+     on_deactivate: the screen is no longer the current screen
+     on_suspend:    the screen is current but the display has been paused
+     on_resume:     the display is running again
+
+   The current screen of any ScreenManager nested in a LifecycleScreen is
+   activated and deactivated (and suspended and resumed) along with it, and
+   when the nested manager changes screen.
+
+   Timers and background work can be registered with the screen so they
+   only run while the screen is active and not suspended:
+
+       class MyScreen(LifecycleScreen):
+           def __init__(self, **kwargs):
+               super(MyScreen, self).__init__(**kwargs)
+               self.add_tick(self.update, SECOND)
+               self.add_interval(self.refresh, 5 * 60)
+               self.add_service(self.connect, self.disconnect)
+"""
+from kivy.clock import Clock
+from kivy.properties import BooleanProperty
+from kivy.uix.screenmanager import Screen, ScreenManager
+
+from core.ticker import subscribe, SECOND
+
+
+class Service(object):
+    """Something which should only run while its screen is running. start
+       and stop are called each time the screen starts and stops running.
+    """
+    def __init__(self, owner, start=None, stop=None):
+        self.owner = owner
+        self.on_start = start
+        self.on_stop = stop
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            if self.on_start:
+                self.on_start()
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            if self.on_stop:
+                self.on_stop()
+
+    def cancel(self):
+        """Stops the service and removes it from the screen."""
+        self.owner.remove_service(self)
+
+
+class IntervalService(Service):
+    """Calls callback every interval seconds while the screen is running."""
+    def __init__(self, owner, callback, interval):
+        super(IntervalService, self).__init__(owner)
+        self.callback = callback
+        self.interval = interval
+        self.event = None
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.event = Clock.schedule_interval(self.callback, self.interval)
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            self.event.cancel()
+            self.event = None
+
+
+class TickSubscription(Service):
+    """Subscribes callback to the shared tick service while the screen is
+       running.
+    """
+    def __init__(self, owner, callback, granularity):
+        super(TickSubscription, self).__init__(owner)
+        self.callback = callback
+        self.granularity = granularity
+        self.tick = None
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.tick = subscribe(self.callback, self.granularity)
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            self.tick.cancel()
+            self.tick = None
+
+
+def nested_managers(widget):
+    """Generator of the ScreenManagers in the widget (but not those inside
+       another ScreenManager).
+    """
+    for child in widget.children:
+        if isinstance(child, ScreenManager):
+            yield child
+        else:
+            for manager in nested_managers(child):
+                yield manager
+
+
+def set_active(screen, active):
+    """Activates or deactivates the screen. Screens which don't use the
+       lifecycle are ignored.
+    """
+    if isinstance(screen, LifecycleScreen):
+        screen.set_active(active)
+
+
+def set_suspended(screen, suspended):
+    """Suspends or resumes the screen. Screens which don't use the
+       lifecycle are ignored.
+    """
+    if isinstance(screen, LifecycleScreen):
+        screen.set_suspended(suspended)
+
+
+class LifecycleScreen(Screen):
+    """Screen which knows whether it's being shown. See the module
+       docstring.
+    """
+    active = BooleanProperty(False)
+    suspended = BooleanProperty(False)
+
+    __events__ = ("on_activate", "on_deactivate", "on_suspend", "on_resume")
+
+    def __init__(self, **kwargs):
+        super(LifecycleScreen, self).__init__(**kwargs)
+
+        # Things to start and stop with the screen
+        self.services = []
+
+        # Nested ScreenManagers we're watching and their current screens
+        self.nested = {}
+
+    def is_running(self):
+        """True if the screen is being shown and the display isn't paused."""
+        return self.active and not self.suspended
+
+    def on_activate(self):
+        pass
+
+    def on_deactivate(self):
+        pass
+
+    def on_suspend(self):
+        pass
+
+    def on_resume(self):
+        pass
+
+    def set_active(self, active):
+        if active == self.active:
+            return
+
+        self.active = active
+
+        if active:
+            self.dispatch("on_activate")
+            self.update_services()
+            self.watch_nested()
+
+        else:
+            self.unwatch_nested()
+            self.update_services()
+            self.dispatch("on_deactivate")
+
+    def set_suspended(self, suspended):
+        if suspended == self.suspended:
+            return
+
+        self.suspended = suspended
+
+        if suspended:
+            for screen in self.nested.values():
+                set_suspended(screen, True)
+            self.update_services()
+            self.dispatch("on_suspend")
+
+        else:
+            self.dispatch("on_resume")
+            self.update_services()
+            for screen in self.nested.values():
+                set_suspended(screen, False)
+
+    def update_services(self):
+        """Starts or stops the services to match the screen."""
+        for service in list(self.services):
+            if self.is_running():
+                service.start()
+            else:
+                service.stop()
+
+    def add_service(self, start=None, stop=None):
+        """Calls start when the screen starts running and stop when it
+           stops. Returns a Service.
+        """
+        return self.register(Service(self, start, stop))
+
+    def add_interval(self, callback, interval):
+        """Calls callback every interval seconds while the screen is
+           running. Returns a Service.
+        """
+        return self.register(IntervalService(self, callback, interval))
+
+    def add_tick(self, callback, granularity=SECOND):
+        """Subscribes callback to the shared tick service (see core.ticker)
+           while the screen is running. Returns a Service.
+        """
+        return self.register(TickSubscription(self, callback, granularity))
+
+    def register(self, service):
+        self.services.append(service)
+        if self.is_running():
+            service.start()
+        return service
+
+    def remove_service(self, service):
+        service.stop()
+        if service in self.services:
+            self.services.remove(service)
+
+    def watch_nested(self):
+        for manager in nested_managers(self):
+            self.nested[manager] = None
+            manager.bind(current_screen=self.nested_changed)
+            self.nested_changed(manager, manager.current_screen)
+
+    def unwatch_nested(self):
+        for manager, screen in list(self.nested.items()):
+            manager.unbind(current_screen=self.nested_changed)
+            set_active(screen, False)
+        self.nested = {}
+
+    def nested_changed(self, manager, screen):
+        old = self.nested.get(manager)
+        if screen is old:
+            return
+
+        set_active(old, False)
+        self.nested[manager] = screen
+
+        if screen is not None:
+            set_suspended(screen, self.suspended)
+            set_active(screen, True)
@@ -0,0 +1,312 @@
+"""Frame time and main loop stall metrics for the Raspberry Pi Information
+   Screen.
+
+   Anything that runs on the Kivy main thread for too long makes the whole
+   display stutter. To find the culprits, this module:
+
+     - wraps the Clock callbacks scheduled by screens and overlays and keeps
+       a histogram of how long each callback (and each screen in total)
+       takes to run;
+     - keeps a histogram of frame times; and
+     - runs a watchdog thread which notices when the main loop hasn't ticked
+       for longer than a threshold and records the main thread's stack at
+       that moment, so we can see what caused the stall.
+
+   Metrics are off unless "enabled" is set in the "metrics" section of
+   config.json. install() must be called before any screens are built (only
+   callbacks scheduled after that are measured).
+
+   The stats are served by the web API at /api/metrics (JSON) and
+   /api/metrics?format=prometheus (Prometheus text format).
+"""
+import sys
+import time
+import traceback
+from functools import partial
+from threading import Lock, Thread, get_ident
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+from core.fetch import FetchJob
+
+# Upper bounds of the histogram buckets (seconds)
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+# Default time without a frame before we call it a stall (seconds)
+STALL_THRESHOLD = 0.25
+
+# Number of stalls (and their stacks) to keep
+MAX_STALLS = 20
+
+# Only callbacks from modules in these packages are measured
+PLUGIN_PACKAGES = ("screens", "overlays")
+
+
+class Histogram(object):
+    """Cumulative histogram of durations."""
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def as_dict(self):
+        return {"count": self.count,
+                "sum": self.sum,
+                "max": self.max,
+                "mean": self.sum / self.count if self.count else 0,
+                "buckets": [[bound, count] for bound, count
+                            in zip(BUCKETS, self.counts)]}
+
+
+class TimedCallback(object):
+    """Wraps a Clock callback so that we can time it.
+
+       The wrapper compares equal to the original callback so that
+       Clock.unschedule(callback) still works.
+    """
+    def __init__(self, func, name, owner, metrics):
+        self.func = func
+        self.name = name
+        self.owner = owner
+        self.metrics = metrics
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        try:
+            return self.func(*args)
+        finally:
+            self.metrics.record_callback(self.name, self.owner,
+                                         time.perf_counter() - start)
+
+    def __eq__(self, other):
+        return other is self or self.func == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.func)
+
+
+def describe(callback):
+    """Returns a tuple of (callback name, owning plugin) for the callback.
+
+       The owner is e.g. "screens.weather" or None if the callback doesn't
+       come from a plugin.
+    """
+    func = callback
+    while isinstance(func, partial):
+        func = func.func
+
+    owner = getattr(func, "__self__", None)
+
+    # Results of background fetches are passed on by the FetchJob but the
+    # work is done by the screen's callback so that's who we charge.
+    if isinstance(owner, FetchJob):
+        if func.__name__ == "deliver_error":
+            target = owner.on_error
+        else:
+            target = owner.on_result
+        if target is not None:
+            return describe(target)
+
+    if owner is not None:
+        module = type(owner).__module__
+    else:
+        module = getattr(func, "__module__", None) or ""
+
+    name = getattr(func, "__qualname__", repr(func))
+
+    # Plugins are loaded as e.g. "screens.weather.screen"
+    parts = module.split(".")
+    if len(parts) > 1 and parts[0] in PLUGIN_PACKAGES:
+        return name, ".".join(parts[:2])
+
+    return name, None
+
+
+class Metrics(object):
+    """Collects the stats. Safe to read from other threads."""
+    def __init__(self, stall_threshold=STALL_THRESHOLD):
+        self.stall_threshold = stall_threshold
+        self.installed = False
+
+        self.callbacks = {}
+        self.owners = {}
+        self.frames = Histogram()
+        self.stalls = []
+        self.stall_count = 0
+
+        # Time of the last frame (None until the first frame)
+        self.last_tick = None
+        self.main_thread = None
+
+        self.lock = Lock()
+
+    def install(self):
+        """Starts collecting metrics. Must be called on the main thread."""
+        if self.installed:
+            return
+
+        self.installed = True
+        self.main_thread = get_ident()
+
+        # Wrap the Clock's scheduling methods
+        self._schedule_once = Clock.schedule_once
+        self._schedule_interval = Clock.schedule_interval
+        Clock.schedule_once = self.schedule_once
+        Clock.schedule_interval = self.schedule_interval
+
+        # Time every frame
+        self._schedule_interval(self.tick, 0)
+
+        # Start the watchdog
+        watchdog = Thread(target=self.watch, name="stall-watchdog")
+        watchdog.daemon = True
+        watchdog.start()
+
+        Logger.info("Metrics: installed "
+                    "(stall threshold {}s)".format(self.stall_threshold))
+
+    def wrap(self, callback):
+        """Returns a timed wrapper for plugin callbacks (other callbacks are
+           returned unchanged).
+        """
+        if isinstance(callback, TimedCallback):
+            return callback
+
+        name, owner = describe(callback)
+        if owner is None:
+            return callback
+
+        return TimedCallback(callback, name, owner, self)
+
+    def schedule_once(self, callback, timeout=0):
+        return self._schedule_once(self.wrap(callback), timeout)
+
+    def schedule_interval(self, callback, timeout):
+        return self._schedule_interval(self.wrap(callback), timeout)
+
+    def record_callback(self, name, owner, duration):
+        with self.lock:
+            key = (owner, name)
+            if key not in self.callbacks:
+                self.callbacks[key] = Histogram()
+            self.callbacks[key].add(duration)
+
+            if owner not in self.owners:
+                self.owners[owner] = Histogram()
+            self.owners[owner].add(duration)
+
+    def tick(self, *args):
+        """Called every frame."""
+        now = time.perf_counter()
+        with self.lock:
+            if self.last_tick is not None:
+                self.frames.add(now - self.last_tick)
+            self.last_tick = now
+
+    def watch(self):
+        """Watchdog thread. Records the main thread's stack when it hasn't
+           ticked for longer than the threshold.
+        """
+        reported = None
+
+        while True:
+            time.sleep(self.stall_threshold / 2)
+
+            # Start up isn't measured (see the boot profiler for that)
+            last_tick = self.last_tick
+            if last_tick is None:
+                continue
+
+            # Only report each stall once
+            stalled = time.perf_counter() - last_tick
+            if stalled < self.stall_threshold or reported == last_tick:
+                continue
+
+            reported = last_tick
+            frame = sys._current_frames().get(self.main_thread)
+            stack = traceback.format_stack(frame) if frame else []
+
+            with self.lock:
+                self.stall_count += 1
+                self.stalls.append({"time": time.time(),
+                                    "stalled_for": stalled,
+                                    "stack": stack})
+                del self.stalls[:-MAX_STALLS]
+
+            Logger.warning("Metrics: main loop stalled for "
+                           "{:.3f}s".format(stalled))
+
+    def as_dict(self):
+        """Returns the stats as a dict suitable for JSON."""
+        with self.lock:
+            return {"installed": self.installed,
+                    "stall_threshold": self.stall_threshold,
+                    "frames": self.frames.as_dict(),
+                    "stall_count": self.stall_count,
+                    "stalls": list(self.stalls),
+                    "owners": {owner: h.as_dict()
+                               for owner, h in self.owners.items()},
+                    "callbacks": [dict(owner=owner, callback=name,
+                                       **h.as_dict())
+                                  for (owner, name), h
+                                  in self.callbacks.items()]}
+
+    def prometheus(self):
+        """Returns the stats in Prometheus text format."""
+        lines = []
+
+        def histogram(metric, h, labels=""):
+            sep = "," if labels else ""
+            for bound, count in zip(BUCKETS, h.counts):
+                lines.append('{}_bucket{{{}{}le="{}"}} {}'.format(
+                    metric, labels, sep, bound, count))
+            lines.append('{}_bucket{{{}{}le="+Inf"}} {}'.format(
+                metric, labels, sep, h.count))
+            lines.append("{}_sum{{{}}} {}".format(metric, labels, h.sum))
+            lines.append("{}_count{{{}}} {}".format(metric, labels, h.count))
+
+        with self.lock:
+            lines.append("# HELP infoscreen_frame_seconds Time between "
+                         "frames.")
+            lines.append("# TYPE infoscreen_frame_seconds histogram")
+            histogram("infoscreen_frame_seconds", self.frames)
+
+            lines.append("# HELP infoscreen_stalls_total Number of main loop "
+                         "stalls.")
+            lines.append("# TYPE infoscreen_stalls_total counter")
+            lines.append("infoscreen_stalls_total {}".format(self.stall_count))
+
+            lines.append("# HELP infoscreen_plugin_callback_seconds Time "
+                         "spent in Clock callbacks, by plugin.")
+            lines.append("# TYPE infoscreen_plugin_callback_seconds "
+                         "histogram")
+            for owner, h in sorted(self.owners.items()):
+                histogram("infoscreen_plugin_callback_seconds", h,
+                          'plugin="{}"'.format(owner))
+
+            lines.append("# HELP infoscreen_callback_seconds Time spent in "
+                         "Clock callbacks.")
+            lines.append("# TYPE infoscreen_callback_seconds histogram")
+            for (owner, name), h in sorted(self.callbacks.items()):
+                histogram("infoscreen_callback_seconds", h,
+                          'plugin="{}",callback="{}"'.format(owner, name))
+
+        return "\n".join(lines) + "\n"
+
+
+# The shared metrics collector
+metrics = Metrics()
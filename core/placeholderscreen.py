@@ -0,0 +1,23 @@
+from kivy.uix.screenmanager import Screen
+from kivy.uix.label import Label
+
+
+class PlaceholderScreen(Screen):
+    """Lightweight screen used in place of a plugin screen that hasn't been
+       built yet (see the "lazy_load" setting).
+
+       The InfoScreen swaps it for the real screen the first time the screen
+       is needed. If that fails, the placeholder stays and shows the error.
+    """
+    def __init__(self, **kwargs):
+        super(PlaceholderScreen, self).__init__(**kwargs)
+
+        # Create a label.
+        self.lbl = Label(text="Loading {}...".format(self.name))
+
+        # Display it.
+        self.add_widget(self.lbl)
+
+    def show_error(self, error):
+        self.lbl.text = ("Errors were encountered trying to create the "
+                         "{} screen:\n\n{}".format(self.name, error))
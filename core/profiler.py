@@ -0,0 +1,136 @@
+"""Boot tracer for the Raspberry Pi Information Screen.
+
+   Records how long each phase of start up takes (loading KV files, checking
+   dependencies, building each screen etc.) so slow plugins can be found.
+
+   Tracing is off unless "enabled" is set in the "profiler" section of
+   config.json or the INFOSCREEN_PROFILE environment variable is set. When
+   it's off, spans cost next to nothing.
+
+   Usage:
+
+       from core.profiler import tracer
+
+       with tracer.span("load config", "main"):
+           ...
+
+   Once the first frame has been drawn, the app calls tracer.finish() which
+   writes a JSON timeline (boot_profile.json) and a text summary sorted by
+   duration (boot_profile.txt). Both are also available from the web API at
+   /api/profile and /api/profile/summary.
+
+   This module is imported before Kivy so that the timeline starts as early
+   as possible; it mustn't import Kivy itself.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Set this environment variable (to anything) to enable tracing
+ENV_VAR = "INFOSCREEN_PROFILE"
+
+# Names of the files written by finish()
+TIMELINE_FILE = "boot_profile.json"
+SUMMARY_FILE = "boot_profile.txt"
+
+
+class BootTracer(object):
+    """Records timed spans during start up."""
+    def __init__(self):
+        self.enabled = bool(os.environ.get(ENV_VAR))
+
+        # Everything is timed relative to when the tracer was created
+        self.t0 = time.perf_counter()
+
+        # Completed spans, in the order that they started
+        self.spans = []
+
+        # Depth of the span currently open (so we can show nesting)
+        self.depth = 0
+
+        # Set once finish has been called
+        self.finished = False
+        self.total = None
+
+    def enable(self):
+        self.enabled = True
+
+    def now(self):
+        """Returns the time since the tracer was created (seconds)."""
+        return time.perf_counter() - self.t0
+
+    @contextmanager
+    def span(self, name, category="boot"):
+        """Context manager to time a block of code."""
+        if not self.enabled or self.finished:
+            yield
+            return
+
+        record = {"name": name,
+                  "category": category,
+                  "start": self.now(),
+                  "duration": None,
+                  "depth": self.depth}
+
+        # Keep the spans in the order they started
+        self.spans.append(record)
+        self.depth += 1
+
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            record["duration"] = self.now() - record["start"]
+
+    def mark(self, name, category="boot"):
+        """Records an instant (a span with no duration)."""
+        if self.enabled and not self.finished:
+            self.spans.append({"name": name,
+                               "category": category,
+                               "start": self.now(),
+                               "duration": 0,
+                               "depth": self.depth})
+
+    def timeline(self):
+        """Returns the timeline as a dict suitable for JSON."""
+        return {"total": self.total if self.finished else self.now(),
+                "finished": self.finished,
+                "spans": self.spans}
+
+    def summary(self):
+        """Returns a text summary with the slowest spans first."""
+        total = self.total if self.finished else self.now()
+        lines = ["Boot time: {:.3f}s".format(total), ""]
+
+        spans = sorted((s for s in self.spans if s["duration"]),
+                       key=lambda s: s["duration"],
+                       reverse=True)
+
+        for s in spans:
+            lines.append("{:8.3f}s {:5.1f}%  {:<10} {}".format(
+                s["duration"],
+                100.0 * s["duration"] / total if total else 0,
+                s["category"],
+                s["name"]))
+
+        return "\n".join(lines) + "\n"
+
+    def finish(self, folder):
+        """Stops tracing and writes the timeline and summary to folder."""
+        if not self.enabled or self.finished:
+            return
+
+        self.mark("first frame")
+        self.total = self.now()
+        self.finished = True
+
+        with open(os.path.join(folder, TIMELINE_FILE), "w") as tfile:
+            json.dump(self.timeline(), tfile, indent=4)
+
+        with open(os.path.join(folder, SUMMARY_FILE), "w") as sfile:
+            sfile.write(self.summary())
+
+
+# The shared tracer
+tracer = BootTracer()
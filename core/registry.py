@@ -0,0 +1,197 @@
+"""Plugin registry for the Raspberry Pi Information Screen.
+
+   Finding the installed screens and overlays means listing the plugin
+   folders and reading every conf.json. The results are needed in several
+   places (start up, adding/removing screens, the web interface) so, rather
+   than doing this on every call, the registry keeps a manifest of what it
+   found.
+
+   Each entry in the manifest is stamped with the modification times of the
+   plugin's folder and conf.json. On each lookup the registry only re-reads
+   plugins whose stamp has changed (and only relists the parent folder if
+   its own modification time has changed), so the cost of discovery is paid
+   once per change rather than once per call.
+
+   The module also provides load_module which imports a plugin's python
+   file using importlib.
+"""
+import copy
+import importlib.util
+import json
+import os
+import sys
+from threading import Lock
+
+from kivy.logger import Logger
+
+
+def load_module(name, path):
+    """Imports the python file at path as a module called name.
+
+       The module is added to sys.modules (replacing any module already
+       loaded with that name) and returned.
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[name]
+        raise
+
+    return module
+
+
+def module_available(name):
+    """Returns True if the module called name can be imported."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class PluginRegistry(object):
+    """Keeps track of the plugins in a folder.
+
+       folder: folder containing the plugins (one sub-folder per plugin)
+       script: name of the python file each plugin must have
+       kind:   type of plugin ("screen" or "overlay"). This is also the key
+               in conf.json that names the plugin's class.
+    """
+    # Each plugin needs a conf file
+    conf_file = "conf.json"
+
+    # Plugins can provide a web page for configuration
+    web_file = "web.py"
+
+    def __init__(self, folder, script, kind):
+        self.folder = folder
+        self.script = script
+        self.kind = kind
+
+        # The manifest: plugin folder name -> (stamp, plugin dict)
+        self.manifest = {}
+
+        # Sorted list of plugin folder names and the folder's mtime when we
+        # last listed it
+        self.names = []
+        self.folder_mtime = None
+
+        self.lock = Lock()
+
+    def mtime(self, path):
+        """Returns the modification time of path or None if it's missing."""
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def stamp(self, location):
+        """Returns the values which, if changed, mean that the plugin must be
+           read again.
+        """
+        return (self.mtime(location),
+                self.mtime(os.path.join(location, self.script)),
+                self.mtime(os.path.join(location, self.conf_file)))
+
+    def read_plugin(self, name, location):
+        """Reads the plugin's conf file and returns the plugin dict (or None
+           if the folder doesn't contain a valid plugin).
+        """
+        if not os.path.isfile(os.path.join(location, self.script)):
+            return None
+
+        try:
+            with open(os.path.join(location, self.conf_file)) as cfile:
+                conf = json.load(cfile)
+        except (IOError, OSError):
+            return None
+        except ValueError as e:
+            Logger.error("Registry: unable to read {} config: "
+                         "{!r}".format(name, e))
+            return None
+
+        # See if there's a web config file
+        webfile = os.path.join(location, self.web_file)
+        if not os.path.isfile(webfile):
+            webfile = None
+
+        # Custom dict for the plugin
+        plugin = {"name": name,
+                  "path": os.path.join(location, self.script),
+                  "module": "{}.{}.{}".format(os.path.basename(self.folder),
+                                              name,
+                                              self.kind),
+                  self.kind: conf[self.kind],
+                  "dependencies": conf.get("dependencies", list()),
+                  "kvpath": os.path.join(location, conf["kv"]),
+                  "params": conf.get("params", None),
+                  "enabled": conf.get("enabled", False),
+                  "web": webfile}
+
+        if self.kind == "screen":
+            plugin["show_overlay"] = conf.get("show_overlay", True)
+
+        return plugin
+
+    def refresh(self):
+        """Brings the manifest up to date."""
+        # Only list the folder if something has been added or removed
+        folder_mtime = self.mtime(self.folder)
+        if folder_mtime != self.folder_mtime:
+            self.folder_mtime = folder_mtime
+            try:
+                self.names = sorted(x for x in os.listdir(self.folder)
+                                    if os.path.isdir(os.path.join(self.folder,
+                                                                  x)))
+            except OSError:
+                self.names = []
+
+            # Forget about plugins which have been removed
+            for name in list(self.manifest):
+                if name not in self.names:
+                    del self.manifest[name]
+
+        # Re-read any plugins which have changed
+        for name in self.names:
+            location = os.path.join(self.folder, name)
+            stamp = self.stamp(location)
+            cached = self.manifest.get(name)
+
+            if cached is None or cached[0] != stamp:
+                self.manifest[name] = (stamp, self.read_plugin(name, location))
+
+    def get(self, inactive=False):
+        """Returns a list of plugin dicts.
+
+           Only enabled plugins are included unless inactive is True.
+        """
+        with self.lock:
+            self.refresh()
+            found = [self.manifest[name][1] for name in self.names
+                     if self.manifest[name][1] is not None]
+
+        plugins = []
+        for plugin in found:
+            if plugin["enabled"] or inactive:
+                # Callers get their own copy so they can't alter the manifest
+                plugin = copy.deepcopy(plugin)
+                plugin["id"] = len(plugins) + 1
+                plugins.append(plugin)
+
+        return plugins
+
+    def find(self, name, inactive=False):
+        """Returns the plugin dict for the named plugin (or None)."""
+        for plugin in self.get(inactive=inactive):
+            if plugin["name"] == name:
+                return plugin
+
+        return None
+
+
+# Registries for screens and overlays
+screens = PluginRegistry("./screens", "screen.py", "screen")
+overlays = PluginRegistry("./overlays", "overlay.py", "overlay")
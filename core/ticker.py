@@ -0,0 +1,267 @@
+"""Shared clock tick for the Raspberry Pi Information Screen.
+
+   Clocks and countdowns used to each schedule their own one second
+   interval. Those timers weren't lined up with the wall clock second (so
+   the displayed time could lag by up to a second and drift) and each one
+   woke the Pi up separately.
+
+   The TickService has a single timer. Subscribers say how often they need
+   to change (every second, minute or five minutes) and the timer is set
+   for just after the next boundary that any of them is waiting for. If
+   everyone only needs minutes we only wake up once a minute.
+
+   If a subscriber is tied to a widget (normally its screen) it isn't called
+   (and doesn't keep the timer running) while that widget is hidden. This
+   works for screens in nested ScreenManagers too because a ScreenManager
+   only keeps its current screen in the widget tree. We watch the widget's
+   place in the tree and the subscriber is called on the next second after
+   its widget is shown again so the display is never stale.
+
+   Typical usage from a screen:
+
+       from core.ticker import subscribe, MINUTE
+
+       def on_enter(self):
+           self.tick = subscribe(self.update, MINUTE, widget=self)
+
+       def on_leave(self):
+           self.tick.cancel()
+
+   The callback is passed the time of the tick as a datetime.
+
+   Like Kivy's Clock, the service only keeps a weak reference to a bound
+   method callback (and to the widget) so a subscription doesn't keep its
+   screen or overlay alive. Once the object has gone the subscription is
+   dropped. Plain functions and lambdas are kept as they would otherwise
+   disappear straight away. Cancelling the Tick is still the way to stop
+   the calls as soon as they aren't wanted.
+"""
+import math
+import time
+import weakref
+from datetime import datetime
+
+from kivy.clock import Clock
+from kivy.uix.widget import Widget
+
+# Granularities (seconds)
+SECOND = 1
+MINUTE = 60
+FIVE_MINUTES = 5 * 60
+
+# Fire this long after the second boundary so Clock jitter doesn't wake us
+# just before it.
+OFFSET = 0.01
+
+# A tick this close to the next second is treated as that second.
+EARLY = 0.05
+
+
+class Tick(object):
+    """Handle for a subscription to the TickService.
+
+       Screens should keep a reference so they can cancel it (e.g. in
+       on_leave).
+    """
+    def __init__(self, service, callback, granularity, widget=None):
+        self.service = service
+        self.granularity = granularity
+
+        # Weak references (see the module docstring)
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            self._callback = weakref.WeakMethod(callback)
+        else:
+            self._callback = lambda: callback
+
+        self._widget = weakref.ref(widget) if widget is not None else None
+
+        # Period of the last call (None to call on the next tick)
+        self.period = None
+
+        # The widget and its ancestors (see watch)
+        self.watched = []
+        self.watch()
+
+    def __repr__(self):
+        name = getattr(self.callback, "__qualname__", repr(self.callback))
+        return "<Tick {} every {}s>".format(name, self.granularity)
+
+    @property
+    def callback(self):
+        """The callback or None if its object has been deleted."""
+        return self._callback()
+
+    @property
+    def widget(self):
+        return self._widget() if self._widget is not None else None
+
+    @property
+    def dead(self):
+        """True if the callback's object (or the widget) has been deleted."""
+        return self.callback is None or (self._widget is not None and
+                                         self._widget() is None)
+
+    @property
+    def suspended(self):
+        """True if the subscriber's widget isn't being shown."""
+        widget = self.widget
+        return widget is not None and widget.get_root_window() is None
+
+    def cancel(self):
+        self.unwatch()
+        self.service.unsubscribe(self)
+
+    def watch(self):
+        """Watches the parent of the widget and each of its ancestors so we
+           know when the widget is shown or hidden.
+        """
+        self.unwatch()
+
+        widget = self.widget
+        while isinstance(widget, Widget):
+            widget.bind(parent=self.moved)
+            self.watched.append(weakref.ref(widget))
+            widget = widget.parent
+
+    def unwatch(self):
+        for ref in self.watched:
+            widget = ref()
+            if widget is not None:
+                widget.unbind(parent=self.moved)
+        self.watched = []
+
+    def moved(self, *args):
+        # The widget may have been shown (or hidden) so the service may need
+        # to wake up sooner (or later).
+        self.watch()
+        self.service.schedule()
+
+    def next_boundary(self, whole, offset):
+        """Returns the time (unix timestamp) of the start of the next period
+           we're waiting for or None if the widget is hidden. whole is the
+           current second and offset the local time's offset from UTC.
+        """
+        if self.suspended:
+            return None
+
+        if self.period is None:
+            return whole + 1
+
+        boundary = (self.period + 1) * self.granularity - offset
+        return max(boundary, whole + 1)
+
+    def fire(self, second, when):
+        """Calls the callback if a new period has started. second is the
+           local time (seconds) of the tick.
+        """
+        if self.suspended:
+            # Make sure we're called as soon as we're shown again.
+            self.period = None
+            return
+
+        period = second // self.granularity
+        callback = self.callback
+        if period != self.period and callback is not None:
+            self.period = period
+            callback(when)
+
+
+class TickService(object):
+    """Calls subscribers at the start of each second, minute etc."""
+
+    def __init__(self):
+        self.ticks = []
+        self.event = None
+
+    def subscribe(self, callback, granularity=SECOND, widget=None):
+        """Calls callback at the start of every period of granularity
+           seconds (and on the next tick). The callback isn't called while
+           widget is hidden. Returns a Tick.
+        """
+        tick = Tick(self, callback, granularity, widget)
+        self.ticks.append(tick)
+        self.schedule()
+
+        return tick
+
+    def unsubscribe(self, tick):
+        if tick in self.ticks:
+            self.ticks.remove(tick)
+
+        # We may be able to sleep for longer (or not wake up at all)
+        self.schedule()
+
+    def prune(self):
+        """Drops subscriptions whose callback (or widget) has been deleted
+           without cancelling them.
+        """
+        for tick in [t for t in self.ticks if t.dead]:
+            tick.unwatch()
+            self.ticks.remove(tick)
+
+    def next_wake(self, now):
+        """Returns the time (unix timestamp) of the next boundary any
+           visible subscriber is waiting for or None if there isn't one.
+        """
+        self.prune()
+
+        whole = math.floor(now + EARLY)
+        offset = time.localtime(whole).tm_gmtoff
+
+        boundaries = [tick.next_boundary(whole, offset) for tick in self.ticks]
+        boundaries = [b for b in boundaries if b is not None]
+
+        return min(boundaries) if boundaries else None
+
+    def schedule(self, now=None):
+        """Sets the timer for just after the next boundary (or cancels it if
+           nobody needs waking).
+        """
+        if now is None:
+            now = time.time()
+
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+        wake = self.next_wake(now)
+        if wake is not None:
+            self.event = Clock.schedule_once(self.tick, wake + OFFSET - now)
+
+    def tick(self, *args):
+        self.event = None
+        now = time.time()
+        whole = math.floor(now + EARLY)
+
+        # Periods are counted in local time so minutes and five minutes line
+        # up with the clock on the wall.
+        second = whole + time.localtime(whole).tm_gmtoff
+        when = datetime.fromtimestamp(whole)
+
+        # Subscribers may cancel (or subscribe) while we're calling them.
+        for tick in list(self.ticks):
+            if tick in self.ticks:
+                tick.fire(second, when)
+
+        self.schedule()
+
+
+# The service is created the first time it's needed.
+_service = None
+
+
+def get_tick_service():
+    """Returns the shared TickService instance."""
+    global _service
+
+    if _service is None:
+        _service = TickService()
+
+    return _service
+
+
+def subscribe(callback, granularity=SECOND, widget=None):
+    """Subscribes callback to the shared TickService. See
+       TickService.subscribe.
+    """
+    return get_tick_service().subscribe(callback, granularity, widget)
@@ -59,19 +59,29 @@
     /api/configurations/notifications
     /api/configurations/notifications/state{/on or /off}
     /api/configurations/notifications/duration{/(int 0 to 600)}
+
+    [HOST]/api/profile
+        GET: returns JSON timeline of the boot process (if profiling is on)
+
+    [HOST]/api/profile/summary
+        GET: returns text summary of the boot process, slowest steps first
+
+    [HOST]/api/metrics{?format=prometheus}
+        GET: returns frame time, stall and callback time stats (if metrics
+             are on) as JSON or in Prometheus text format
 '''
 
 from threading import Thread
 from time import sleep
 import os
 import json
-import imp
 
 from kivy.app import App
 
 from bottle import Bottle, template, request, response
 
-from core.getplugins import getPlugins
+from core.metrics import metrics
+from core.profiler import tracer
 
 
 class InfoScreenAPI(Bottle):
@@ -117,6 +127,16 @@ class InfoScreenAPI(Bottle):
         self.route("/api/overlays/<overlay_name>/disable",
                    callback=self.disable_overlay)
 
+        self.route("/api/profile",
+                   callback=self.get_profile,
+                   method="GET")
+        self.route("/api/profile/summary",
+                   callback=self.get_profile_summary,
+                   method="GET")
+        self.route("/api/metrics",
+                   callback=self.get_metrics,
+                   method="GET")
+
     def api_success(self, data):
         """Base method for response to successful API calls."""
 
@@ -133,6 +153,32 @@ class InfoScreenAPI(Bottle):
         result = self.api_success(self.infoscreen.available_screens)
         return result
 
+    def get_profile(self):
+        """Method to retrieve the boot timeline."""
+        if not tracer.enabled:
+            return self.api_error("Boot profiling is not enabled.")
+
+        return self.api_success(tracer.timeline())
+
+    def get_profile_summary(self):
+        """Method to retrieve the boot summary as plain text."""
+        if not tracer.enabled:
+            return self.api_error("Boot profiling is not enabled.")
+
+        response.content_type = "text/plain"
+        return tracer.summary()
+
+    def get_metrics(self):
+        """Method to retrieve the frame time and callback stats."""
+        if not metrics.installed:
+            return self.api_error("Metrics are not enabled.")
+
+        if request.query.get("format") == "prometheus":
+            response.content_type = "text/plain; version=0.0.4"
+            return metrics.prometheus()
+
+        return self.api_success(metrics.as_dict())
+
     def get_config(self, screen):
         """Method to retrieve config file for screen."""
 
@@ -17,15 +17,14 @@ from threading import Thread
 from time import sleep
 import os
 import json
-import imp
 
 from kivy.app import App
 
 from bottle import Bottle, template, request, TEMPLATE_PATH, redirect
 import requests
 
-from core.getplugins import getPlugins
-from core.getoverlays import get_overlays
+from core import registry
+from core.registry import load_module
 from core.webapi import InfoScreenAPI
 
 HEADER = '''Raspberry Pi Information Screen<br />'''
@@ -90,11 +89,11 @@ class InfoScreenWebServer(Bottle):
         # Build a dictionary of screens, their current state and whether or not
         # they provide a custom screen
         self.screens = {s["name"]: {"web": s["web"], "enabled": s["enabled"]}
-                         for s in getPlugins(True)}
+                         for s in registry.screens.get(True)}
 
     def process_overlays(self):
         self.overlays = {s["name"]: {"web": s["web"], "enabled": s["enabled"]}
-                         for s in get_overlays(True)}
+                         for s in registry.overlays.get(True)}
 
     def add_custom_routes(self):
 
@@ -112,7 +111,7 @@ class InfoScreenWebServer(Bottle):
         for screen, addon in addons:
 
             # Load the module
-            plugin = imp.load_module("web", *addon)
+            plugin = load_module("screens.{}.web".format(screen), addon)
 
             # Loop over the list of web pages...
             for route in plugin.bindings:
@@ -129,7 +128,7 @@ class InfoScreenWebServer(Bottle):
         for overlay, addon in overlays:
 
             # Load the module
-            plugin = imp.load_module("web", *addon)
+            plugin = load_module("overlays.{}.web".format(overlay), addon)
 
             # Loop over the list of web pages...
             for route in plugin.bindings:
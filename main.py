@@ -3,67 +3,120 @@ import os
 import sys
 import json
 
-from kivy.app import App
-from kivymd.app import MDApp
-from kivy.core.window import Window
-from kivy.graphics import Rectangle, Color
-from kivy.lang import Builder
-from kivy.logger import Logger
-from kivy.properties import ListProperty, StringProperty
-from kivy.uix.screenmanager import ScreenManager, Screen
-from kivy.uix.behaviors import ButtonBehavior
-from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.label import Label
-from kivy.uix.scrollview import ScrollView
-
-from core.bglabel import BGLabel, BGLabelButton
-from core.getplugins import getPlugins
-from core.getoverlays import get_overlays
-from core.hiddenbutton import HiddenButton
-from core.infoscreen import InfoScreen
-
-# Set the current working directory
-os.chdir(os.path.dirname(os.path.abspath(sys.argv[0])))
-
 VERSION = "0.4.1"
 
-
-class InfoScreenApp(MDApp):
-    base = None
-
-    def __init__(self, **kwargs):
-        self.title = "My Material Application"
-        super().__init__(**kwargs)
-        self._config = config
-
-    def build(self):
-        # Window size is hardcoded for resolution of official Raspberry Pi
-        # display. Can be altered but plugins may not display correctly.
-        Window.size = (800, 480)
-        self.base = InfoScreen(plugins=plugins, overlays=overlays, config=config)
-        return self.base
-
-
+# Worker processes (e.g. the photo album's thumbnailer) are started with
+# "spawn", which imports this file again (as __mp_main__) in the new
+# process. They mustn't start Kivy (which would open another window) so
+# the app is only set up when this is run as a program.
 if __name__ == "__main__":
+    # The boot tracer needs to be imported first so it can time everything else
+    from core.profiler import tracer
+
+    from kivy.app import App
+    from kivymd.app import MDApp
+    from kivy.core.window import Window
+    from kivy.graphics import Rectangle, Color
+    from kivy.lang import Builder
+    from kivy.logger import Logger
+    from kivy.properties import ListProperty, StringProperty
+    from kivy.uix.screenmanager import ScreenManager, Screen
+    from kivy.uix.behaviors import ButtonBehavior
+    from kivy.uix.floatlayout import FloatLayout
+    from kivy.uix.boxlayout import BoxLayout
+    from kivy.uix.label import Label
+    from kivy.uix.scrollview import ScrollView
+    from kivy.clock import Clock
+
+    from core.bglabel import BGLabel, BGLabelButton
+    from core import registry
+    from core.fetch import get_fetch_service
+    from core.httpclient import get_http_client
+    from core.metrics import metrics
+    from core.hiddenbutton import HiddenButton
+    from core.infoscreen import InfoScreen
+
+    # Set the current working directory
+    os.chdir(os.path.dirname(os.path.abspath(sys.argv[0])))
+
+
+    class InfoScreenApp(MDApp):
+        base = None
+
+        def __init__(self, **kwargs):
+            self.title = "My Material Application"
+            super().__init__(**kwargs)
+            self._config = config
+
+        def build(self):
+            # Window size is hardcoded for resolution of official Raspberry Pi
+            # display. Can be altered but plugins may not display correctly.
+            Window.size = (800, 480)
+            with tracer.span("build InfoScreen", "main"):
+                self.base = InfoScreen(plugins=plugins, overlays=overlays,
+                                       config=config)
+            return self.base
+
+        def on_start(self):
+            # Stop the boot tracer once the first frame has been drawn
+            Clock.schedule_once(self.boot_finished, 0)
+
+        def boot_finished(self, *args):
+            tracer.finish(os.path.dirname(os.path.abspath(__file__)))
+
+        def on_pause(self):
+            # Stop the current screen's timers etc. while we're paused
+            self.base.suspend()
+            return True
+
+        def on_resume(self):
+            self.base.resume()
+
+        def on_stop(self):
+            # Drop any background fetches that haven't started yet.
+            get_fetch_service().shutdown()
+
+            # and close any open web connections.
+            get_http_client().close()
+
+
+    tracer.mark("imports done", "main")
+
     # Load our config
     with open("config.json", "r") as cfg_file:
         config = json.load(cfg_file)
 
+    # Do we want to trace the boot process?
+    if config.get("profiler", dict()).get("enabled", False):
+        tracer.enable()
+
+    # Do we want to measure callback times and main loop stalls?
+    metrics_config = config.get("metrics", dict())
+    if metrics_config.get("enabled", False):
+        metrics.stall_threshold = metrics_config.get("stall_threshold",
+                                                     metrics.stall_threshold)
+        metrics.install()
+
     # Get a list of installed plugins and overlays
-    plugins = getPlugins()
-    overlays = get_overlays()
+    with tracer.span("discover plugins", "main"):
+        plugins = registry.screens.get()
+        overlays = registry.overlays.get()
 
     # Load the master KV file
-    Builder.load_file("base.kv")
+    with tracer.span("base.kv", "kv"):
+        Builder.load_file("base.kv")
 
-    # Loop over the plugins and add to Builder
-    for p in plugins:
-        Builder.load_file(p["kvpath"])
+    # Loop over the plugins and add to Builder (unless we're loading screens
+    # lazily in which case the KV file is loaded when the screen is built)
+    if not config.get("lazy_load", dict()).get("enabled", False):
+        for p in plugins:
+            with tracer.span(p["kvpath"], "kv"):
+                Builder.load_file(p["kvpath"])
 
     # Loop over the overlays and add to Builder
     for w in overlays:
-        Builder.load_file(w['kvpath'])
+        with tracer.span(w["kvpath"], "kv"):
+            Builder.load_file(w['kvpath'])
 
     # Do we want a webserver?
     web = config.get("webserver", dict())
@@ -86,10 +139,11 @@ if __name__ == "__main__":
         webport = web.get("webport", web.get("webport"))
         apiport = web.get("apiport", web.get("apiport"))
         debug = web.get("debug", False)
-        start_web_server(os.path.dirname(os.path.abspath(__file__)),
-                         webport,
-                         apiport,
-                         debug)
+        with tracer.span("start web server", "main"):
+            start_web_server(os.path.dirname(os.path.abspath(__file__)),
+                             webport,
+                             apiport,
+                             debug)
 
     # Good to go. Let's start the app.
     InfoScreenApp().run()
@@ -2,9 +2,10 @@ import time
 
 from kivy.uix.label import Label
 from kivy.uix.relativelayout import RelativeLayout
-from kivy.properties import StringProperty
+from kivy.properties import NumericProperty, StringProperty
 from kivy.core.window import Window
-from kivy.clock import Clock
+
+from core.ticker import subscribe, MINUTE
 
 
 class BlackHole(object):
@@ -19,10 +20,21 @@ class ClockOverlay(RelativeLayout, BlackHole):
 
     """
     clock_overlay_text = StringProperty()
+    clock_format = StringProperty("12h")
+    icon_size_percent = NumericProperty(5)
 
     def __init__(self, params, **kwargs):
         super(ClockOverlay, self).__init__(**kwargs)
 
+        # strftime template for the overlay. It's only rebuilt when the
+        # config (or the window size) changes, not every time the clock is
+        # redrawn.
+        self.template = None
+
+        # Number of times the text has actually changed (each change means
+        # the label's texture is drawn again)
+        self.redraws = 0
+
         self.clock_format = params['clock_format']
         self.icon_size_percent = params['icon_size_percent']
 
@@ -32,26 +44,52 @@ class ClockOverlay(RelativeLayout, BlackHole):
         # print("x_pos", self.x_pos)
         # self.pos = (self.x_pos, 20)
 
-        self.icon_size = [size_val * self.icon_size_percent / 100 for size_val in Window.size]
-        self.clock_overlay_text = self._get_current_date()
+        self.bind(clock_format=self.build_template,
+                  icon_size_percent=self.build_template)
+        Window.bind(size=self.build_template)
+        self.build_template()
 
-        self.clock_refresh_rate = 1  # seconds
-        self.clk = Clock.schedule_interval(self.update_time, int(self.clock_refresh_rate))
+        # The overlay only shows hours and minutes so it only needs to be
+        # redrawn when the minute changes.
+        self.clock_refresh_rate = MINUTE
+        self.clk = subscribe(self.update_time, self.clock_refresh_rate)
 
-    def _get_current_date(self):
+    def build_template(self, *args):
         """
-            Return the current data with the desired configuration
+            Build the strftime template with the desired configuration
         """
+        self.icon_size = [size_val * self.icon_size_percent / 100 for size_val in Window.size]
+
         if '24h' in self.clock_format:
-            date_str = '[color=FFFFFF][b][size={}]%H:%M[/size]\n[size={}]%a, %d %B[/size][/color][/b]'.format(
+            self.template = '[color=FFFFFF][b][size={}]%H:%M[/size]\n[size={}]%a, %d %B[/size][/color][/b]'.format(
                 int(self.icon_size[0]), int(self.icon_size[1]))
         else:
-            date_str = '[color=FFFFFF][b][size={}]%I:%M[/size][size={}] %p[/size]\n[size=25]%a, %d %B[/size][/b][/color]'.format(
+            self.template = '[color=FFFFFF][b][size={}]%I:%M[/size][size={}] %p[/size]\n[size=25]%a, %d %B[/size][/b][/color]'.format(
                 int(self.icon_size[0]), int(self.icon_size[1]))
-        return time.strftime(date_str)
 
-    def update_time(self, dt):
+        self.update_time()
+
+    def _get_current_date(self, when=None):
+        """
+            Return the current data with the desired configuration
+        """
+        if when is None:
+            return time.strftime(self.template)
+
+        return when.strftime(self.template)
+
+    def update_time(self, when=None):
         """
             This function does the update of the time on screen
         """
-        self.clock_overlay_text = self._get_current_date()
+        text = self._get_current_date(when)
+
+        # Don't touch the label (and make it lay itself out again) unless
+        # the time it shows has changed.
+        if text != self.clock_overlay_text:
+            self.clock_overlay_text = text
+            self.redraws += 1
+
+    def unload(self):
+        self.clk.cancel()
+        Window.unbind(size=self.build_template)
@@ -8,6 +8,7 @@ from datetime import timedelta, datetime
 from datetime import time as dt_time
 from itertools import groupby
 
+from kivy.clock import Clock
 from kivy.properties import (StringProperty,
                              ListProperty,
                              ObjectProperty)
@@ -17,6 +18,8 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.screenmanager import Screen
 
+from core.fetch import fetch
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from apiclient import discovery
@@ -110,6 +113,7 @@ class AgendaScreen(Screen, BlackHole):
         self.calendar = None
         self.calendarlist = []
         self.timer = None
+        self.job = None
 
     def on_enter(self):
         # Script isn't running yet, so do a first run
@@ -120,8 +124,22 @@ class AgendaScreen(Screen, BlackHole):
         # Set a clock schedule
         self.timer = Clock.schedule_interval(self.update, 15 * 60)
 
+    def on_leave(self):
+        Clock.unschedule(self.timer)
+        if self.job:
+            self.job.cancel()
+
     def update(self, *args):
+        # Talking to Google can be slow so do it in the background.
+        if self.job and self.job.active:
+            return
 
+        self.job = fetch(self.getEvents, on_result=self.drawCalendars)
+
+    def getEvents(self):
+        """Method to retrieve the events for all calendars. Runs in a worker
+           thread so mustn't touch any widgets.
+        """
         # Try and authorise the machine
         if not self.credentials:
             self.credentials = get_credentials()
@@ -136,9 +154,11 @@ class AgendaScreen(Screen, BlackHole):
             # Get the calendars
             self.calendarlist = self.getCalendars()
 
-            # If we've got calendars, display them
+            # If we've got calendars, get their events
             if self.calendarlist:
-                self.drawCalendars()
+                return self.loadEvents()
+
+        return None
 
     def getCalendars(self):
         """Method to retrieve list of available calendars on Google account.
@@ -258,13 +278,10 @@ class AgendaScreen(Screen, BlackHole):
 
         return ordered_events
 
-    def drawCalendars(self):
-        """Method to draw the Calendar on the screen."""
+    def loadEvents(self):
+        """Method to get the events for each calendar."""
         all_events = []
 
-        # Clear the screen to prevent duplication
-        self.calendar_grid.clear_widgets()
-
         time_now = datetime.utcnow()
         end_time = time_now + timedelta(self.max_days)
 
@@ -302,7 +319,18 @@ class AgendaScreen(Screen, BlackHole):
                 all_events += self.parseEvent(cal_event, fg, bg)
 
         # Sort and group the events
-        ordered_events = self.orderEvents(all_events)
+        return time_now, end_time, self.orderEvents(all_events)
+
+    def drawCalendars(self, events):
+        """Method to draw the Calendar on the screen."""
+        # Nothing to show if we couldn't get any calendars
+        if not events:
+            return
+
+        time_now, end_time, ordered_events = events
+
+        # Clear the screen to prevent duplication
+        self.calendar_grid.clear_widgets()
 
         # Loop over the grops
         for day in ordered_events:
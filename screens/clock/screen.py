@@ -1,10 +1,11 @@
 from datetime import datetime
 
 from kivy.properties import DictProperty
-from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
 from kivy.uix.floatlayout import FloatLayout
 
+from core.ticker import subscribe, SECOND
+
 class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
@@ -31,11 +32,12 @@ class ClockScreen(Screen, BlackHole):
 
     def on_enter(self):
         # We only need to update the clock every second.
-        self.timer = Clock.schedule_interval(self.update, 1)
+        self.timer = subscribe(self.update, SECOND, widget=self)
 
     def on_pre_enter(self):
         self.get_time()
 
     def on_pre_leave(self):
         # Save resource by unscheduling the updates.
-        Clock.unschedule(self.timer)
+        if self.timer:
+            self.timer.cancel()
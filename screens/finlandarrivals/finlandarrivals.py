@@ -3,8 +3,8 @@ from the digitransit.fi  website and turn it into a structure that can then
 be used by other python codes.
 """
 
-# Simple way of submitting web requests (easier to use than urllib2)
-import requests
+# Shared web client (keeps connections open between requests)
+from core.httpclient import http_post
 
 # We need json to turn the JSON response into a python dict/list
 import json
@@ -42,7 +42,7 @@ data = \
 
 def __getBusData(stopcode):
     # Add the stop code to the web address and get the page
-    r = requests.post(BASE_URL, data=data%stopcode, headers={"Content-type": "application/graphql"})
+    r = http_post(BASE_URL, data=data%stopcode, headers={"Content-type": "application/graphql"})
 
     # If the request was ok
     if r.status_code == 200:
@@ -6,12 +6,15 @@ from datetime import datetime
 from kivy.clock import Clock
 from kivy.uix.label import Label
 from kivy.uix.togglebutton import ToggleButton
-from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.stacklayout import StackLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.properties import StringProperty, DictProperty
 
+from core.fetch import fetch
+from core.lifecycle import LifecycleScreen
+from core.ticker import SECOND
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import finlandarrivals as HB
@@ -50,7 +53,7 @@ class FinlandArrivals(BoxLayout):
         self.bus_delay = bus["delay"]
 
 
-class FinlandArrivalsStop(Screen):
+class FinlandArrivalsStop(LifecycleScreen):
     """Custom screen class for showing countdown information for a specific
        bus stop.
     """
@@ -72,38 +75,47 @@ class FinlandArrivalsStop(Screen):
         self.description = self.stop["description"]
         self.filters = None
         self.get_time()
-        self.stimer = None
-
-    def on_pre_enter(self):
-        self.get_time()
+        self.job = None
+        self.first = None
 
-    def on_enter(self):
-        # Refresh the information when we load the screen
-        Clock.schedule_once(self.get_buses, 0.5)
+        # While the stop is shown we update the arrivals every few seconds
+        # and the clock every second.
+        self.timer = self.add_interval(self.get_buses, 3)
+        self.stimer = self.add_tick(self.update, SECOND)
+        self.add_service(self.start_updates, self.stop_updates)
 
-        # and schedule updates every 30 seconds.
-        self.timer = Clock.schedule_interval(self.get_buses, 3)
-        # We only need to update the clock every second.
-        self.stimer = Clock.schedule_interval(self.update, 1)
-
-
-    def on_pre_leave(self):
-        # Save resource by unscheduling the updates.
-        Clock.unschedule(self.stimer)
+    def start_updates(self):
+        # Refresh the information when we show the screen
+        self.get_time()
+        self.first = Clock.schedule_once(self.get_buses, 0.5)
 
-    def on_leave(self):
-        # Save resource by removing schedule
-        Clock.unschedule(self.timer)
+    def stop_updates(self):
+        self.first.cancel()
+        if self.job:
+            self.job.cancel()
 
     def get_buses(self, *args):
         """Starts the process of retrieving countdown information."""
+        # We poll every few seconds so don't queue up another request if the
+        # last one is still running.
+        if self.job and self.job.active:
+            return
+
+        self.job = fetch(self.fetch_buses, on_result=self.show_buses)
+
+    def fetch_buses(self):
+        """Retrieves the countdown information. Runs in a worker thread."""
         try:
             # Load the bus data.
-            self.buses = HB.BusLookup(self.stop["stopid"])
+            return HB.BusLookup(self.stop["stopid"])
         except:
             # If there's an error (e.g. no internet connection) then we have
             # no bus data.
-            self.buses = None
+            return None
+
+    def show_buses(self, buses):
+        """Updates the screen with the countdown information."""
+        self.buses = buses
 
         if self.buses:
             # We've got bus data so let's update the screen.
@@ -177,7 +189,7 @@ class FinlandArrivalsStop(Screen):
                         if tb.state == "down"]
         self.draw_buses()
 
-class FinlandArrivalsScreen(Screen, BlackHole):
+class FinlandArrivalsScreen(LifecycleScreen, BlackHole):
     """Base screen object for Finland Public transports.
 
     Has a screenmanager to hold screens for specific bus stops.
@@ -193,29 +205,16 @@ class FinlandArrivalsScreen(Screen, BlackHole):
         self.scrid = 0
         self.myscreens = [str(x["stopid"]) for x in self.stops]
 
-    def on_enter(self):
+    def on_activate(self):
         # If this is the first time we've come across the screen then we need
-        # to set up a sub-screen for each bus stop.
+        # to set up a sub-screen for each bus stop. The stop that's shown is
+        # activated (and deactivated) along with this screen.
         if not self.running:
             for stop in self.stops:
                 nm = str(stop["stopid"])
                 self.scrmgr.add_widget(FinlandArrivalsStop(stop=stop, name=nm))
             self.running = True
 
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.scrmgr.children:
-                if c.name == self.scrmgr.current:
-                    c.on_enter()
-
-    def on_leave(self):
-        # Fixes bug where nested screens don't have "on_enter" or
-        # "on_leave" methods called.
-        for c in self.scrmgr.children:
-            if c.name == self.scrmgr.current:
-                c.on_leave()
-
     def next_screen(self, rev=True):
         a = self.myscreens
         n = -1 if rev else 1
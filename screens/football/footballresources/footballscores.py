@@ -15,16 +15,94 @@
 '''
 
 import string
-from bs4 import BeautifulSoup
 import re
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 import json
 import codecs
 import requests
 import socket
+from threading import RLock
+from time import monotonic
+
+from core.cache import get_cache
+from core.httpclient import http_get
+
+from .parsers import (parseLiveScores, parseIncidents, parseBadges,
+                      parseFilter, parseLeagueTables, parseFixtureTables)
+
+try:
+    from zoneinfo import ZoneInfo
+    UK_TIMEZONE = ZoneInfo("Europe/London")
+except Exception:
+    UK_TIMEZONE = None
 
 __version__ = "0.3.0"
 
+# Key used to save today's team index in the cache
+TEAM_INDEX_KEY = "football:teamindex"
+
+# Types of match event
+EVENT_GOAL = "goal"
+EVENT_KICK_OFF = "kickoff"
+EVENT_HALF_TIME = "halftime"
+EVENT_FULL_TIME = "fulltime"
+EVENT_YELLOW_CARD = "yellowcard"
+EVENT_RED_CARD = "redcard"
+EVENT_NEW_MATCH = "newmatch"
+
+# How often to check for events (seconds) when there's a live match...
+LIVE_INTERVAL = 30
+
+# ...and the longest we wait when there are matches still to kick off
+IDLE_INTERVAL = 15 * 60
+
+# Number of recent events to keep for web clients
+MAX_EVENTS = 100
+
+
+def ukNow():
+    '''Returns the current time in the UK (as used by the BBC pages) as a
+    naive datetime. Falls back to UTC if the time zone isn't available.
+    '''
+    if UK_TIMEZONE is not None:
+        return datetime.now(UK_TIMEZONE).replace(tzinfo=None)
+    else:
+        return datetime.utcnow()
+
+
+def ukToday():
+    '''Returns today's date in the UK as a string.'''
+    return ukNow().strftime("%Y-%m-%d")
+
+
+def matchStatus(match):
+    '''Returns a tuple of (status, match time) for a match row.
+
+    status is one of "Fixture", "L", "HT" or "FT". The match time is the
+    kick off time for fixtures and the elapsed time for live matches.
+    '''
+    if "fixture" in match["classes"]:
+        return "Fixture", match["elapsed"][:5]
+
+    elif "report" in match["classes"]:
+        return "FT", None
+
+    elif match["elapsed"] == "Half Time":
+        return "HT", None
+
+    else:
+        return "L", match["elapsed"]
+
+
+def matchScore(match):
+    '''Returns a tuple of (home score, away score) for a match row.'''
+    score = match["score"].split(" - ")
+
+    try:
+        return int(score[0].strip()), int(score[1].strip())
+    except:
+        return 0, 0
+
 
 class matchcommon(object):
     '''class for common functions for match classes.'''
@@ -32,6 +110,9 @@ class matchcommon(object):
     livescoreslink = ("http://www.bbc.co.uk/sport/shared/football/"
                       "live-scores/matches/{comp}/today")
 
+    detailprefix = ("http://www.bbc.co.uk/sport/football/live/"
+                    "partial/{id}")
+
     def getPage(self, url, sendresponse=False):
         # page = None
         # try:
@@ -50,7 +131,7 @@ class matchcommon(object):
         #     # Fixed this line to handle accented team namess
         #     return codecs.decode(page, "utf-8") if page else None
         try:
-            r = requests.get(url, timeout=2)
+            r = http_get(url, timeout=2)
         # requests timeout doesn'r catch socket.timeout so we need to catch
         # both explicitly
         except (socket.timeout, requests.Timeout, requests.ConnectionError):
@@ -62,6 +143,473 @@ class matchcommon(object):
             return None
 
 
+class Scoreboard(matchcommon):
+    '''Shared store of today's live scores pages.
+
+    All FootballMatch and League objects get their data from here so that
+    each competition page is downloaded and parsed at most once per update
+    cycle, however many teams and leagues are being followed.
+
+    The scoreboard also keeps an index of which competition each team is
+    playing in today so that finding a team doesn't need every competition
+    page to be checked by every team. The index is built once a day and
+    saved in the cache so it survives a restart. Teams that aren't in
+    today's index aren't playing so they cost no requests at all until the
+    index expires at midnight (UK time).
+    '''
+
+    # Pages are reused for this many seconds
+    cycle = 20
+
+    def __init__(self):
+        self.lock = RLock()
+
+        # League id -> dict of parsed page (see __fetch)
+        self.pages = {}
+
+        # Team name -> league id
+        self.index = {}
+
+        # League id -> league name (for today's active leagues)
+        self.names = {}
+
+        # UK date of the index (None if we haven't got a full index yet)
+        self.indexday = None
+
+        # Time of the last attempt to build the index
+        self.indextime = None
+
+        # Teams we know aren't playing today
+        self.nomatch = set()
+
+        # Match id -> (time, list of incidents)
+        self.incidents = {}
+
+    def __expired(self, timestamp):
+        return timestamp is None or monotonic() - timestamp > self.cycle
+
+    def __fetch(self, league):
+        '''Downloads and parses the page for the league.'''
+        page = self.getPage(self.livescoreslink.format(comp=league))
+
+        if not page:
+            return None
+
+        parsed = parseLiveScores(page)
+
+        if parsed is None:
+            return None
+
+        teams = []
+        for match in parsed["matches"]:
+            teams += [match["hometeam"], match["awayteam"]]
+
+        return {"data": parsed["matches"],
+                "name": parsed["name"],
+                "leagues": parsed["leagues"],
+                "teams": teams,
+                "time": monotonic()}
+
+    def getCompetition(self, league):
+        '''Returns the parsed page for the league (or None if it couldn't
+        be loaded). The dict has the following keys:
+
+          data: list of today's matches (see parsers.parseMatchRow)
+          name: the name of the league
+          leagues: list of (league id, name) of today's active leagues
+          teams: list of teams playing in the league today
+        '''
+        with self.lock:
+            comp = self.pages.get(league)
+
+            if comp is None or self.__expired(comp["time"]):
+                comp = self.__fetch(league)
+
+                if comp:
+                    self.pages[league] = comp
+                else:
+                    self.pages.pop(league, None)
+
+            return comp
+
+    def getIncidents(self, matchid):
+        '''Returns the list of incidents (goals, cards) for the match (see
+        parsers.parseIncidents) or None if they couldn't be loaded.
+        '''
+        with self.lock:
+            cached = self.incidents.get(matchid)
+
+            if cached is None or self.__expired(cached[0]):
+                page = self.getPage(self.detailprefix.format(id=matchid))
+
+                if not page:
+                    self.incidents.pop(matchid, None)
+                    return None
+
+                cached = (monotonic(), parseIncidents(page))
+                self.incidents[matchid] = cached
+
+            return cached[1]
+
+    def __buildIndex(self, today):
+        '''Loads every active league to find out who's playing where.'''
+        self.indextime = monotonic()
+        livescores = self.getCompetition("")
+
+        # Keep the old index if we can't get a new one
+        if not livescores:
+            return
+
+        index = {}
+        names = {}
+        complete = True
+
+        for leagueid, leaguename in livescores["leagues"]:
+            names[leagueid] = leaguename
+            comp = self.getCompetition(leagueid)
+
+            if comp:
+                for team in comp["teams"]:
+                    index.setdefault(team, leagueid)
+            else:
+                complete = False
+
+        self.index = index
+        self.names = names
+
+        # We can only rule teams out if we managed to load every league
+        if complete:
+            self.indexday = today
+            get_cache().set(TEAM_INDEX_KEY, {"date": today,
+                                             "teams": index,
+                                             "names": names})
+
+    def __loadIndex(self, today):
+        '''Loads today's index from the cache (if it's been saved).'''
+        cached = get_cache().get(TEAM_INDEX_KEY)
+
+        if cached and cached[0].get("date") == today:
+            self.index = cached[0]["teams"]
+            self.names = cached[0]["names"]
+            self.indexday = today
+
+    def __checkIndex(self):
+        '''Makes sure we've got an index for today.'''
+        today = ukToday()
+
+        # It's a new day so everything needs checking again
+        if self.indexday is not None and self.indexday != today:
+            self.index = {}
+            self.names = {}
+            self.indexday = None
+            self.indextime = None
+            self.nomatch = set()
+            self.incidents = {}
+
+        if self.indexday is None and self.indextime is None:
+            self.__loadIndex(today)
+
+        # If the index is incomplete, try again after the cycle
+        if self.indexday is None and self.__expired(self.indextime):
+            self.__buildIndex(today)
+
+    def getLeagues(self):
+        '''Returns list of (league id, name) of today's active leagues.'''
+        livescores = self.getCompetition("")
+        return livescores["leagues"] if livescores else []
+
+    def getTeams(self):
+        '''Returns list of teams playing today.'''
+        with self.lock:
+            self.__checkIndex()
+
+            return list(self.index)
+
+    def findTeam(self, team):
+        '''Looks for the team in today's matches.
+
+        Returns a tuple of (league id, league name, parsed page) or None if
+        the team isn't playing today.
+        '''
+        with self.lock:
+            self.__checkIndex()
+
+            if team in self.nomatch:
+                return None
+
+            leagueid = self.index.get(team)
+
+            if leagueid is None:
+                # Our index has every league so the team isn't playing
+                if self.indexday is not None:
+                    self.nomatch.add(team)
+                return None
+
+            comp = self.getCompetition(leagueid)
+
+            if not comp:
+                return None
+
+            # The match has been removed (e.g. postponed)
+            if team not in comp["teams"]:
+                if self.indexday is not None:
+                    self.nomatch.add(team)
+                return None
+
+            return leagueid, self.names.get(leagueid), comp
+
+
+# The scoreboard shared by all matches and leagues
+scoreboard = Scoreboard()
+
+
+class MatchStore(object):
+    '''Keeps the latest state of the matches being followed and works out
+    what has changed between updates.
+
+    Rather than every screen comparing whole pages, poll() loads the pages
+    for the followed teams and leagues (via the shared scoreboard), compares
+    each match with its previous state and returns a list of events. Each
+    event is a dict with the following keys:
+
+      type: one of the EVENT_ constants
+      sequence: increasing event number
+      matchid, league, hometeam, awayteam, homescore, awayscore, status
+      side: "home" or "away" for goals and cards (otherwise None)
+
+    The most recent events are kept so web clients can ask for anything
+    they've missed (see recentEvents).
+
+    nextInterval() says how long to wait before polling again: every
+    LIVE_INTERVAL seconds while a match is live, up to IDLE_INTERVAL while
+    waiting for kick off and not at all (until midnight) once everything
+    has finished. If a league couldn't be loaded we keep its last known
+    matches and try again within IDLE_INTERVAL.
+    '''
+
+    def __init__(self):
+        self.lock = RLock()
+
+        # Team name/league id -> number of followers
+        self.teams = {}
+        self.leagues = {}
+
+        # Match id -> last known state
+        self.states = {}
+
+        # Recent events
+        self.events = []
+        self.sequence = 0
+
+        # Did any of the leagues fail to load on the last poll?
+        self.failed = False
+
+    def follow(self, team=None, league=None):
+        with self.lock:
+            if team:
+                self.teams[team] = self.teams.get(team, 0) + 1
+            if league:
+                self.leagues[league] = self.leagues.get(league, 0) + 1
+
+    def unfollow(self, team=None, league=None):
+        with self.lock:
+            for key, followed in ((team, self.teams), (league, self.leagues)):
+                if key in followed:
+                    followed[key] -= 1
+                    if followed[key] <= 0:
+                        del followed[key]
+
+    def __getState(self, league, match, detailed):
+        '''Returns the state of a match.'''
+        status, matchtime = matchStatus(match)
+        homescore, awayscore = matchScore(match)
+
+        state = {"matchid": match["id"],
+                 "league": league,
+                 "hometeam": match["hometeam"],
+                 "awayteam": match["awayteam"],
+                 "homescore": homescore,
+                 "awayscore": awayscore,
+                 "status": status,
+                 "matchtime": matchtime,
+                 "cards": None}
+
+        # Cards are only on the match page so we only check them for the
+        # teams we're following
+        if detailed and status in ("L", "HT"):
+            incidents = scoreboard.getIncidents(match["id"])
+            if incidents is not None:
+                cards = {}
+                for incident in incidents:
+                    for card in ("yellow-card", "red-card"):
+                        if card in incident["types"]:
+                            side = "home" if incident["home"] else "away"
+                            cards[(card, side)] = cards.get((card, side),
+                                                            0) + 1
+                state["cards"] = cards
+
+        return state
+
+    def __compare(self, old, new):
+        '''Returns a list of (event type, side) for the changes between the
+        old and new states of a match.
+        '''
+        changes = []
+
+        if new["status"] != old["status"]:
+            if new["status"] == "L":
+                changes.append((EVENT_KICK_OFF, None))
+            elif new["status"] == "HT":
+                changes.append((EVENT_HALF_TIME, None))
+            elif new["status"] == "FT":
+                changes.append((EVENT_FULL_TIME, None))
+
+        if new["homescore"] > old["homescore"]:
+            changes.append((EVENT_GOAL, "home"))
+        if new["awayscore"] > old["awayscore"]:
+            changes.append((EVENT_GOAL, "away"))
+
+        if new["cards"] is not None and old["cards"] is not None:
+            for card, event in (("yellow-card", EVENT_YELLOW_CARD),
+                                ("red-card", EVENT_RED_CARD)):
+                for side in ("home", "away"):
+                    if (new["cards"].get((card, side), 0) >
+                            old["cards"].get((card, side), 0)):
+                        changes.append((event, side))
+
+        # Keep the last known cards if we couldn't load them this time
+        elif new["cards"] is None:
+            new["cards"] = old["cards"]
+
+        return changes
+
+    def __makeEvent(self, eventtype, state, side=None):
+        self.sequence += 1
+        return {"type": eventtype,
+                "sequence": self.sequence,
+                "matchid": state["matchid"],
+                "league": state["league"],
+                "hometeam": state["hometeam"],
+                "awayteam": state["awayteam"],
+                "homescore": state["homescore"],
+                "awayscore": state["awayscore"],
+                "status": state["status"],
+                "side": side}
+
+    def poll(self):
+        '''Checks the followed teams and leagues for changes. Returns a list
+        of new events.
+
+        This downloads pages so it must not be run on the main thread.
+        '''
+        with self.lock:
+            teams = list(self.teams)
+            leagues = dict((league, False) for league in self.leagues)
+
+        # Find which leagues our teams are playing in (this doesn't cost any
+        # requests once we've got today's index)
+        for team in teams:
+            found = scoreboard.findTeam(team)
+            if found:
+                leagues[found[0]] = True
+
+        states = {}
+        failed = set()
+        for league, hasteams in leagues.items():
+            comp = scoreboard.getCompetition(league)
+
+            if not comp:
+                failed.add(league)
+                continue
+
+            for match in comp["data"]:
+                detailed = hasteams and (match["hometeam"] in teams or
+                                         match["awayteam"] in teams)
+                states[match["id"]] = self.__getState(league, match, detailed)
+
+        events = []
+
+        with self.lock:
+            polled = set(s["league"] for s in self.states.values())
+
+            for matchid, state in states.items():
+                old = self.states.get(matchid)
+
+                if old is None:
+                    # A match has appeared in a league we were already
+                    # watching
+                    if state["league"] in polled:
+                        events.append(self.__makeEvent(EVENT_NEW_MATCH,
+                                                       state))
+                    continue
+
+                for eventtype, side in self.__compare(old, state):
+                    events.append(self.__makeEvent(eventtype, state, side))
+
+            # Keep what we knew about the leagues we couldn't load so a
+            # network blip doesn't lose the matches (or stop the polling)
+            for matchid, state in self.states.items():
+                if state["league"] in failed:
+                    states[matchid] = state
+
+            self.states = states
+            self.failed = bool(failed)
+            self.events = (self.events + events)[-MAX_EVENTS:]
+
+        return events
+
+    def recentEvents(self, since=0):
+        '''Returns the recent events with a sequence number above since.'''
+        with self.lock:
+            return [e for e in self.events if e["sequence"] > since]
+
+    def isLive(self):
+        '''Returns True if any of the matches being followed are live.'''
+        with self.lock:
+            return any(s["status"] in ("L", "HT")
+                       for s in self.states.values())
+
+    def nextInterval(self):
+        '''Returns the number of seconds until the next poll.'''
+        now = ukNow()
+
+        with self.lock:
+            states = list(self.states.values())
+            failed = self.failed
+
+        if any(s["status"] in ("L", "HT") for s in states):
+            return LIVE_INTERVAL
+
+        # Wait for the next kick off
+        kickoffs = []
+        for state in states:
+            if state["status"] == "Fixture":
+                try:
+                    kickoff = datetime.strptime(state["matchtime"], "%H:%M")
+                    kickoffs.append(datetime.combine(now.date(),
+                                                     kickoff.time()))
+                except (TypeError, ValueError):
+                    # We don't know when it starts so keep checking
+                    return IDLE_INTERVAL
+
+        if kickoffs:
+            wait = (min(kickoffs) - now).total_seconds()
+            return int(min(max(wait, LIVE_INTERVAL), IDLE_INTERVAL))
+
+        # We couldn't load everything last time so try again soon
+        if failed:
+            return IDLE_INTERVAL
+
+        # Everything has finished (or there aren't any matches) so there's
+        # nothing to do until tomorrow's matches appear
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), time(0, 5))
+        return int((tomorrow - now).total_seconds())
+
+
+# The match store shared by the football screens and the web interface
+matchstore = MatchStore()
+
+
 class FootballMatch(matchcommon):
     '''Class for getting details of individual football matches.
     Data is pulled from BBC live scores page.
@@ -69,9 +617,6 @@ class FootballMatch(matchcommon):
     # self.accordionlink = ("http://polling.bbc.co.uk/sport/shared/football/"
     #                       "accordion/partial/collated")
 
-    detailprefix = ("http://www.bbc.co.uk/sport/football/live/"
-                    "partial/{id}")
-
     def __init__(self, team, detailed=False, data=None):
         '''Creates an instance of the Match object.
         Must be created by passing the name of one team.
@@ -154,134 +699,82 @@ class FootballMatch(matchcommon):
         self.leagueid = None
 
     def __findMatch(self):
-        leaguepage = self.getPage(self.livescoreslink.format(comp=""))
         data = None
         teamfound = False
 
-        if leaguepage:
-
-            # Start with the default page so we can get list of active leagues
-            raw = BeautifulSoup(leaguepage)
-
-            # Find the list of active leagues
-            active = {"class": "drop-down-filter live-scores-fixtures"}
-            selection = raw.find("div", active)
-
-            # Loop throught the active leagues
-            for option in selection.findAll("option"):
-
-                # Build the link for that competition
-                league = option.get("value")[12:]
-
-                if league:
-                    scorelink = self.livescoreslink.format(comp=league)
-
-                    scorepage = self.getPage(scorelink)
-
-                    if scorepage:
-                        # Prepare to process page
-                        optionhtml = BeautifulSoup(scorepage)
+        # The scoreboard knows which competition our team is playing in
+        found = scoreboard.findTeam(self.myteam)
 
-                        # We just want the live games...
-                        liveid = {"id": "matches-wrapper"}
-                        live = optionhtml.find("div", liveid)
+        if found:
+            league, competition, comp = found
 
-                        # Let's look for our team
-                        if live.find(text=self.myteam):
-                            teamfound = True
-                            self.scorelink = scorelink
-                            self.competition = option.text.split("(")[0]
-                            self.competition = self.competition.strip()
-                            self.leagueid = league
-                            data = live
-                            break
+            # Let's check our team is in the data
+            live = comp["data"]
+            if self.__findRow(live):
+                teamfound = True
+                self.scorelink = self.livescoreslink.format(comp=league)
+                self.competition = competition
+                self.leagueid = league
+                data = live
 
         self.matchfound = teamfound
 
         return data
 
-    def __getScores(self, data, update=False):
-
-        for match in data.findAll("tr", {"id": re.compile(r'^match-row')}):
-            if match.find(text=self.myteam):
-
-                ht = {"class": "team-home"}
-                at = {"class": "team-away"}
-
-                self.hometeam = match.find("span", ht).text
-
-                self.awayteam = match.find("span", at).text
-
-                linkrow = match.find("td", {"class": "match-link"})
-                try:
-                    link = linkrow.find("a").get("href")
-                    self.matchlink = "http://www.bbc.co.uk%s" % (link)
-                except AttributeError:
-                    self.matchlink = None
-
-                mclass = {"class": "elapsed-time"}
+    def __findRow(self, data):
+        '''Returns the dict for our team's match (or None).'''
+        for match in data or []:
+            if self.myteam in (match["hometeam"], match["awayteam"]):
+                return match
 
-                if match.get("class") == "fixture":
-                    status = "Fixture"
-                    matchtime = match.find("span", mclass).text.strip()[:5]
+        return None
 
-                elif match.get("class") == "report":
-                    status = "FT"
-                    matchtime = None
+    def __getScores(self, data, update=False):
 
-                elif ("%s" %
-                      (match.find("span",
-                       mclass).text.strip()) == "Half Time"):
-                    status = "HT"
-                    matchtime = None
+        match = self.__findRow(data)
 
-                else:
-                    status = "L"
-                    matchtime = match.find("span", mclass).text.strip()
+        if match:
 
-                matchid = match.get("id")[10:]
+            self.hometeam = match["hometeam"]
+            self.awayteam = match["awayteam"]
+            self.matchlink = match["link"]
 
-                sclass = {"class": "score"}
-                score = match.find("span", sclass).text.strip().split(" - ")
+            status, matchtime = matchStatus(match)
 
-                try:
-                    homescore = int(score[0].strip())
-                    awayscore = int(score[1].strip())
+            matchid = match["id"]
 
-                except:
-                    homescore = 0
-                    awayscore = 0
+            homescore, awayscore = matchScore(match)
 
-                self.statuschange = False
-                self.newmatch = False
-                self.goal = self.homegoal = self.awaygoal = False
-                self.myteamgoal = None
+            self.statuschange = False
+            self.newmatch = False
+            self.goal = self.homegoal = self.awaygoal = False
+            self.myteamgoal = None
 
-                if update:
+            if update:
 
-                    if not status == self.status:
-                        self.statuschange = True
+                if not status == self.status:
+                    self.statuschange = True
 
-                    if not matchid == self.matchid:
-                        self.newmatch = True
+                if not matchid == self.matchid:
+                    self.newmatch = True
 
-                    # if not (homescore == self.homescore and
-                    #         awayscore == self.awayscore):
+                # if not (homescore == self.homescore and
+                #         awayscore == self.awayscore):
 
-                    if homescore > self.homescore:
-                        self.myteamgoal = self.hometeam == self.myteam
-                        self.homegoal = True
-                    elif awayscore > self.awayscore:
-                        self.myteamgoal = self.awayteam == self.myteam
-                        self.awaygoal = True
+                if homescore > self.homescore:
+                    self.myteamgoal = self.hometeam == self.myteam
+                    self.homegoal = True
+                elif awayscore > self.awayscore:
+                    self.myteamgoal = self.awayteam == self.myteam
+                    self.awaygoal = True
 
-                    self.goal = any([self.homegoal, self.awaygoal])
+                self.goal = any([self.homegoal, self.awaygoal])
 
-                self.status = status if status else None
-                self.matchtime = matchtime if matchtime else None
-                self.matchid = matchid if matchid else None
-                self.homescore = homescore
-                self.awayscore = awayscore
+            self.status = status if status else None
+            self.matchtime = matchtime if matchtime else None
+            self.matchid = matchid if matchid else None
+            self.homescore = homescore
+            self.awayscore = awayscore
 
     def __update(self, data=None):
 
@@ -295,20 +788,16 @@ class FootballMatch(matchcommon):
         self.matchfound = False
 
         if data:
-            if data.find(text=self.myteam):
+            if self.__findRow(data):
                 self.matchfound = True
             else:
                 data = None
 
-        if not data and self.scorelink:
-            scorepage = self.getPage(self.scorelink)
-            if scorepage:
-                scorehtml = BeautifulSoup(scorepage)
-                data = scorehtml.find("div", {"id": "matches-wrapper"})
-                if data.find(text=self.myteam):
-                    self.matchfound = True
-                else:
-                    data = None
+        if not data and self.leagueid:
+            comp = scoreboard.getCompetition(self.leagueid)
+            data = comp["data"] if comp else None
+            if self.__findRow(data):
+                self.matchfound = True
             else:
                 data = None
 
@@ -333,14 +822,9 @@ class FootballMatch(matchcommon):
     def __getDetails(self):
 
         if self.matchid:
-            # Prepare bautiful soup to scrape match page
-
-                # Let's get the home and away team detail sections
+            # Let's get the list of incidents from the match page
             try:
-                bs = BeautifulSoup(self.getPage(self.detailprefix.format(
-                                             id=self.matchid)))
-                iclass = {"class": "incidents-table"}
-                incidents = bs.find("table", iclass).findAll("tr")
+                incidents = scoreboard.getIncidents(self.matchid)
             except:
                 incidents = None
 
@@ -361,20 +845,14 @@ class FootballMatch(matchcommon):
                 self.__yellowcards = []
                 self.__redcards = []
 
-                itclass = {"class": re.compile(r"\bincident-type \b")}
-                ithclass = {"class": "incident-player-home"}
-                itaclass = {"class": "incident-player-away"}
-                ittclass = {"class": "incident-time"}
                 for incident in incidents:
-                    i = incident.find("td", itclass)
+                    i = incident["types"]
                     if i:
-                        h = incident.find("td", ithclass).text.strip()
-
-                        a = incident.find("td", itaclass).text.strip()
-
-                        t = incident.find("td", ittclass).text.strip()
+                        h = incident["home"]
+                        a = incident["away"]
+                        t = incident["time"]
 
-                        if "goal" in i.get("class"):
+                        if "goal" in i:
                             if h:
                                 hsc = self.__addIncident(hsc, h, t)
                                 self.__goalscorers.append((self.hometeam,
@@ -386,7 +864,7 @@ class FootballMatch(matchcommon):
                                                            a, t))
                                 self.__addRawIncident("away", "goal", a, t)
 
-                        elif "yellow-card" in i.get("class"):
+                        elif "yellow-card" in i:
                             if h:
                                 hyc = self.__addIncident(hyc, h, t)
                                 self.__yellowcards.append((self.hometeam,
@@ -398,7 +876,7 @@ class FootballMatch(matchcommon):
                                                            a, t))
                                 self.__addRawIncident("away", "yellow", a, t)
 
-                        elif "red-card" in i.get("class"):
+                        elif "red-card" in i:
                             if h:
                                 hrc = self.__addIncident(hrc, h, t)
                                 self.__redcards.append((self.hometeam, h, t))
@@ -465,11 +943,10 @@ class FootballMatch(matchcommon):
         if self.matchlink:
             badgepage = self.getPage(self.matchlink)
             if badgepage:
-                linkpage = BeautifulSoup(badgepage)
-                badges = linkpage.findAll("div", {"class": "team-badge"})
-                if badges:
-                    self.homebadge = badges[0].find("img").get("src")
-                    self.awaybadge = badges[1].find("img").get("src")
+                badges = parseBadges(badgepage)
+                if len(badges) > 1:
+                    self.homebadge = badges[0]
+                    self.awaybadge = badges[1]
                     found = True
 
         return found
@@ -875,40 +1352,16 @@ class League(matchcommon):
 
     def __getData(self, league):
 
-        scorelink = self.livescoreslink.format(comp=league)
-        data = None
-        # Prepare to process page
-        optionpage = self.getPage(scorelink)
-        if optionpage:
-            optionhtml = BeautifulSoup(optionpage)
-
-            # We just want the live games...
-            data = optionhtml.find("div", {"id": "matches-wrapper"})
+        # The page is shared with any other matches in this league
+        comp = scoreboard.getCompetition(league)
 
-        return data
+        return comp["data"] if comp else None
 
     def __getLeagueName(self, league):
 
-        leaguename = None
-        rawpage = self.getPage(self.livescoreslink.format(comp=league))
-
-        if rawpage:
-            raw = BeautifulSoup(rawpage)
-
-            # Find the list of active leagues
-            selection = raw.find("div",
-                                 {"class":
-                                  "drop-down-filter live-scores-fixtures"})
+        comp = scoreboard.getCompetition(league)
 
-            if selection:
-
-                selectedleague = selection.find("option",
-                                                {"selected": "selected"})
-
-                if selectedleague:
-                    leaguename = selectedleague.text.split("(")[0].strip()
-
-        return leaguename
+        return comp["name"] if comp else None
 
     @staticmethod
     def getLeagues():
@@ -922,28 +1375,9 @@ class League(matchcommon):
         #     leagues.append(league)
 
         # return leagues
-        livescoreslink = matchcommon().livescoreslink
-
-        # Start with the default page so we can get list of active leagues
-        rawpage = matchcommon().getPage(livescoreslink.format(comp=""))
-        if rawpage:
-            raw = BeautifulSoup(rawpage)
-
-            # Find the list of active leagues
-            selection = raw.find("div",
-                                 {"class":
-                                  "drop-down-filter live-scores-fixtures"})
-
-            # Loop throught the active leagues
-            for option in selection.findAll("option"):
 
-                # Build the link for that competition
-                # league = option.get("value")[12:]
-                league = {}
-                league["name"] = option.text.split("(")[0].strip()
-                league["id"] = option.get("value")[12:]
-                if league["id"]:
-                    leagues.append(league)
+        for leagueid, leaguename in scoreboard.getLeagues():
+            leagues.append({"name": leaguename, "id": leagueid})
 
         return leagues
 
@@ -953,17 +1387,15 @@ class League(matchcommon):
             data = self.__getData(league)
 
         matches = []
-        if data:
-            rawmatches = data.findAll("tr", {"id": re.compile(r'^match-row')})
-        else:
-            rawmatches = None
+        rawmatches = data
 
         if rawmatches:
 
             for match in rawmatches:
-                team = match.find("span", {"class": "team-home"}).text
+                team = match["hometeam"]
                 m = FootballMatch(team, detailed=detailed, data=data)
                 m.scorelink = self.livescoreslink.format(comp=league)
+                m.leagueid = league
                 matches.append(m)
 
         return matches
@@ -1096,17 +1528,11 @@ class LeagueTable(matchcommon):
         '''method for getting list of available leagues'''
 
         leaguelist = []
-        raw = BeautifulSoup(self.getPage(self.leaguebase))
-        form = raw.find("div", {"class": "drop-down-filter",
-                                "id": "filter-fixtures-no-js"})
-        self.leaguemethod = form.find("select").get("name")
-        leagues = form.findAll("option")
-        for league in leagues:
-            l = {}
-            if league.get("value") != "":
-                l["name"] = league.text
-                l["id"] = league.get("value")
-                leaguelist.append(l)
+        method, leagues = parseFilter(self.getPage(self.leaguebase))
+        if method:
+            self.leaguemethod = method
+        for leagueid, name in leagues:
+            leaguelist.append({"name": name, "id": leagueid})
         return leaguelist
 
     def getLeagueTable(self, leagueid):
@@ -1118,44 +1544,21 @@ class LeagueTable(matchcommon):
 
             def __init__(self, team):
 
-                f = team.find
-                mov = re.compile(r"no-movement|moving-up|moving-down")
-                movmap = {"No movement": "same",
-                          "Moving up": "up",
-                          "Moving down": "down"}
-                self.name = f("td", {"class": "team-name"}).text
-                self.movement = movmap.get(f("span", {"class": mov}).text)
-                self.position = int(f("span",
-                                      {"class": "position-number"}).text)
-                self.played = int(f("td", {"class": "played"}).text)
-                self.won = int(f("td", {"class": "won"}).text)
-                self.drawn = int(f("td", {"class": "drawn"}).text)
-                self.lost = int(f("td", {"class": "lost"}).text)
-                self.goalsfor = int(f("td", {"class": "for"}).text)
-                self.goalsagainst = int(f("td", {"class": "against"}).text)
-                self.goaldifference = int(f("td",
-                                            {"class":
-                                             "goal-difference"}).text)
-                self.points = int(f("td", {"class": "points"}).text)
-
-                try:
-                    lastgames = f("td", {"class": "last-10-games"})
-                    lg = []
-                    for game in lastgames.findAll("li"):
-                        g = {}
-                        g["result"] = game.get("class")
-                        g["score"] = game.get("data-result")
-                        g["opponent"] = game.get("data-against")
-                        g["date"] = game.get("data-date")
-                        g["summary"] = game.get("title")
-                        lg.append(g)
-                    self.lasttengames = lg
-
-                except:
-                    self.lasttengames = []
-
-                def __repr__(self):
-                    return "<LeagueTableTeam object - %s>" % self.name
+                self.name = team["name"]
+                self.movement = team["movement"]
+                self.position = team["position"]
+                self.played = team["played"]
+                self.won = team["won"]
+                self.drawn = team["drawn"]
+                self.lost = team["lost"]
+                self.goalsfor = team["goalsfor"]
+                self.goalsagainst = team["goalsagainst"]
+                self.goaldifference = team["goaldifference"]
+                self.points = team["points"]
+                self.lasttengames = team["lasttengames"]
+
+            def __repr__(self):
+                return "<LeagueTableTeam object - %s>" % self.name
 
             def __str__(self):
                 return "%d %s %d" % (self.position,
@@ -1166,27 +1569,11 @@ class LeagueTable(matchcommon):
                                    self.leaguemethod,
                                    leagueid)
 
-        raw = BeautifulSoup(self.getPage(leaguepage))
-
-        for table in raw.findAll("div", {"class":
-                                         "league-table full-table-wide"}):
+        for table in parseLeagueTables(self.getPage(leaguepage)):
 
             lg = {}
-            teamlist = []
-
-            leaguename = table.find("h2", {"class": "table-header"})
-
-            for tag in ["div", "script"]:
-                for nest in leaguename.findAll(tag):
-                    nest.extract()
-
-            lg["name"] = leaguename.text.strip()
-
-            for team in table.findAll("tr", {"id": re.compile(r'team')}):
-                t = LeagueTableTeam(team)
-                teamlist.append(t)
-
-            lg["table"] = teamlist
+            lg["name"] = table["name"]
+            lg["table"] = [LeagueTableTeam(team) for team in table["table"]]
             result.append(lg)
 
         return result
@@ -1195,49 +1582,8 @@ class LeagueTable(matchcommon):
 class Teams(matchcommon):
 
     def getTeams(self):
-        # Start with the default page so we can get list of active leagues
-        rawpage = self.getPage(self.livescoreslink.format(comp=""))
-        teamlist = []
-
-        if rawpage:
-            raw = BeautifulSoup(rawpage)
-
-            # Find the list of active leagues
-            liveclass = {"class": "drop-down-filter live-scores-fixtures"}
-            selection = raw.find("div", liveclass)
-
-            # Loop throught the active leagues
-            for option in selection.findAll("option"):
-
-                # Build the link for that competition
-                league = option.get("value")[12:]
-
-                if league:
-                    scorelink = self.livescoreslink.format(comp=league)
-
-                    # Prepare to process page
-                    scorepage = self.getPage(scorelink)
-                    if scorepage:
-                        optionhtml = BeautifulSoup(scorepage)
-
-                        # We just want the live games...
-                        live = optionhtml.find("div",
-                                               {"id": "matches-wrapper"})
 
-                        mtid = {"id": re.compile(r'^match-row')}
-                        for match in live.findAll("tr", mtid):
-
-                            teamlist.append(match.find("span",
-                                                       {"class":
-                                                        "team-home"}).text)
-
-                            teamlist.append(match.find("span",
-                                                       {"class":
-                                                        "team-away"}).text)
-
-            teamlist = sorted(teamlist)
-
-        return teamlist
+        return sorted(scoreboard.getTeams())
 
 
 class Results(matchcommon):
@@ -1254,17 +1600,11 @@ class Results(matchcommon):
         '''method for getting list of available results pages'''
 
         complist = []
-        raw = BeautifulSoup(self.getPage(self.resultbase))
-        form = raw.find("div", {"class": "drop-down-filter",
-                                "id": "filter-fixtures-no-js"})
-        self.resultmethod = form.find("select").get("name")
-        comps = form.findAll("option")
-        for comp in comps:
-            l = {}
-            if comp.get("value") != "":
-                l["name"] = comp.text
-                l["id"] = comp.get("value")
-                complist.append(l)
+        method, comps = parseFilter(self.getPage(self.resultbase))
+        if method:
+            self.resultmethod = method
+        for compid, name in comps:
+            complist.append({"name": name, "id": compid})
         return complist
 
     def getResults(self, compid):
@@ -1276,39 +1616,9 @@ class Results(matchcommon):
                                    self.resultmethod,
                                    compid)
 
-        raw = BeautifulSoup(self.getPage(leaguepage))
-
-        raw = raw.find("div", {"class": re.compile(r"\bfixtures-table\b")})
-
-        while raw.find("h2", {"class": "table-header"}) is not None:
-
-            resultdate = raw.find("h2", {"class": "table-header"})
-            matchdate = resultdate.text.strip()
-            resultdate.extract()
-
-            results = raw.find("table", {"class": "table-stats"})
-
-            matches = []
-
-            hclass = {"class": re.compile(r'^team-home')}
-            aclass = {"class": re.compile(r'^team-away')}
-            for matchresult in results.findAll("tr",
-                                               {"id":
-                                                re.compile(r'^match-row')}):
-                hometeam = matchresult.find("span", hclass).text.strip()
-                awayteam = matchresult.find("span", aclass).text.strip()
-                score = matchresult.find("span", {"class":
-                                                  "score"}).text.strip()
-                matches.append({"hometeam": hometeam,
-                                "awayteam": awayteam,
-                                "score": score})
-
-            resultday = {"date": matchdate,
-                         "results": matches}
-
-            result.append(resultday)
-
-            results.extract()
+        for day in parseFixtureTables(self.getPage(leaguepage), scores=True):
+            result.append({"date": day["date"],
+                           "results": day["matches"]})
 
         return result
 
@@ -1327,17 +1637,11 @@ class Fixtures(matchcommon):
         '''method for getting list of available results pages'''
 
         complist = []
-        raw = BeautifulSoup(self.getPage(self.fixturebase))
-        form = raw.find("div", {"class": "drop-down-filter",
-                                "id": "filter-fixtures-no-js"})
-        self.fixturemethod = form.find("select").get("name")
-        comps = form.findAll("option")
-        for comp in comps:
-            l = {}
-            if comp.get("value") != "":
-                l["name"] = comp.text
-                l["id"] = comp.get("value")
-                complist.append(l)
+        method, comps = parseFilter(self.getPage(self.fixturebase))
+        if method:
+            self.fixturemethod = method
+        for compid, name in comps:
+            complist.append({"name": name, "id": compid})
         return complist
 
     def getFixtures(self, compid):
@@ -1349,37 +1653,9 @@ class Fixtures(matchcommon):
                                    self.fixturemethod,
                                    compid)
 
-        raw = BeautifulSoup(self.getPage(leaguepage))
-
-        raw = raw.find("div", {"class": re.compile(r"\bfixtures-table\b")})
-
-        while raw.find("h2", {"class": "table-header"}) is not None:
-
-            fixturedate = raw.find("h2", {"class": "table-header"})
-            matchdate = fixturedate.text.strip()
-            fixturedate.extract()
-
-            results = raw.find("table", {"class": "table-stats"})
-
-            matches = []
-
-            hclass = {"class": re.compile(r'^team-home')}
-            aclass = {"class": re.compile(r'^team-away')}
-
-            for matchresult in results.findAll("tr",
-                                               {"id":
-                                                re.compile(r'^match-row')}):
-                hometeam = matchresult.find("span", hclass).text.strip()
-                awayteam = matchresult.find("span", aclass).text.strip()
-                matches.append({"hometeam": hometeam,
-                                "awayteam": awayteam})
-
-            resultday = {"date": matchdate,
-                         "fixtures": matches}
-
-            result.append(resultday)
-
-            results.extract()
+        for day in parseFixtureTables(self.getPage(leaguepage), scores=False):
+            result.append({"date": day["date"],
+                           "fixtures": day["matches"]})
 
         return result
 
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+'''
+    Parsers for the BBC football pages used by footballscores.
+
+    Each function takes the raw HTML of a page and returns plain python
+    lists/dicts containing just the information we need. Nothing else in
+    footballscores needs to know how the page was parsed.
+
+    lxml is used if it's installed: the page is parsed in C and only the
+    elements we're interested in are selected with XPath. Otherwise we fall
+    back to BeautifulSoup with the built-in html.parser.
+
+    Where we only need one element of a page (e.g. the table of matches on
+    the live scores page) it's cut out of the page first (see fragment) so
+    the rest of the page isn't parsed at all.
+'''
+import copy
+import re
+
+try:
+    import lxml.html
+    BACKEND = "lxml"
+except ImportError:
+    lxml = None
+    BACKEND = None
+
+try:
+    from bs4 import BeautifulSoup
+    if BACKEND is None:
+        BACKEND = "bs4"
+except ImportError:
+    BeautifulSoup = None
+
+# Classes used to show whether a team is moving up or down the table
+MOVEMENT = {"no-movement": "same",
+            "moving-up": "up",
+            "moving-down": "down"}
+
+
+# Opening and closing tags, used to find the end of an element
+TAGS = {}
+
+
+class LxmlNode(object):
+    '''Wrapper for lxml elements. Searches are converted to XPath.'''
+
+    def __init__(self, element):
+        self.element = element
+
+    def findAll(self, tag, cls=None, idprefix=None, **attrs):
+        conditions = []
+
+        if cls:
+            conditions.append("contains(concat(' ', normalize-space(@class), "
+                              "' '), ' {} ')".format(cls))
+
+        if idprefix:
+            conditions.append("starts-with(@id, '{}')".format(idprefix))
+
+        for name, value in attrs.items():
+            conditions.append("@{}='{}'".format(name, value))
+
+        expr = ".//{}".format(tag)
+        if conditions:
+            expr += "[{}]".format(" and ".join(conditions))
+
+        return [LxmlNode(e) for e in self.element.xpath(expr)]
+
+    def find(self, tag, cls=None, idprefix=None, **attrs):
+        found = self.findAll(tag, cls=cls, idprefix=idprefix, **attrs)
+        return found[0] if found else None
+
+    def get(self, attr):
+        return self.element.get(attr)
+
+    def classes(self):
+        return (self.element.get("class") or "").split()
+
+    def text(self):
+        return self.element.text_content()
+
+    def textWithout(self, tags):
+        '''Returns the text excluding anything inside the given tags.'''
+        element = copy.deepcopy(self.element)
+        for tag in tags:
+            for nested in element.findall(".//{}".format(tag)):
+                nested.drop_tree()
+
+        return element.text_content()
+
+
+class SoupNode(object):
+    '''Wrapper for BeautifulSoup elements with the same interface.'''
+
+    def __init__(self, element):
+        self.element = element
+
+    def findAll(self, tag, cls=None, idprefix=None, **attrs):
+        if cls:
+            attrs["class"] = cls
+
+        if idprefix:
+            attrs["id"] = re.compile(r"^{}".format(re.escape(idprefix)))
+
+        return [SoupNode(e) for e in self.element.findAll(tag, attrs)]
+
+    def find(self, tag, cls=None, idprefix=None, **attrs):
+        found = self.findAll(tag, cls=cls, idprefix=idprefix, **attrs)
+        return found[0] if found else None
+
+    def get(self, attr):
+        value = self.element.get(attr)
+
+        # Multi-valued attributes (e.g. class) are returned as lists
+        if isinstance(value, list):
+            value = " ".join(value)
+
+        return value
+
+    def classes(self):
+        return self.element.get("class") or []
+
+    def text(self):
+        return self.element.text
+
+    def textWithout(self, tags):
+        element = copy.copy(self.element)
+        for tag in tags:
+            for nested in element.findAll(tag):
+                nested.extract()
+
+        return element.text
+
+
+def parse(page, isfragment=False):
+    '''Parses the page (or, if isfragment is True, part of one) and returns
+    the root node (or None).
+    '''
+    if not page:
+        return None
+
+    if BACKEND == "lxml":
+        if isfragment:
+            # The fragment is wrapped in a div so it can be found with find
+            return LxmlNode(lxml.html.fragment_fromstring(page,
+                                                          create_parent=True))
+
+        return LxmlNode(lxml.html.fromstring(page))
+
+    elif BACKEND == "bs4":
+        return SoupNode(BeautifulSoup(page, "html.parser"))
+
+    raise ImportError("footballscores needs lxml or BeautifulSoup (bs4)")
+
+
+def fragment(page, tag, marker):
+    '''Returns the part of the page from the first <tag> whose opening tag
+    contains marker (e.g. its id or class) to its closing tag, or None if
+    there isn't one.
+
+    The end of the element is found by counting the opening and closing
+    tags, which is much quicker than parsing the page. If they don't
+    balance the rest of the page is returned.
+    '''
+    if not page:
+        return None
+
+    if isinstance(page, bytes):
+        page = page.decode("utf-8", "replace")
+
+    if tag not in TAGS:
+        TAGS[tag] = re.compile(r"<(/?){}[\s>/]".format(tag), re.IGNORECASE)
+    tags = TAGS[tag]
+
+    opening = "<" + tag
+    pos = page.find(marker)
+
+    while pos >= 0:
+        start = page.rfind(opening, 0, pos)
+
+        # Make sure the marker is inside the opening tag
+        if start >= 0 and page.find(">", start) > pos:
+            depth = 0
+            for match in tags.finditer(page, start):
+                depth += -1 if match.group(1) else 1
+                if depth == 0:
+                    return page[start:page.find(">", match.end() - 1) + 1]
+
+            return page[start:]
+
+        pos = page.find(marker, pos + len(marker))
+
+    return None
+
+
+def parseElement(page, tag, marker, **kwargs):
+    '''Returns the node for the first <tag> matching kwargs (see find),
+    parsing just that part of the page if we can. marker is a string (e.g.
+    the element's id) which is in the element's opening tag.
+    '''
+    part = fragment(page, tag, marker)
+    if part is not None:
+        root = parse(part, isfragment=True)
+        found = root.find(tag, **kwargs) if root else None
+        if found is not None:
+            return found
+
+    # Fall back to the whole page
+    root = parse(page)
+    return root.find(tag, **kwargs) if root else None
+
+
+def text(node):
+    '''Returns the stripped text of the node or "" if there's no node.'''
+    return node.text().strip() if node is not None else ""
+
+
+def parseOptions(select):
+    '''Returns list of (value, text) for the options in a drop down.'''
+    return [(option.get("value") or "", option.text().strip())
+            for option in select.findAll("option")]
+
+
+def parseLiveScores(page):
+    '''Parses a live scores page.
+
+    Returns a dict (or None if the page couldn't be parsed) with the
+    following keys:
+
+      name: name of the selected competition
+      leagues: list of (league id, name) of today's active leagues
+      matches: list of dicts for each match (see parseMatchRow)
+    '''
+    if not page:
+        return None
+
+    # Find the list of active leagues (and the name of this one)
+    name = None
+    leagues = []
+    selection = parseElement(page, "div", "live-scores-fixtures",
+                             cls="live-scores-fixtures")
+
+    if selection:
+        for option in selection.findAll("option"):
+            leagueid = (option.get("value") or "")[12:]
+            leaguename = option.text().split("(")[0].strip()
+
+            if option.get("selected") is not None:
+                name = leaguename
+
+            if leagueid:
+                leagues.append((leagueid, leaguename))
+
+    # We just want the live games...
+    matches = []
+    wrapper = parseElement(page, "div", "matches-wrapper",
+                           id="matches-wrapper")
+
+    if wrapper:
+        for row in wrapper.findAll("tr", idprefix="match-row"):
+            matches.append(parseMatchRow(row))
+
+    return {"name": name, "leagues": leagues, "matches": matches}
+
+
+def parseMatchRow(row):
+    '''Returns a dict of the information in a match row:
+
+      id: BBC match id
+      classes: list of classes of the row (e.g. "fixture", "report")
+      hometeam, awayteam: team names
+      score: the score e.g. "1 - 0"
+      elapsed: kick off time, elapsed time or "Half Time"
+      link: link to the match page (or None)
+    '''
+    link = None
+    linkrow = row.find("td", cls="match-link")
+    if linkrow:
+        a = linkrow.find("a")
+        if a is not None and a.get("href"):
+            link = "http://www.bbc.co.uk%s" % (a.get("href"))
+
+    return {"id": (row.get("id") or "")[10:],
+            "classes": row.classes(),
+            "hometeam": text(row.find("span", cls="team-home")),
+            "awayteam": text(row.find("span", cls="team-away")),
+            "score": text(row.find("span", cls="score")),
+            "elapsed": text(row.find("span", cls="elapsed-time")),
+            "link": link}
+
+
+def parseIncidents(page):
+    '''Parses the match detail page.
+
+    Returns a list of incidents. Each incident is a dict with the following
+    keys:
+
+      types: list of incident classes e.g. "goal", "yellow-card"
+      home, away: player name (for the team involved)
+      time: time of the incident
+    '''
+    incidents = []
+    table = parseElement(page, "table", "incidents-table",
+                         cls="incidents-table")
+
+    if table is None:
+        return incidents
+
+    for row in table.findAll("tr"):
+        incidenttype = row.find("td", cls="incident-type")
+
+        if incidenttype is not None:
+            incidents.append(
+                {"types": incidenttype.classes(),
+                 "home": text(row.find("td", cls="incident-player-home")),
+                 "away": text(row.find("td", cls="incident-player-away")),
+                 "time": text(row.find("td", cls="incident-time"))})
+
+    return incidents
+
+
+def parseBadges(page):
+    '''Returns a list of links to the team badges on a match page.'''
+    root = parse(page)
+    badges = []
+
+    if root is None:
+        return badges
+
+    for badge in root.findAll("div", cls="team-badge"):
+        img = badge.find("img")
+        if img is not None:
+            badges.append(img.get("src"))
+
+    return badges
+
+
+def parseFilter(page):
+    '''Parses the competition filter on the tables, results and fixtures
+    pages.
+
+    Returns a tuple of (name of the filter parameter, list of (id, name) of
+    the competitions).
+    '''
+    form = parseElement(page, "div", "filter-fixtures-no-js",
+                        cls="drop-down-filter", id="filter-fixtures-no-js")
+
+    if form is None:
+        return None, []
+
+    select = form.find("select")
+    if select is None:
+        return None, []
+
+    return select.get("name"), [(value, name) for value, name
+                                in parseOptions(select) if value]
+
+
+def toInt(node):
+    return int(text(node))
+
+
+def parseLeagueTables(page):
+    '''Parses a league table page.
+
+    Returns a list of dicts (one for each table on the page) with the keys
+    "name" and "table". The table is a list of dicts (one for each team).
+    '''
+    root = parse(page)
+    result = []
+
+    if root is None:
+        return result
+
+    for table in root.findAll("div", cls="league-table"):
+        if "full-table-wide" not in table.classes():
+            continue
+
+        header = table.find("h2", cls="table-header")
+        name = header.textWithout(("div", "script")).strip() if header else ""
+
+        teams = []
+        for row in table.findAll("tr"):
+            if "team" not in (row.get("id") or ""):
+                continue
+
+            movement = None
+            for span in row.findAll("span"):
+                found = [MOVEMENT[c] for c in span.classes() if c in MOVEMENT]
+                if found:
+                    movement = found[0]
+                    break
+
+            lasttengames = []
+            lastgames = row.find("td", cls="last-10-games")
+            if lastgames is not None:
+                for game in lastgames.findAll("li"):
+                    lasttengames.append({"result": game.get("class"),
+                                         "score": game.get("data-result"),
+                                         "opponent": game.get("data-against"),
+                                         "date": game.get("data-date"),
+                                         "summary": game.get("title")})
+
+            f = row.find
+            teams.append({
+                "name": text(f("td", cls="team-name")),
+                "movement": movement,
+                "position": toInt(f("span", cls="position-number")),
+                "played": toInt(f("td", cls="played")),
+                "won": toInt(f("td", cls="won")),
+                "drawn": toInt(f("td", cls="drawn")),
+                "lost": toInt(f("td", cls="lost")),
+                "goalsfor": toInt(f("td", cls="for")),
+                "goalsagainst": toInt(f("td", cls="against")),
+                "goaldifference": toInt(f("td", cls="goal-difference")),
+                "points": toInt(f("td", cls="points")),
+                "lasttengames": lasttengames})
+
+        result.append({"name": name, "table": teams})
+
+    return result
+
+
+def parseFixtureTables(page, scores=True):
+    '''Parses a results or fixtures page.
+
+    Returns a list of dicts with the keys "date" and "matches". Each match
+    is a dict with the keys "hometeam", "awayteam" and (if scores is True)
+    "score".
+    '''
+    result = []
+    wrapper = parseElement(page, "div", "fixtures-table",
+                           cls="fixtures-table")
+
+    if wrapper is None:
+        return result
+
+    # Each date header is followed by the table of matches on that day
+    headers = wrapper.findAll("h2", cls="table-header")
+    tables = wrapper.findAll("table", cls="table-stats")
+
+    for header, table in zip(headers, tables):
+        matches = []
+
+        for row in table.findAll("tr", idprefix="match-row"):
+            match = {"hometeam": text(row.find("span", cls="team-home")),
+                     "awayteam": text(row.find("span", cls="team-away"))}
+            if scores:
+                match["score"] = text(row.find("span", cls="score"))
+            matches.append(match)
+
+        result.append({"date": text(header), "matches": matches})
+
+    return result
@@ -23,10 +23,14 @@ from kivy.clock import Clock
 from kivy.animation import Animation
 from kivy.uix.label import Label
 from kivy.uix.behaviors import ButtonBehavior
+from kivy.logger import Logger
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from footballresources.footballscores import FootballMatch, League
+from footballresources import footballscores
+from footballresources.footballscores import FootballMatch, League, matchstore
 from core.bglabel import BGLabel
+from core.fetch import fetch
+from core.lifecycle import LifecycleScreen
 
 EVT_GOAL = 0
 EVT_KICK_OFF = 1
@@ -38,9 +42,23 @@ EVT_RED_CARD = 5
 EVT_LOOKUP = {EVT_GOAL: {"text": "GOAL!", "size": 200},
               EVT_KICK_OFF: {"text": "KICK\nOFF", "size": 175},
               EVT_HALF_TIME: {"text": "HALF\nTIME", "size": 175},
-              EVT_FULL_TIME: {"text": "FULL\nTIME", "size": 175}
+              EVT_FULL_TIME: {"text": "FULL\nTIME", "size": 175},
+              EVT_YELLOW_CARD: {"text": "YELLOW\nCARD", "size": 150},
+              EVT_RED_CARD: {"text": "RED\nCARD", "size": 175}
               }
 
+# Match store events which we show a notification for (most important
+# first as we only show one notification at a time)
+EVT_FROM_STORE = [(footballscores.EVENT_GOAL, EVT_GOAL),
+                  (footballscores.EVENT_RED_CARD, EVT_RED_CARD),
+                  (footballscores.EVENT_FULL_TIME, EVT_FULL_TIME),
+                  (footballscores.EVENT_HALF_TIME, EVT_HALF_TIME),
+                  (footballscores.EVENT_KICK_OFF, EVT_KICK_OFF),
+                  (footballscores.EVENT_YELLOW_CARD, EVT_YELLOW_CARD)]
+
+# How long to wait before trying again if the poll fails (seconds)
+RETRY_INTERVAL = 60
+
 OBJ_MATCH = 0
 OBJ_LEAGUE = 1
 
@@ -50,6 +68,94 @@ MATCH_COLOURS = {"L": [0.1, 0.1, 0.5, 1],
                  "FIXTURE": [0.1, 0.1, 0.1, 1],
                  "GOAL": [0.1, 0.4, 0.1, 1]}
 
+
+def pickEvent(events):
+    """Returns the EVT_ constant of the most important event in the list (or
+       None if there's nothing to show).
+    """
+    types = set(e["type"] for e in events)
+    for storetype, evt in EVT_FROM_STORE:
+        if storetype in types:
+            return evt
+
+    return None
+
+
+class FootballFeed(object):
+    """Polls the match store in the background and passes the events to the
+       screens which have subscribed.
+
+       Polling only happens while at least one screen is subscribed. The
+       match store decides how often to poll: often while matches are live
+       and rarely (or not at all) when they aren't.
+    """
+    def __init__(self):
+        self.subscribers = []
+        self.timer = None
+        self.job = None
+        self.nextpoll = 0
+
+    def subscribe(self, callback, team=None, league=None):
+        """Calls callback with a list of events (which may be empty) after
+           every poll while the screen is subscribed.
+        """
+        new = not any(t == team and l == league
+                      for _, t, l in self.subscribers)
+
+        matchstore.follow(team=team, league=league)
+        self.subscribers.append((callback, team, league))
+
+        # Poll straight away if this is something we haven't been following
+        # or we've missed an update
+        if new:
+            self.schedule(0.5)
+        elif self.timer is None and not (self.job and self.job.active):
+            self.schedule(max(self.nextpoll - time.time(), 0.5))
+
+    def unsubscribe(self, callback):
+        for sub in [s for s in self.subscribers if s[0] == callback]:
+            self.subscribers.remove(sub)
+            matchstore.unfollow(team=sub[1], league=sub[2])
+
+        if not self.subscribers:
+            Clock.unschedule(self.timer)
+            self.timer = None
+
+    def schedule(self, dt):
+        Clock.unschedule(self.timer)
+        self.nextpoll = time.time() + dt
+        self.timer = Clock.schedule_once(self.poll, dt)
+
+    def poll(self, *args):
+        self.timer = None
+
+        if not self.subscribers or (self.job and self.job.active):
+            return
+
+        self.job = fetch(matchstore.poll, on_result=self.polled,
+                         on_error=self.failed)
+
+    def polled(self, events):
+        """Passes the events on to the subscribers."""
+        for callback, team, league in list(self.subscribers):
+            callback([e for e in events
+                      if (team and team in (e["hometeam"], e["awayteam"])) or
+                      (league and e["league"] == league)])
+
+        if self.subscribers:
+            self.schedule(matchstore.nextInterval())
+
+    def failed(self, error):
+        Logger.warning("Football: unable to update scores: {!r}".format(error))
+
+        if self.subscribers:
+            self.schedule(RETRY_INTERVAL)
+
+
+# The feed shared by all the football screens
+feed = FootballFeed()
+
+
 # Football Matches ###########################################################
 
 class BlackHole(object):
@@ -74,7 +180,7 @@ class FootballNoMatch(BoxLayout):
         self.teamname = kwargs["teamname"]
 
 
-class FootballBase(Screen):
+class FootballBase(LifecycleScreen):
     """Screen for a football match."""
     teamname = StringProperty("")
 
@@ -86,30 +192,58 @@ class FootballBase(Screen):
         self.no_match = None
         self.scr_match = None
         self.timer = None
-        self.nextupdate = 0
-
-    def on_enter(self):
-        """Calculates when next update is due and sets schedule."""
-        if not self.running:
-            Clock.schedule_once(self.getMatchObject, 0.5)
+        self.job = None
 
-        tm = time.time()
+        # We only follow the match while it's being shown
+        self.add_service(self.follow, self.unfollow)
 
-        if tm > self.nextupdate:
-            dt = 0.5
-        else:
-            dt = self.nextupdate - tm
+    def follow(self):
+        """Starts following the match."""
+        if not self.running:
+            # Creating the match object loads the data so there's no need
+            # to subscribe yet.
+            self.timer = Clock.schedule_once(self.getMatchObject, 0.5)
+            return
 
-        self.timer = Clock.schedule_once(self.update, dt)
+        feed.subscribe(self.matchEvents, team=self.team)
 
-    def on_leave(self):
+    def unfollow(self):
         Clock.unschedule(self.timer)
+        feed.unsubscribe(self.matchEvents)
+        if self.job:
+            self.job.cancel()
 
     def getMatchObject(self, *args):
-        """Initialise the FootballMatch object (can take time)."""
+        """Initialise the FootballMatch object (can take time so this is
+           done in the background).
+        """
         if not self.running:
-            self.matchobject = FootballMatch(self.team, detailed=True)
-            self.running = True
+            self.job = fetch(FootballMatch, self.team, detailed=True,
+                             on_result=self.setMatchObject,
+                             on_error=self.loadFailed)
+        else:
+            self.checkscreen()
+
+    def loadFailed(self, error):
+        Logger.warning("Football: unable to load match for {}: {!r}".format(
+            self.team, error))
+
+        self.job = None
+
+        # Try again later (if we're still being shown)
+        if self.is_running():
+            self.timer = Clock.schedule_once(self.getMatchObject,
+                                             RETRY_INTERVAL)
+
+    def setMatchObject(self, matchobject):
+        """Stores the new match object and starts following the match."""
+        self.job = None
+        self.matchobject = matchobject
+        self.running = True
+
+        if self.is_running():
+            feed.subscribe(self.matchEvents, team=self.team)
+
         self.checkscreen()
 
     def checkscreen(self):
@@ -165,35 +299,28 @@ class FootballBase(Screen):
         anim.unbind()
         self.ids.base_float.remove_widget(widget)
 
-    def update(self, *args):
-        """Updates the matchobject and then triggers additional events
-           depending on the match status.
+    def matchEvents(self, events):
+        """Called by the feed after every update with any events for our
+           team's match.
         """
-        self.matchobject.Update()
-
         # Gooooooooooooaaaaaaaaaaaaaallllllllll!
-        if self.matchobject.Goal:
-            self.notifyEvent(event_type=EVT_GOAL)
+        evt = pickEvent(events)
+        if evt is not None:
+            self.notifyEvent(event_type=evt)
 
-        elif self.matchobject.StatusChanged:
-            status = self.matchobject.Status
-            if status == "FT":
-                self.notifyEvent(event_type=EVT_FULL_TIME)
-            elif status == "HT":
-                self.notifyEvent(event_type=EVT_HALF_TIME)
-            elif status == "L":
-                self.notifyEvent(event_type=EVT_KICK_OFF)
-
-        # Schedule next update
-        if self.matchobject:
-            dt = 30
-        else:
-            dt = 60 * 60
+        # The feed has just loaded the latest scores so this doesn't need
+        # to download the page again.
+        self.update()
+
+    def update(self, *args):
+        """Updates the matchobject in the background."""
+        if self.job and self.job.active:
+            return
 
-        self.nextupdate = time.time() + dt
-        self.timer = Clock.schedule_once(self.update, dt)
+        self.job = fetch(self.matchobject.Update, on_result=self.matchUpdated)
 
-        # Refresh data on the screen.
+    def matchUpdated(self, *args):
+        """Refresh data on the screen."""
         self.checkscreen()
 
 
@@ -214,8 +341,13 @@ class FootballMatchScreen(FloatLayout):
         self.awaystack = self.ids.away_incidents
         self.checkMatch()
 
-        # Try loading team badges
-        if self.matchobject.getTeamBadges():
+        # Try loading team badges (needs another page so do it in the
+        # background)
+        fetch(self.matchobject.getTeamBadges, on_result=self.setBadges)
+
+    def setBadges(self, found):
+        """Displays the team badges if we found them."""
+        if found:
             self.homebadge = self.matchobject.HomeBadge
             self.awaybadge = self.matchobject.AwayBadge
 
@@ -266,7 +398,7 @@ class Incident(BoxLayout):
 
 # Leagues ####################################################################
 
-class LeagueBase(Screen):
+class LeagueBase(LifecycleScreen):
     """Base widget for football league summary screen."""
     leaguename = StringProperty("")
 
@@ -276,52 +408,83 @@ class LeagueBase(Screen):
         self.leaguename = "Retrieving league information."
         self.running = False
         self.timer = None
-        self.nextupdate = 0
+        self.job = None
         self.leaguestack = None
         self.newbox = None
         self.leaguebox = self.ids.league_box
         self.spacer = False
         self.h = 0
 
-    def on_enter(self):
-        """Works out if we're due an update or not and schedules the refesh as
-           appropriate.
-        """
-        if not self.running:
-            Clock.schedule_once(self.getLeagueObject, 0.5)
-
-        tm = time.time()
+        # We only follow the league while it's being shown
+        self.add_service(self.follow, self.unfollow)
 
-        if tm > self.nextupdate:
-            dt = 0.5
-        else:
-            dt = self.nextupdate - tm
+    def follow(self):
+        """Starts following the league."""
+        if not self.running:
+            # Creating the league object loads the data so there's no need
+            # to subscribe yet.
+            self.timer = Clock.schedule_once(self.getLeagueObject, 0.5)
+            return
 
-        self.timer = Clock.schedule_once(self.update, dt)
+        feed.subscribe(self.leagueEvents, league=self.leagueid)
 
-    def on_leave(self):
+    def unfollow(self):
         Clock.unschedule(self.timer)
+        feed.unsubscribe(self.leagueEvents)
+        if self.job:
+            self.job.cancel()
 
     def getLeagueObject(self, *args):
-        """Creates the league object if we don't have one yet."""
+        """Creates the league object in the background if we don't have one
+           yet.
+        """
         if not self.running:
-            self.leagueobject = League(self.leagueid, detailed=False)
-            self.running = True
+            self.job = fetch(League, self.leagueid, detailed=False,
+                             on_result=self.setLeagueObject,
+                             on_error=self.loadFailed)
+        else:
+            self.checkscreen()
+
+    def loadFailed(self, error):
+        Logger.warning("Football: unable to load league {}: {!r}".format(
+            self.leagueid, error))
+
+        self.job = None
+
+        # Try again later (if we're still being shown)
+        if self.is_running():
+            self.timer = Clock.schedule_once(self.getLeagueObject,
+                                             RETRY_INTERVAL)
+
+    def setLeagueObject(self, leagueobject):
+        """Stores the new league object and starts following the league."""
+        self.job = None
+        self.leagueobject = leagueobject
+        self.running = True
+
+        if self.is_running():
+            feed.subscribe(self.leagueEvents, league=self.leagueid)
+
         self.checkscreen()
 
-    def update(self, *args):
-        # Reresh the league object data.
-        self.leagueobject.Update()
+    def leagueEvents(self, events):
+        """Called by the feed after every update with any events in our
+           league.
+        """
+        if any(e["type"] == footballscores.EVENT_GOAL for e in events):
+            self.notifyEvent(event_type=EVT_GOAL)
 
-        # Schedule the next update
-        if self.leagueobject.HasFinished or not self.leagueobject:
-            dt = 60 * 60
-        else:
-            dt = 30
+        self.update()
 
-        self.nextupdate = time.time() + dt
-        self.timer = Clock.schedule_once(self.update, dt)
+    def update(self, *args):
+        # Refresh the league object data in the background (the feed has
+        # just loaded the page so this doesn't download it again).
+        if self.job and self.job.active:
+            return
 
+        self.job = fetch(self.leagueobject.Update, on_result=self.leagueUpdated)
+
+    def leagueUpdated(self, *args):
         # Update the screen.
         self.checkscreen()
 
@@ -482,6 +645,16 @@ class LeagueDetail(ButtonBehavior, BoxLayout):
         self.mo = mo
         super(LeagueDetail, self).__init__(**kwargs)
         self.getDetail()
+
+    def getDetail(self):
+        """Takes the current match object and requests additional detail in
+           the background.
+        """
+        self.mo.detailed = True
+        fetch(self.mo.Update, on_result=self.showDetail)
+
+    def showDetail(self, *args):
+        """Displays the detailed match information."""
         m = self.mo
         self.hometeam = m.HomeTeam
         self.awayteam = m.AwayTeam
@@ -503,11 +676,6 @@ class LeagueDetail(ButtonBehavior, BoxLayout):
         elif m.AwayGoal:
             self.awaybg = MATCH_COLOURS["GOAL"]
 
-    def getDetail(self):
-        """Takes the current match object and requests additional detail."""
-        self.mo.detailed = True
-        self.mo.Update()
-
 
 class FootballErrorScreen(Screen):
     errormessage = ("Football Scores\n\nUh oh... Something's gone wrong.\n"
@@ -516,7 +684,7 @@ class FootballErrorScreen(Screen):
                     " further information.")
 
 
-class FootballScreen(Screen, BlackHole):
+class FootballScreen(LifecycleScreen, BlackHole):
     """Base screen for football scores."""
     def __init__(self, params, **kwargs):
         self.params = params
@@ -535,9 +703,10 @@ class FootballScreen(Screen, BlackHole):
         self.myscreens = self.myteams[:] + self.myleagues[:]
         self.running = False
 
-    def on_enter(self):
+    def on_activate(self):
         """Creates football match and/or league screens depending on user's
-           requirements.
+           requirements. The match or league that's shown is activated (and
+           deactivated) along with this screen.
         """
         if not self.running:
             for team in self.myteams:
@@ -551,20 +720,6 @@ class FootballScreen(Screen, BlackHole):
 
             self.running = True
 
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.fscrmgr.children:
-                if c.name == self.fscrmgr.current:
-                    c.on_enter()
-
-    def on_leave(self):
-        # Fixes bug where nested screens don't have "on_enter" or
-        # "on_leave" methods called.
-        for c in self.fscrmgr.children:
-            if c.name == self.fscrmgr.current:
-                c.on_leave()
-
     def next_screen(self, rev=True):
         a = self.myscreens
         n = -1 if rev else 1
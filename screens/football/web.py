@@ -1,6 +1,7 @@
 import json
 import bottle
 import os
+import sys
 import requests
 
 plugin_path = os.path.dirname(__file__)
@@ -27,7 +28,8 @@ LAYOUT = """% rebase("base.tpl", title="Configure Football Scores Screen")
 """
 
 bindings = [("/footballscores", "show_teams", ["GET"]),
-            ("/footballscores/update", "update", ["POST"])]
+            ("/footballscores/update", "update", ["POST"]),
+            ("/footballscores/events", "events", ["GET"])]
 
 def show_teams():
     host = bottle.request.get_header('host')
@@ -78,3 +80,22 @@ def update():
         bottle.redirect("/")
     else:
         return "Error."
+
+def events():
+    """Returns the recent match events as JSON. Clients can pass the
+       sequence number of the last event they saw as "since" to only get new
+       events.
+    """
+    # Use the same match store as the screen
+    path = os.path.abspath(plugin_path)
+    if path not in sys.path:
+        sys.path.append(path)
+    from footballresources.footballscores import matchstore
+
+    try:
+        since = int(bottle.request.query.get("since", 0))
+    except ValueError:
+        since = 0
+
+    return {"live": matchstore.isLive(),
+            "events": matchstore.recentEvents(since)}
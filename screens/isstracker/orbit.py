@@ -0,0 +1,272 @@
+"""Ground track of the ISS for the next few orbits.
+
+   Rather than asking ephem for each position as it's needed, the
+   GroundTrack works out where the ISS will be every STEP seconds for the
+   next few orbits in one go and keeps the results. The current position is
+   then interpolated from those points and the path ahead is just a slice of
+   them. The track is only recalculated when it's running out (or the TLE
+   data changes).
+
+   If numpy and sgp4 are installed, all the positions are propagated in a
+   single vectorised call. Otherwise ephem is used for each point (this is
+   still only done when the track is recalculated, but takes long enough
+   that it shouldn't be done on the main thread).
+
+   The calculation is handed to the GroundTrack's run function, e.g.
+   core.fetch.fetch to do it in the background. The old track keeps being
+   used until the new one arrives. By default it's calculated straight
+   away.
+
+   This module mustn't import Kivy.
+"""
+import math
+from functools import partial
+from datetime import datetime, timezone
+
+import ephem
+
+try:
+    import numpy as np
+    from sgp4.api import Satrec
+except ImportError:
+    np = None
+
+# Time between the points on the track (seconds)
+STEP = 30
+
+# An ISS orbit takes about 93 minutes (seconds)
+ORBIT_PERIOD = 93 * 60
+
+# Number of orbits to calculate ahead
+ORBITS = 3
+
+# Recalculate the track when there's less than this much left (seconds)
+MIN_AHEAD = ORBIT_PERIOD
+
+# Eccentricity (squared) of the WGS84 ellipsoid
+WGS84_E2 = 0.00669437999014
+
+# Julian date of the unix epoch
+UNIX_EPOCH_JD = 2440587.5
+
+
+def gmst(jd):
+    """Returns Greenwich mean sidereal time (radians) for the Julian date
+       (a number or numpy array).
+    """
+    d = jd - 2451545.0
+    t = d / 36525.0
+    deg = (280.46061837 + 360.98564736629 * d + 0.000387933 * t * t -
+           t * t * t / 38710000.0)
+    return (deg % 360.0) * math.pi / 180.0
+
+
+def track_sgp4(tle, times):
+    """Returns lists of latitudes and longitudes (degrees) for the times
+       (unix timestamps), calculated with sgp4 in a single call. The lists
+       are cut short if sgp4 can't calculate some of the positions.
+    """
+    sat = Satrec.twoline2rv(tle[1], tle[2])
+
+    jd = np.asarray(times, dtype=float) / 86400.0 + UNIX_EPOCH_JD
+    whole = np.floor(jd)
+    error, r, _ = sat.sgp4_array(whole, jd - whole)
+
+    # sgp4 returns nonsense for the points it couldn't work out (non-zero
+    # error code, e.g. if the orbit has decayed). Once that starts it
+    # doesn't get better further on so the track stops before the first
+    # one (the points have to stay evenly spaced in time).
+    failed = np.flatnonzero(error)
+    if len(failed):
+        jd = jd[:failed[0]]
+        r = r[:failed[0]]
+
+    # Convert the positions (km, TEME frame) to latitude and longitude
+    x, y, z = r[:, 0], r[:, 1], r[:, 2]
+    lon = np.arctan2(y, x) - gmst(jd)
+    lon = (lon + np.pi) % (2 * np.pi) - np.pi
+    lat = np.arctan2(z, np.hypot(x, y))
+
+    # Geocentric to (approximately) geodetic latitude
+    lat = np.arctan(np.tan(lat) / (1 - WGS84_E2))
+
+    return np.degrees(lat).tolist(), np.degrees(lon).tolist()
+
+
+def track_ephem(tle, times):
+    """Returns lists of latitudes and longitudes (degrees) for the times
+       (unix timestamps), calculated with ephem one point at a time.
+    """
+    body = ephem.readtle(*tle)
+    lats = []
+    lons = []
+
+    for t in times:
+        # ephem treats naive datetimes as UTC
+        when = datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None)
+        body.compute(when)
+        lats.append(float(body.sublat / ephem.degree))
+        lons.append(float(body.sublong / ephem.degree))
+
+    return lats, lons
+
+
+def calculate_track(tle, start, step, orbits):
+    """Returns (start, lats, lons) of the track for the given number of
+       orbits from start (unix timestamp). This doesn't touch the
+       GroundTrack so it can be run in a worker thread.
+    """
+    count = int(orbits * ORBIT_PERIOD / step) + 1
+    times = [start + i * step for i in range(count)]
+
+    if np is not None:
+        lats, lons = track_sgp4(tle, times)
+    else:
+        lats, lons = track_ephem(tle, times)
+
+    return start, lats, lons
+
+
+def run_now(func, *args, on_result=None, on_error=None):
+    """Default run function for the GroundTrack: calls func straight away
+       and passes the result to on_result.
+    """
+    try:
+        result = func(*args)
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(e)
+    else:
+        if on_result is not None:
+            on_result(result)
+
+
+def unwrap(lon0, lon1):
+    """Returns lon1 moved by 360 degrees if that makes it closer to lon0."""
+    if lon1 - lon0 > 180:
+        return lon1 - 360
+    if lon1 - lon0 < -180:
+        return lon1 + 360
+    return lon1
+
+
+def wrap(lon):
+    return (lon + 180) % 360 - 180
+
+
+class GroundTrack(object):
+    """Positions of the ISS over the next few orbits.
+
+       run:       called as run(func, *args, on_result=..., on_error=...) to
+                  calculate the track (e.g. core.fetch.fetch). By default
+                  the track is calculated straight away.
+       on_update: called (with no arguments) when a new track is ready.
+    """
+
+    def __init__(self, tle=None, step=STEP, orbits=ORBITS, run=run_now,
+                 on_update=None):
+        self.step = step
+        self.orbits = orbits
+        self.tle = tle
+        self.run = run
+        self.on_update = on_update
+        self.start = 0
+        self.lats = []
+        self.lons = []
+
+        # True if the track wasn't calculated from the current TLE data
+        self.stale = False
+
+        # True while a new track is being calculated
+        self.calculating = False
+
+    def set_tle(self, tle):
+        """Uses new TLE data. The track is recalculated on the next update
+           (the old one is used until then).
+        """
+        self.tle = [str(x) for x in tle]
+        self.stale = True
+
+    @property
+    def end(self):
+        return self.start + (len(self.lats) - 1) * self.step
+
+    def update(self, now):
+        """Starts recalculating the track if it doesn't cover the next
+           MIN_AHEAD seconds. Returns True if it was started.
+        """
+        if not self.tle or self.calculating:
+            return False
+
+        if (self.lats and not self.stale and self.start <= now and
+                self.end - now >= MIN_AHEAD):
+            return False
+
+        self.calculating = True
+        self.run(calculate_track, self.tle, now, self.step, self.orbits,
+                 on_result=partial(self.calculated, self.tle),
+                 on_error=self.failed)
+        return True
+
+    def calculated(self, tle, result):
+        self.calculating = False
+
+        # The TLE data changed while we were working so this track is
+        # already out of date. The next update will start another one.
+        if tle != self.tle:
+            return
+
+        self.start, self.lats, self.lons = result
+        self.stale = False
+
+        if self.on_update is not None:
+            self.on_update()
+
+    def failed(self, error):
+        # Try again on the next update
+        self.calculating = False
+
+    def index(self, now):
+        """Returns the index of the point before now and how far (0-1) we
+           are between that point and the next one.
+        """
+        pos = (now - self.start) / float(self.step)
+        i = min(max(int(pos), 0), len(self.lats) - 2)
+        return i, min(max(pos - i, 0), 1)
+
+    def position(self, now):
+        """Returns the (lat, lon) of the ISS at now, or None if we don't have
+           a track (yet).
+        """
+        self.update(now)
+
+        if len(self.lats) < 2:
+            return None
+
+        i, f = self.index(now)
+        lat = self.lats[i] + f * (self.lats[i + 1] - self.lats[i])
+        lon1 = unwrap(self.lons[i], self.lons[i + 1])
+        lon = wrap(self.lons[i] + f * (lon1 - self.lons[i]))
+
+        return lat, lon
+
+    def path(self, now, duration):
+        """Returns the path from now for the next duration seconds as a list
+           of segments, each a list of (lat, lon). A new segment is started
+           wherever the path crosses the edge of the map.
+        """
+        current = self.position(now)
+        if current is None:
+            return []
+
+        i, _ = self.index(now)
+        last = min(i + 1 + int(duration / self.step), len(self.lats))
+
+        segments = [[current]]
+        for lat, lon in zip(self.lats[i + 1:last], self.lons[i + 1:last]):
+            if abs(lon - segments[-1][-1][1]) > 180:
+                segments.append([])
+            segments[-1].append((lat, lon))
+
+        return segments
@@ -1,20 +1,80 @@
-from datetime import datetime, timedelta
+from itertools import zip_longest
 import os
 import json
+import sys
+import time
 
+from kivy.graphics import Color, Line
 from kivy.uix.label import Label
-from kivy.uix.screenmanager import Screen
-from kivy.garden.mapview import MapSource, MapView, MapMarker, MarkerMapLayer
-from kivy.clock import Clock
+from kivy.garden.mapview import (MapSource, MapView, MapMarker, MapLayer,
+                                 MarkerMapLayer)
 
-import requests
-import ephem
+from core.cache import get_cache, refresh
+from core.fetch import fetch
+from core.httpclient import http_get
+from core.lifecycle import LifecycleScreen
+from core.ticker import SECOND
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from orbit import GroundTrack
+
+# Set our data source and the name of the object we're tracking
+TLE_URL = "http://www.celestrak.com/NORAD/elements/stations.txt"
+ISS_NAME = "ISS (ZARYA)"
+
+# How old the TLE data can be before we download new data (seconds)
+TLE_TTL = 60 * 60
+
+# How often to check the age of the TLE data (seconds)
+TLE_CHECK = 5 * 60
+
+# How far ahead to show the ISS's path (seconds) and how often to redraw it
+PATH_DURATION = 100 * 60
+PATH_INTERVAL = 30
 
 class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
 
-class ISSScreen(Screen, BlackHole):
+class OrbitLayer(MapLayer):
+    """Map layer showing the ISS's path.
+
+       Each segment of the path (it's split where it crosses the edge of the
+       map) is a Line instruction. The lines are reused and only their points
+       change when the path is updated or the map moves or zooms (the map
+       calls reposition).
+    """
+    def __init__(self, **kwargs):
+        super(OrbitLayer, self).__init__(**kwargs)
+        self.segments = []
+        self.lines = []
+
+        with self.canvas:
+            Color(1, 1, 1, 0.8)
+
+    def set_path(self, segments):
+        self.segments = segments
+        self.reposition()
+
+    def reposition(self):
+        mapview = self.parent
+        if mapview is None:
+            return
+
+        # Make sure we've got enough lines
+        while len(self.lines) < len(self.segments):
+            with self.canvas:
+                self.lines.append(Line(width=1.5))
+
+        zoom = mapview.zoom
+        for line, segment in zip_longest(self.lines, self.segments):
+            points = []
+            for lat, lon in segment or []:
+                points.extend(mapview.get_window_xy_from(lat, lon, zoom))
+            line.points = points
+
+class ISSScreen(LifecycleScreen, BlackHole):
     def __init__(self, **kwargs):
         #print(**kwargs)
         super(ISSScreen, self).__init__(**kwargs)
@@ -25,27 +85,34 @@ class ISSScreen(Screen, BlackHole):
         # Set the path for local images
         self.imagefolder = os.path.join(self.path, "images")
 
-        # Ephem calculates the position using the Two Line Element data
-        # We need to make sure we have up to date info
-        tle = self.get_TLE()
+        # Handle for the background TLE download
+        self.tle_job = None
+
+        # The position is calculated using the Two Line Element data. We
+        # keep the data (and the ground track worked out from it) in memory
+        # and only replace them when new data has been downloaded. The track
+        # is calculated in the background.
+        self.tle = None
+        self.tle_time = 0
+        self.track = GroundTrack(run=fetch, on_update=self.track_updated)
 
-        # Create an iss object from which we can get positional data
-        self.iss = ephem.readtle(*tle)
+        # Nothing is loaded or calculated until the screen is first shown
+        self.running = False
 
-        # Run the calculations
-        self.iss.compute()
+        # The marker and path only need updating while the screen is shown
+        self.timer = self.add_tick(self.update, SECOND)
+        self.tle_timer = self.add_interval(self.check_TLE, TLE_CHECK)
+
+    def setup(self):
+        self.set_TLE(*self.get_TLE())
 
         # Get positon of iss and place a marker there
-        lat, lon = self.get_loc()
-        print('ISS at', lat, lon)
+        lat, lon = self.get_loc() or (0, 0)
         self.marker = MapMarker(lat=lat, lon=lon)
 
         # Create a value to check when we last drew ISS path
         self.last_path_update = 0
 
-        # Create the path icon
-        self.path_icon = os.path.join(self.imagefolder, "dot.png")
-
         # Create the world map
         kwargs = {}
         kwargs["map_source"] = MapSource(url='https://{s}.tile.openstreetmap.de/tiles/osmde/{z}/{x}/{y}.png', attribution="")
@@ -54,140 +121,128 @@ class ISSScreen(Screen, BlackHole):
         x, y = self.map.get_window_xy_from(0,0,1)
         self.map.scale_at(1.2, x, y)
 
-        # Add the ISS marker to the map and draw the map on the screen
-        self.map.add_widget(self.marker)
-        self.add_widget(self.map)
-
         # Add a new layer for the path
-        self.mmlayer = MarkerMapLayer()
-
-        self.draw_iss_path()
-
-        self.timer = None
-
-    def on_enter(self):
+        self.orbitlayer = OrbitLayer()
+        self.map.add_layer(self.orbitlayer)
 
-        self.timer = Clock.schedule_interval(self.update, 1)
+        # The ISS marker has a layer of its own (on top of the path) so it
+        # can be moved every second without repositioning the path too.
+        self.markerlayer = MarkerMapLayer()
+        self.map.add_layer(self.markerlayer)
+        self.map.add_marker(self.marker, layer=self.markerlayer)
 
-    def on_leave(self):
+        # Draw the map on the screen
+        self.add_widget(self.map)
 
-        Clock.unschedule(self.timer)
+        self.draw_iss_path()
 
-    def utcnow(self):
-        return (datetime.utcnow() - datetime(1970,1,1)).total_seconds()
+    def on_activate(self):
+        # We only want to set up the map once
+        if not self.running:
+            self.setup()
+            self.running = True
 
-    def draw_iss_path(self):
+        self.check_TLE()
 
-        # Path is drawn every 5 mins
-        if self.utcnow() - self.last_path_update > 30:
+    def draw_iss_path(self, force=False):
 
-            try:
-                self.map.remove_layer(self.mmlayer)
-            except:
-                pass
+        now = time.time()
 
-            self.mmlayer = MarkerMapLayer()
+        # Path is redrawn every 30 seconds
+        if force or now - self.last_path_update > PATH_INTERVAL:
 
-            # Create markers showing the ISS's position every 5 mins
-            for i in range(20):
-                lat, lon = self.get_loc(datetime.now() + timedelta(0, i * 300))
-                self.mmlayer.add_widget(MapMarker(lat=lat,
-                                                  lon=lon,
-                                                  source=self.path_icon))
-                print('ISS path at', lat, lon)
+            self.orbitlayer.set_path(self.track.path(now, PATH_DURATION))
 
             # Update the flag so we know when next update should be run
-            self.last_path_update = self.utcnow()
+            self.last_path_update = now
 
-            # Add the layer and call the reposition function otherwise the
-            # markers don't show otherwise!
-            self.map.add_layer(self.mmlayer)
-            self.mmlayer.reposition()
+    def track_updated(self):
+        """Called when a new ground track has been calculated."""
+        if self.running:
+            self.draw_iss_path(force=True)
 
     def get_TLE(self):
+        """Returns a tuple of the saved TLE data for the ISS (as a list of
+           strings) and its age in seconds. The data is None if there isn't
+           any.
+        """
+        # Try loading the last data we downloaded
+        saved = get_cache().get(TLE_URL)
+
+        # If it's not in the cache then fall back to the copy that comes with
+        # the screen (and treat it as out of date).
+        if saved is None:
+            try:
+                with open(os.path.join(self.path, "iss_tle.json")) as savefile:
+                    saved = (json.load(savefile)["tle"], TLE_TTL + 1)
+            except (IOError, KeyError, ValueError):
+                pass
 
-        # Set some flags
-        need_update = False
-
-        # Set our data source and the name of the object we're tracking
-        source = "http://www.celestrak.com/NORAD/elements/stations.txt"
-        ISS = "ISS (ZARYA)"
-
-        # Get the current time
-        utc_now = self.utcnow()
-
-        # Set the name of our file to store data
-        data = os.path.join(self.path, "iss_tle.json")
-
-        # Try loading old data
-        try:
-            with open(data, "r") as savefile:
-                saved = json.load(savefile)
-
-        # If we can't create a dummy dict
-        except IOError:
-            saved = {"updated": 0}
+        if not (saved and saved[0]):
+            return None, 0
 
-        # If old data is more than an hour hold, let's check for an update
-        if utc_now - saved["updated"] > 3600:
-            need_update = True
+        return saved
 
-        # If we don't have any TLE data then we need an update
-        if not saved.get("tle"):
-            need_update = True
+    def set_TLE(self, tle, age=0):
+        """Uses the TLE data for the ground track."""
+        if not tle:
+            return
 
-        if need_update:
+        # ephem needs strings
+        self.tle = [str(x) for x in tle]
+        self.tle_time = time.time() - age
 
-            # Load the TLE data
-            raw = requests.get(source).text
+        # The track will be recalculated with the new data
+        self.track.set_tle(self.tle)
+        self.last_path_update = 0
 
-            # Split the data into a neat list
-            all_sats = [sat.strip() for sat in raw.split("\n")]
+    def check_TLE(self, *args):
+        """Downloads new TLE data in the background if ours is more than an
+           hour old (or we don't have any). The cache file is only written
+           after a download.
+        """
+        if self.tle_job and self.tle_job.active:
+            return
 
-            # Find the ISS and grab the whole TLE (three lines)
-            iss_index = all_sats.index(ISS)
-            iss_tle = all_sats[iss_index:iss_index + 3]
+        if self.tle is None or time.time() - self.tle_time > TLE_TTL:
+            self.tle_job = refresh(TLE_URL, self.download_TLE,
+                                   on_result=self.set_TLE)
 
-            # Prepare a dict to save our data
-            new_tle = {"updated": utc_now,
-                       "tle": iss_tle}
+    def download_TLE(self):
+        """Downloads the latest TLE data. This is normally run in a worker
+           thread.
+        """
+        # Load the TLE data
+        raw = http_get(TLE_URL).text
 
-            # Save it
-            with open(data, "w") as savefile:
-                json.dump(new_tle, savefile, indent=4)
+        # Split the data into a neat list
+        all_sats = [sat.strip() for sat in raw.split("\n")]
 
-            # ephem needs strings not unicode
-            return [str(x) for x in iss_tle]
+        # Find the ISS and grab the whole TLE (three lines)
+        iss_index = all_sats.index(ISS_NAME)
+        iss_tle = all_sats[iss_index:iss_index + 3]
 
-        else:
-            # return the saved data (as strings)
-            return [str(x) for x in saved["tle"]]
+        # ephem needs strings not unicode
+        return [str(x) for x in iss_tle]
 
     def update(self, *args):
 
-        # Update the ISS with newest TLE
-        self.iss = ephem.readtle(*self.get_TLE())
+        # Get the position (from the ground track) and update marker
+        loc = self.get_loc()
 
-        # Get the position and update marker
-        lat, lon = self.get_loc()
-        self.marker.lat = lat
-        self.marker.lon = lon
-        self.map.remove_widget(self.marker)
-        self.map.add_widget(self.marker)
+        # We can't do anything until we've got some TLE data
+        if loc is None:
+            return
+
+        # Only the marker needs moving
+        self.marker.lat, self.marker.lon = loc
+        self.markerlayer.reposition()
 
         # Check if the path needs redrawing
         self.draw_iss_path()
 
-    def get_loc(self, dt=None):
-
-        # We can get the location for a specific time as well
-        if dt is None:
-            self.iss.compute()
-        else:
-            self.iss.compute(dt)
-
-        # Convert the ephem data into something that the map can use
-        lat = float(self.iss.sublat / ephem.degree)
-        lon = float(self.iss.sublong / ephem.degree)
-
-        return lat, lon
+    def get_loc(self, when=None):
+        """Returns the (lat, lon) of the ISS at the given time (unix
+           timestamp, default now) or None if we don't have any TLE data.
+        """
+        return self.track.position(time.time() if when is None else when)
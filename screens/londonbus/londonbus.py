@@ -10,8 +10,8 @@ Please note, if you use TfL data in your application you should
 acknowledge the source of your data as appropriate.
 """
 
-# Simple way of submitting web requests (easier to use than urllib2)
-import requests
+# Shared web client (keeps connections open between requests)
+from core.httpclient import http_get
 
 # We need json to turn the JSON response into a python dict/list
 import json
@@ -29,7 +29,7 @@ BASE_URL = ("http://countdown.api.tfl.gov.uk/interfaces/"
 
 def __getBusData(stopcode):
     # Add the stop code to the web address and get the page
-    r = requests.get(BASE_URL.format(stopcode=stopcode))
+    r = http_get(BASE_URL.format(stopcode=stopcode))
 
     # If the request was ok
     if r.status_code == 200:
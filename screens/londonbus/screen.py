@@ -5,12 +5,14 @@ import re
 from kivy.clock import Clock
 from kivy.uix.label import Label
 from kivy.uix.togglebutton import ToggleButton
-from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.stacklayout import StackLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.properties import StringProperty, DictProperty
 
+from core.fetch import fetch
+from core.lifecycle import LifecycleScreen
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import londonbus as LB
@@ -45,7 +47,7 @@ class LondonBus(BoxLayout):
         self.bus_time = bus["time"]
 
 
-class LondonBusStop(Screen):
+class LondonBusStop(LifecycleScreen):
     """Custom screen class for showing countdown information for a specific
        bus stop.
     """
@@ -56,27 +58,43 @@ class LondonBusStop(Screen):
         super(LondonBusStop, self).__init__(**kwargs)
         self.description = self.stop["description"]
         self.filters = None
+        self.job = None
+        self.first = None
 
-    def on_enter(self):
-        # Refresh the information when we load the screen
-        Clock.schedule_once(self.get_buses, 0.5)
+        # Update the countdown every 30 seconds while the stop is shown
+        self.timer = self.add_interval(self.get_buses, 30)
+        self.add_service(self.start_updates, self.stop_updates)
 
-        # and schedule updates every 30 seconds.
-        self.timer = Clock.schedule_interval(self.get_buses, 30)
+    def start_updates(self):
+        # Refresh the information when we show the screen
+        self.first = Clock.schedule_once(self.get_buses, 0.5)
 
-    def on_leave(self):
-        # Save resource by removing schedule
-        Clock.unschedule(self.timer)
+    def stop_updates(self):
+        self.first.cancel()
+        if self.job:
+            self.job.cancel()
 
     def get_buses(self, *args):
         """Starts the process of retrieving countdown information."""
+        # Don't queue up another request if the last one is still running.
+        if self.job and self.job.active:
+            return
+
+        self.job = fetch(self.fetch_buses, on_result=self.show_buses)
+
+    def fetch_buses(self):
+        """Retrieves the countdown information. Runs in a worker thread."""
         try:
             # Load the bus data.
-            self.buses = LB.BusLookup(self.stop["stopid"])
+            return LB.BusLookup(self.stop["stopid"])
         except:
             # If there's an error (e.g. no internet connection) then we have
             # no bus data.
-            self.buses = None
+            return None
+
+    def show_buses(self, buses):
+        """Updates the screen with the countdown information."""
+        self.buses = buses
 
         if self.buses:
             # We've got bus data so let's update the screen.
@@ -144,7 +162,7 @@ class LondonBusStop(Screen):
         self.draw_buses()
 
 
-class LondonBusScreen(Screen, BlackHole):
+class LondonBusScreen(LifecycleScreen, BlackHole):
     """Base screen object for London Buses.
 
     Has a screenmanager to hold screens for specific bus stops.
@@ -161,29 +179,16 @@ class LondonBusScreen(Screen, BlackHole):
         self.scrid = 0
         self.myscreens = [str(x["stopid"]) for x in self.stops]
 
-    def on_enter(self):
+    def on_activate(self):
         # If this is the first time we've come across the screen then we need
-        # to set up a sub-screen for each bus stop.
+        # to set up a sub-screen for each bus stop. The stop that's shown is
+        # activated (and deactivated) along with this screen.
         if not self.running:
             for stop in self.stops:
                 nm = str(stop["stopid"])
                 self.scrmgr.add_widget(LondonBusStop(stop=stop, name=nm))
             self.running = True
 
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.scrmgr.children:
-                if c.name == self.scrmgr.current:
-                    c.on_enter()
-
-    def on_leave(self):
-        # Fixes bug where nested screens don't have "on_enter" or
-        # "on_leave" methods called.
-        for c in self.scrmgr.children:
-            if c.name == self.scrmgr.current:
-                c.on_leave()
-
     def next_screen(self, rev=True):
         a = self.myscreens
         n = -1 if rev else 1
@@ -13,6 +13,7 @@ from kivy.uix.screenmanager import Screen
 from kivy.uix.gridlayout import GridLayout
 
 from core.bglabel import BGLabel
+from core.fetch import fetch
 
 from MythTV import MythBE
 
@@ -67,15 +68,26 @@ class MythTVScreen(Screen):
         self.status_timer = None
         self.be = None
         self.recs = None
+        self.rec_job = None
+        self.status_job = None
 
     def on_enter(self):
-        # We only update when we enter the screen. No need for regular updates.
-        self.getRecordings()
+        # Show whatever we've got (or the cache) straight away as the backend
+        # may take a while to respond.
+        if self.recs is None:
+            self.recs = self.loadCache()
         self.drawScreen()
-        self.checkRecordingStatus()
+
+        # We only update when we enter the screen. No need for regular updates.
+        self.rec_job = fetch(self.getRecordings,
+                             on_result=self.showRecordings)
+        self.status_job = fetch(self.checkRecordingStatus,
+                                on_result=self.setRecordingStatus)
 
     def on_leave(self):
-        pass
+        for job in (self.rec_job, self.status_job):
+            if job:
+                job.cancel()
 
     def cacheRecs(self, recs):
         """Method to save local copy of recordings. Backend may not be online
@@ -124,32 +136,44 @@ class MythTVScreen(Screen):
         return recs
 
     def getRecordings(self):
-        """Attempts to connect to MythTV backend and retrieve recordings."""
+        """Attempts to connect to MythTV backend and retrieve recordings.
+
+           Runs in a worker thread. Returns a tuple of (backend, recordings).
+        """
         try:
             # If we can connect then get recordings and save a local cache.
-            self.be = MythBE()
-            uprecs = self.be.getUpcomingRecordings()
-            self.recs = self.recs_to_dict(uprecs)
-            self.cacheRecs(self.recs)
-            self.backendonline = True
+            be = MythBE()
+            uprecs = be.getUpcomingRecordings()
+            recs = self.recs_to_dict(uprecs)
+            self.cacheRecs(recs)
+            return be, recs
         except:
-            # Can't connect so we need to set variables accordinly and try
-            # to load data from the cache.
-            self.be = None
-            self.recs = self.loadCache()
-            self.backendonline = False
+            # Can't connect so we need to try to load data from the cache.
+            return None, self.loadCache()
+
+    def showRecordings(self, result):
+        """Updates the screen with the recordings."""
+        self.be, self.recs = result
+        self.backendonline = self.be is not None
+        self.drawScreen()
 
     def checkRecordingStatus(self):
-        """Checks whether the backend is currently recording."""
+        """Checks whether the backend is currently recording. Runs in a
+           worker thread.
+        """
         try:
             recbe = MythBE()
             for recorder in recbe.getRecorderList():
                 if recbe.isRecording(recorder):
-                    self.isrecording = True
-                    break
+                    return True
         except:
             # If we can't connect to it then it can't be recording.
-            self.isrecording = False
+            pass
+
+        return False
+
+    def setRecordingStatus(self, isrecording):
+        self.isrecording = isrecording
 
     def drawScreen(self):
         """Main method for rendering screen.
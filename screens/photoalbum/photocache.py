@@ -0,0 +1,314 @@
+"""Display-sized photo cache for the photo album screen.
+
+   Camera photos are far bigger than the screen so decoding them when they
+   are shown causes the slideshow to stutter (and uses a lot of memory).
+   The PhotoCache:
+
+     - shrinks each photo to the size of the screen in a worker process and
+       saves the result on disk (see thumbnails.py) so this only needs to be
+       done once per photo; and
+     - decodes the next few photos before they're needed so that
+       transitions don't have to wait for anything to be decoded.
+
+   The decoded photos are copied into screen-sized textures which are
+   recycled by a TexturePool so the slideshow can run for weeks without
+   allocating new textures for every photo.
+
+   Thumbnails need PIL. Without it, the original files are decoded instead.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from kivy.clock import Clock
+from kivy.core.image import ImageLoader
+from kivy.graphics.texture import Texture
+from kivy.logger import Logger
+
+from core.fetch import fetch
+from thumbnails import Image, make_thumbnail, prune_thumbnails
+
+# Number of photos to load ahead of the current one
+PREFETCH = 3
+
+# Number of thumbnails to keep on disk
+MAX_THUMBNAILS = 5000
+
+# Number of unused textures (of each format) to keep for reuse
+MAX_FREE_TEXTURES = 2
+
+# Formats that can be copied into pooled textures
+POOL_FORMATS = ("rgb", "rgba")
+
+
+def load_image(path):
+    """Decodes the image at path. Run in a worker thread.
+
+       Returns the ImageData (no texture is created).
+    """
+    return ImageLoader.load(path)._data[0]
+
+
+class PhotoTexture(object):
+    """A decoded photo.
+
+       texture is what should be shown. Call release() once it's no longer
+       on screen so the texture can be reused.
+    """
+    def __init__(self, texture, owner=None, pool=None):
+        self.texture = texture
+        self.owner = owner
+        self.pool = pool
+
+    def release(self):
+        if self.pool is not None and self.owner is not None:
+            self.pool.release(self.owner)
+
+        self.texture = self.owner = self.pool = None
+
+
+class TexturePool(object):
+    """Recycles screen-sized textures.
+
+       Photos which fit on the screen are copied into a pooled texture and
+       shown using a region of it. Anything bigger (or in an unusual format)
+       gets a texture of its own.
+    """
+    def __init__(self, size, max_free=MAX_FREE_TEXTURES):
+        self.width, self.height = (int(x) for x in size)
+        self.max_free = max_free
+        self.free = {fmt: [] for fmt in POOL_FORMATS}
+
+        # Number of textures created (for debugging)
+        self.created = 0
+
+    def acquire(self, imagedata):
+        """Returns a PhotoTexture holding the image data. Must be called on
+           the main thread.
+        """
+        fmt = imagedata.fmt
+        width, height = imagedata.width, imagedata.height
+
+        if (fmt not in POOL_FORMATS or width > self.width or
+                height > self.height):
+            photo = PhotoTexture(Texture.create_from_data(imagedata))
+            if imagedata.flip_vertical:
+                photo.texture.flip_vertical()
+            return photo
+
+        free = self.free[fmt]
+        if free:
+            texture = free.pop()
+        else:
+            texture = Texture.create(size=(self.width, self.height),
+                                     colorfmt=fmt)
+            self.created += 1
+
+        texture.blit_buffer(imagedata.data, size=(width, height),
+                            colorfmt=fmt, rowlength=imagedata.rowlength or 0)
+
+        region = texture.get_region(0, 0, width, height)
+        if imagedata.flip_vertical:
+            region.flip_vertical()
+
+        return PhotoTexture(region, owner=texture, pool=self)
+
+    def release(self, texture):
+        """Returns a texture to the pool."""
+        free = self.free[texture.colorfmt]
+        if len(free) < self.max_free and texture not in free:
+            free.append(texture)
+
+    def clear(self):
+        for free in self.free.values():
+            del free[:]
+
+
+class PhotoCache(object):
+    """Creates thumbnails and preloads upcoming photos.
+
+       folder:   where to save the thumbnails
+       size:     (width, height) of the screen
+       prefetch: number of photos to preload
+    """
+    def __init__(self, folder, size, prefetch=PREFETCH):
+        self.folder = folder
+        self.width, self.height = (int(x) for x in size)
+        self.prefetch_count = prefetch
+        self.stopped = False
+        self.pool = TexturePool(size)
+
+        # Photo path -> path of the file to load (thumbnail or the original
+        # if the thumbnail couldn't be made)
+        self.thumbs = {}
+
+        # Photo path -> future for thumbnails being made
+        self.pending = {}
+
+        # Photo path -> FetchJob for photos being decoded
+        self.loading = {}
+
+        # Photo path -> PhotoTexture ready to be shown
+        self.textures = {}
+
+        # The photos we're preloading
+        self.wanted = set()
+
+        # (photo, callback) for the photo the screen is waiting for
+        self.waiting = None
+
+        if Image is None:
+            Logger.warning("PhotoCache: PIL not installed. Photos will not "
+                           "be resized.")
+            self.executor = None
+        else:
+            if not os.path.isdir(self.folder):
+                os.makedirs(self.folder)
+
+            # The worker is started with "spawn" rather than forked: a fork
+            # of this process would copy Kivy's GL state and any locks held
+            # by its other threads. The worker only needs thumbnails.py.
+            self.executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"))
+
+            # Tidy up old thumbnails before we make any new ones
+            self.executor.submit(prune_thumbnails, self.folder, MAX_THUMBNAILS)
+
+    def fetch(self, photo, callback):
+        """Calls callback with a PhotoTexture for the photo as soon as it's
+           ready (straight away if it's been preloaded).
+
+           The caller owns the PhotoTexture and must release it when it's
+           done with it. Only the most recent request is kept.
+        """
+        if self.stopped:
+            return
+
+        if photo in self.textures:
+            self.waiting = None
+            callback(self.textures.pop(photo))
+            return
+
+        self.waiting = (photo, callback)
+        self.wanted.add(photo)
+        self.start(photo)
+
+    def prefetch(self, photos):
+        """Starts preloading the photos (which should be the next ones to be
+           shown). Anything preloaded which isn't in the list is dropped.
+        """
+        if self.stopped:
+            return
+
+        self.wanted = set(photos[:self.prefetch_count])
+        if self.waiting:
+            self.wanted.add(self.waiting[0])
+
+        for photo in list(self.textures):
+            if photo not in self.wanted:
+                self.evict(photo)
+
+        for photo in self.wanted:
+            self.start(photo)
+
+    def start(self, photo):
+        """Starts whatever needs to happen next to get the photo ready."""
+        if photo in self.textures or photo in self.loading:
+            return
+
+        if photo in self.thumbs:
+            self.load(photo)
+
+        elif photo not in self.pending:
+            self.submit(photo)
+
+    def submit(self, photo):
+        """Asks the worker process to make a thumbnail for the photo."""
+        if self.executor is None:
+            self.thumbs[photo] = photo
+            self.load(photo)
+            return
+
+        future = self.executor.submit(make_thumbnail, photo, self.folder,
+                                      self.width, self.height)
+        self.pending[photo] = future
+        future.add_done_callback(partial(self._thumbnail_done, photo))
+
+    def _thumbnail_done(self, photo, future):
+        # This is called from the executor's thread so we need to get back
+        # to the main thread.
+        Clock.schedule_once(partial(self.thumbnail_done, photo, future), 0)
+
+    def thumbnail_done(self, photo, future, *args):
+        self.pending.pop(photo, None)
+
+        if self.stopped or future.cancelled():
+            return
+
+        try:
+            self.thumbs[photo] = future.result()
+        except Exception as e:
+            # Just show the original
+            Logger.warning("PhotoCache: unable to resize {}: "
+                           "{!r}".format(photo, e))
+            self.thumbs[photo] = photo
+
+        if photo in self.wanted:
+            self.load(photo)
+
+    def load(self, photo):
+        """Decodes the photo's thumbnail in the background."""
+        self.loading[photo] = fetch(load_image, self.thumbs[photo],
+                                    on_result=partial(self.loaded, photo),
+                                    on_error=partial(self.failed, photo))
+
+    def loaded(self, photo, imagedata):
+        self.loading.pop(photo, None)
+
+        if self.stopped or photo not in self.wanted:
+            return
+
+        self.textures[photo] = self.pool.acquire(imagedata)
+
+        if self.waiting and self.waiting[0] == photo:
+            _, callback = self.waiting
+            self.waiting = None
+            callback(self.textures.pop(photo))
+
+    def failed(self, photo, error):
+        self.loading.pop(photo, None)
+        Logger.warning("PhotoCache: unable to load {}: "
+                       "{!r}".format(photo, error))
+
+        if self.waiting and self.waiting[0] == photo:
+            self.waiting = None
+
+    def evict(self, photo):
+        """Drops the preloaded photo."""
+        texture = self.textures.pop(photo, None)
+        if texture is not None:
+            texture.release()
+
+    def clear(self):
+        """Drops all preloaded photos (e.g. when the screen is hidden)."""
+        self.wanted = set()
+        self.waiting = None
+
+        for photo in list(self.textures):
+            self.evict(photo)
+
+        for job in self.loading.values():
+            job.cancel()
+        self.loading = {}
+
+    def shutdown(self):
+        """Stops the worker process."""
+        self.stopped = True
+        self.clear()
+        self.pool.clear()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,236 @@
+"""Incremental photo index for the photo album screen.
+
+   Walking a large photo collection (e.g. a NAS share) and opening every file
+   to check whether it's an image takes far too long to do before showing
+   the first photo. Instead, the PhotoIndex runs in a background thread and
+   passes photos back to the screen in batches as it finds them.
+
+   The results are saved in an SQLite database keyed by path, along with
+   each file's size and modification time. On the next run the photos
+   already in the index are sent straight away and the rescan only needs to
+   check files which are new or have changed.
+
+   Files are recognised by their extension. The contents are only checked
+   (with imghdr) if the extension doesn't tell us what the file is.
+"""
+import os
+import sqlite3
+import time
+from functools import partial
+from threading import Thread
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+try:
+    from imghdr import what
+except ImportError:
+    what = None
+
+# Files with these extensions are photos...
+PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".jpe", ".png", ".bmp", ".tif", ".tiff",
+                    ".webp"}
+
+# ...and these aren't (we don't want gifs as they don't work well).
+OTHER_EXTENSIONS = {".gif", ".txt", ".json", ".xml", ".xmp", ".ini", ".db",
+                    ".thm", ".mp4", ".mov", ".avi", ".mkv", ".mpg", ".3gp",
+                    ".mp3", ".wav", ".pdf", ".doc", ".docx", ".zip", ".raw",
+                    ".cr2", ".nef", ".arw", ".dng", ".heic", ".aae", ".log"}
+
+# Image types (from imghdr) that we can show
+PHOTO_TYPES = {"jpeg", "png", "bmp", "tiff", "webp"}
+
+# Photos are sent to the screen in batches of this size (or sooner if it's
+# taking a while to find them)
+BATCH_SIZE = 50
+BATCH_TIME = 0.5
+
+# How often to save new entries to the index (number of files)
+COMMIT_EVERY = 500
+
+
+def is_photo(path):
+    """Returns True if the file looks like a photo we can display."""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext in PHOTO_EXTENSIONS:
+        return True
+
+    if ext in OTHER_EXTENSIONS or what is None:
+        return False
+
+    # Unknown extension so we need to check the contents
+    try:
+        return what(path) in PHOTO_TYPES
+    except (IOError, OSError):
+        return False
+
+
+class PhotoIndex(object):
+    """Finds photos in the background.
+
+       folders:   list of folders to search
+       dbfile:    path to the SQLite index
+       on_photos: called (on the main thread) with each batch of photos
+       on_done:   called (on the main thread) with a set of photos which
+                  have been removed since the last scan once the scan has
+                  finished
+    """
+    def __init__(self, folders, dbfile, on_photos=None, on_done=None):
+        self.folders = [os.path.abspath(f) for f in folders]
+        self.dbfile = dbfile
+        self.on_photos = on_photos
+        self.on_done = on_done
+        self.stopped = False
+        self.thread = None
+
+        self.batch = []
+        self.batch_time = 0
+
+    def start(self):
+        self.thread = Thread(target=self.run, name="photoindex")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stops the scan. No more callbacks are made."""
+        self.stopped = True
+
+    def send(self, photo=None, force=False):
+        """Adds the photo to the current batch and sends the batch to the
+           screen when it's big (or old) enough.
+        """
+        if photo is not None:
+            self.batch.append(photo)
+
+        now = time.time()
+        if self.batch and (force or len(self.batch) >= BATCH_SIZE or
+                           now - self.batch_time > BATCH_TIME):
+            batch, self.batch = self.batch, []
+            self.batch_time = now
+            if self.on_photos is not None and not self.stopped:
+                Clock.schedule_once(partial(self.deliver, self.on_photos,
+                                            batch), 0)
+
+    def deliver(self, callback, value, *args):
+        if not self.stopped:
+            callback(value)
+
+    def connect(self):
+        folder = os.path.dirname(self.dbfile)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        db = sqlite3.connect(self.dbfile)
+        db.execute("CREATE TABLE IF NOT EXISTS files "
+                   "(path TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+                   "photo INTEGER)")
+        return db
+
+    def in_folders(self, path):
+        return any(path.startswith(folder + os.sep) for folder in self.folders)
+
+    def walk(self, folder):
+        """Generator of DirEntry objects for the files under folder. Entries
+           are sorted so photos are found in (roughly) path order.
+        """
+        try:
+            entries = sorted(os.scandir(folder), key=lambda e: e.name)
+        except OSError:
+            return
+
+        for entry in entries:
+            if self.stopped:
+                return
+
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    for child in self.walk(entry.path):
+                        yield child
+                elif entry.is_file():
+                    yield entry
+            except OSError:
+                continue
+
+    def run(self):
+        try:
+            self.scan()
+        except Exception as e:
+            Logger.error("PhotoIndex: scan failed: {!r}".format(e))
+
+    def scan(self):
+        db = self.connect()
+
+        # Load what we found last time (in order, for when the photos aren't
+        # shuffled)
+        known = {}
+        for path, size, mtime, photo in db.execute("SELECT * FROM files "
+                                                   "ORDER BY path"):
+            if self.in_folders(path):
+                known[path] = (size, mtime, photo)
+
+        # We can show the photos we already know about straight away
+        for path, (_, _, photo) in known.items():
+            if photo:
+                self.send(path)
+        self.send(force=True)
+
+        # Now look for anything that's changed
+        seen = set()
+        demoted = set()
+        changed = 0
+
+        for folder in self.folders:
+            for entry in self.walk(folder):
+                path = entry.path
+                seen.add(path)
+
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+
+                old = known.get(path)
+                if old and old[0] == st.st_size and old[1] == st.st_mtime:
+                    continue
+
+                photo = is_photo(path)
+                db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                           (path, st.st_size, st.st_mtime, int(photo)))
+
+                # Don't send the same photo twice
+                if photo and not (old and old[2]):
+                    self.send(path)
+                else:
+                    self.send()
+
+                # It used to be a photo but isn't any more
+                if old and old[2] and not photo:
+                    demoted.add(path)
+
+                changed += 1
+                if changed % COMMIT_EVERY == 0:
+                    db.commit()
+
+        if self.stopped:
+            db.commit()
+            db.close()
+            return
+
+        # Remove anything that's been deleted
+        removed = set(known) - seen
+        db.executemany("DELETE FROM files WHERE path = ?",
+                       ((path,) for path in removed))
+        db.commit()
+        db.close()
+
+        self.send(force=True)
+
+        Logger.info("PhotoIndex: scan finished ({} changed, {} removed)"
+                    "".format(changed, len(removed)))
+
+        if self.on_done is not None:
+            removed_photos = {path for path in removed if known[path][2]}
+            removed_photos |= demoted
+            Clock.schedule_once(partial(self.deliver, self.on_done,
+                                        removed_photos), 0)
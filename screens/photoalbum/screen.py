@@ -1,19 +1,22 @@
-from glob import glob
 import os
+import sys
 
 from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.animation import Animation
 from kivy.properties import (ObjectProperty,
                              StringProperty,
+                             NumericProperty,
                              BoundedNumericProperty)
 from kivy.uix.label import Label
-from kivy.uix.screenmanager import Screen, SlideTransition, FadeTransition
+from kivy.uix.screenmanager import Screen
 from kivy.gesture import GestureDatabase
 from kivy.gesture import Gesture
 from kivy.uix.floatlayout import FloatLayout
 
 from functools import partial
-from random import shuffle
-from imghdr import what
+from bisect import bisect
+from random import randint, shuffle
 
 from core.my_gestures import left_to_right_line_str, right_to_left_line_str
 gesture_strings = {
@@ -26,26 +29,110 @@ for name, gesture_string in gesture_strings.items():
     gesture.name = name
     gestures.add_gesture(gesture)
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from photoindex import PhotoIndex
+from photocache import PhotoCache, PREFETCH
+
 
 class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
 
 
-class Photo(Screen):
-    """Screen object to display a photo."""
-    photo_path = StringProperty("")
+class PhotoView(FloatLayout):
+    """Widget to display the photos.
 
-    def __init__(self, **kwargs):
-        super(Photo, self).__init__(**kwargs)
-        self.photo_path = self.name
+       Rather than creating new widgets for every photo, the view has two
+       images which take it in turns to show the new photo. The new photo is
+       drawn on the back image which is then faded (or slid) in front of the
+       old one.
+    """
+    front = ObjectProperty(None)
+    back = ObjectProperty(None)
 
+    # Message to show when there are no photos
+    message = StringProperty("")
 
-class PhotoLoading(Screen):
-    """Holding screen to display while the screen retrieves the list of
-       photos.
-    """
-    pass
+    # Length of the transitions (seconds)
+    fade_duration = NumericProperty(1)
+    slide_duration = NumericProperty(0.4)
+
+    def __init__(self, **kwargs):
+        super(PhotoView, self).__init__(**kwargs)
+        self.anim = None
+
+        # Image widget -> PhotoTexture it's showing
+        self.shown = {}
+
+    def show(self, photo, slide=None):
+        """Shows the PhotoTexture.
+
+           slide: None to fade in the photo, or "left" or "right" to slide
+           it in from the side.
+        """
+        # Finish the last transition if it's still running
+        if self.anim is not None:
+            self.anim.cancel_all(self.front)
+            self.anim.cancel_all(self.back)
+            self.swap()
+
+        self.message = ""
+        front, back = self.front, self.back
+
+        self.release(back)
+        self.shown[back] = photo
+        back.texture = photo.texture
+
+        # Make sure the new photo is on top
+        self.remove_widget(back)
+        self.add_widget(back)
+
+        if slide is None:
+            back.pos = self.pos
+            back.opacity = 0
+            self.anim = Animation(opacity=1, duration=self.fade_duration)
+            self.anim.bind(on_complete=self.swap)
+            self.anim.start(back)
+
+        else:
+            offset = self.width if slide == "left" else -self.width
+            back.pos = (self.x + offset, self.y)
+            back.opacity = 1
+            self.anim = Animation(x=self.x, duration=self.slide_duration)
+            self.anim.bind(on_complete=self.swap)
+            self.anim.start(back)
+            Animation(x=self.x - offset,
+                      duration=self.slide_duration).start(front)
+
+    def swap(self, *args):
+        """Called when the transition has finished. The old photo can now
+           be hidden and its texture reused.
+        """
+        self.anim = None
+        self.front, self.back = self.back, self.front
+
+        self.back.opacity = 0
+        self.back.pos = self.pos
+        self.release(self.back)
+
+    def release(self, image):
+        photo = self.shown.pop(image, None)
+        image.texture = None
+        if photo is not None:
+            photo.release()
+
+    def clear(self):
+        """Removes the photos from the screen."""
+        if self.anim is not None:
+            self.anim.cancel_all(self.front)
+            self.anim.cancel_all(self.back)
+            self.anim = None
+
+        for image in (self.front, self.back):
+            image.opacity = 0
+            image.pos = self.pos
+            self.release(image)
 
 
 class GestureBox(FloatLayout):
@@ -105,8 +192,8 @@ class GestureBox(FloatLayout):
 class PhotoAlbumScreen(Screen, BlackHole):
     """Base screen to run the photo album."""
 
-    # Reference to the screen manager
-    photoscreen = ObjectProperty(None)
+    # Reference to the photo view
+    photoview = ObjectProperty(None)
 
     # Value for the screen display time
     photoduration = BoundedNumericProperty(5, min=2, max=60, errorvalue=5)
@@ -124,95 +211,150 @@ class PhotoAlbumScreen(Screen, BlackHole):
         self.running = False
         self.photos = []
         self.timer = None
-        self.oldPhoto = None
         self.photoindex = 0
+        self.indexer = None
+        self.cache = None
+        self.prefetch = params.get("prefetch", PREFETCH)
+
+        # The photo index and thumbnails are saved in the screen's folder
+        cachefolder = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "cache")
+        self.indexfile = os.path.join(cachefolder, "photoindex.db")
+        self.thumbfolder = os.path.join(cachefolder, "thumbs")
 
     def on_enter(self):
 
         if not self.running:
 
             # The screen hasn't been run before so let's tell the user
-            # that we need to get the photos
-            self.loading = PhotoLoading(name="loading")
-            self.photoscreen.add_widget(self.loading)
-            self.photoscreen.current = "loading"
+            # that we need to get the photos (unless we're already looking)
+            if self.indexer is None:
+                self.photoview.message = "Retrieving list of photos"
 
-            # Retrieve photos
-            Clock.schedule_once(self.getPhotos, 0.5)
-            Clock.schedule_once(partial(self.showPhoto, 'forward'), self.photoduration)
+                # Retrieve photos
+                Clock.schedule_once(self.getPhotos, 0.5)
 
-        else:
+        elif self.photos:
             # We've been here before so just show the photos
             self.timer = Clock.schedule_interval(partial(self.showPhoto, 'forward'), self.photoduration)
 
+            # and get the next ones ready
+            self.cache.prefetch(self.upcoming())
+
     def on_leave(self):
 
         # We can stop looping over photos
         Clock.unschedule(self.timer)
 
-    def getPhotos(self, *args):
-        """Method to retrieve list of photos based on user's preferences."""
-
-        # Get a list of extensions. Assumes all caps or all lower case.
-        # exts = []
-        # for ext in ([x.upper(), x.lower()] for x in self.exts):
-        #     exts.extend(ext)
+        # and free up the preloaded ones
+        if self.cache:
+            self.cache.clear()
 
-        # Loop over the folders
-        for folder in self.folders:
-            for (path, dirs, files) in os.walk(folder):
-                for the_file in files:
-                    path_file = os.path.join(path, the_file)
+    def unload(self):
+        # Stop looking for photos
+        if self.indexer:
+            self.indexer.stop()
 
-                    # uses what from IMGHDR to check for image file types
-                    file_type = what(path_file)
+        # and stop making thumbnails
+        if self.cache:
+            self.cache.shutdown()
 
-                    # If the image type matches an image we go one further
-                    if file_type is not None:
+        self.photoview.clear()
 
-                        # We don't want Gif's though as they don't work well
-                        if file_type is not 'gif':
-
-                            self.photos.append(path_file)
-
-        # shuffle if requested
-        if self.allow_shuffle:
-            shuffle(self.photos)
-        else:  # Put the photos in order
-            self.photos.sort()
-
-        # We've got the photos so we can set the running flag
-        self.running = True
+    def getPhotos(self, *args):
+        """Method to retrieve list of photos based on user's preferences.
+
+           Photos are found in the background and added to our list as they
+           arrive so we can start showing them straight away.
+        """
+        self.cache = PhotoCache(self.thumbfolder, Window.size,
+                                prefetch=self.prefetch)
+
+        self.indexer = PhotoIndex(self.folders, self.indexfile,
+                                  on_photos=self.addPhotos,
+                                  on_done=self.removePhotos)
+        self.indexer.start()
+
+    def addPhotos(self, photos):
+        """Adds a batch of photos found by the indexer."""
+        for photo in photos:
+            # shuffle if requested. We swap the new photo with one that
+            # hasn't been shown yet so the upcoming photos stay shuffled.
+            if self.allow_shuffle:
+                self.photos.append(photo)
+                last = len(self.photos) - 1
+                swap = randint(min(self.photoindex, last), last)
+                self.photos[last], self.photos[swap] = (self.photos[swap],
+                                                        self.photos[last])
+
+            # Otherwise keep the photos in order. New photos found by the
+            # rescan arrive after the ones that were already in the index.
+            else:
+                pos = bisect(self.photos, photo)
+                self.photos.insert(pos, photo)
+
+                # Keep our place in the list
+                if pos < self.photoindex:
+                    self.photoindex += 1
+
+        # Start the slideshow as soon as we've got something to show
+        if not self.running and self.photos:
+
+            # We've got the photos so we can set the running flag
+            self.running = True
+
+            # and start the timer (if we're still on this screen)
+            if self.manager and self.manager.current == self.name:
+                self.timer = Clock.schedule_interval(partial(self.showPhoto, 'forward'), self.photoduration)
+
+            # Show the first photo
+            self.showPhoto(direction="forward")
+
+        # The upcoming photos may have changed
+        elif self.manager and self.manager.current == self.name:
+            self.cache.prefetch(self.upcoming())
+
+    def removePhotos(self, removed):
+        """Removes photos which no longer exist. Called when the indexer has
+           finished.
+        """
+        if not removed:
+            return
+
+        # Keep our place in the list
+        current = self.photos[:self.photoindex]
+        self.photoindex -= len([x for x in current if x in removed])
+        self.photos = [x for x in self.photos if x not in removed]
+
+        if self.photos:
+            self.photoindex %= len(self.photos)
+        else:
+            self.photoindex = 0
 
-        # and start the timer
-        self.timer = Clock.schedule_interval(partial(self.showPhoto, 'forward'), self.photoduration)
+    def upcoming(self):
+        """Returns the next few photos to be shown."""
+        if not self.photos:
+            return []
 
-        # Show the first photo
-        self.showPhoto(direction="forward")
+        count = min(self.prefetch, len(self.photos))
+        return [self.photos[(self.photoindex + i) % len(self.photos)]
+                for i in range(count)]
 
     def swipe_photo(self, direction="forward"):
         # unschedule current clock
         Clock.unschedule(self.timer)
-        self.photoscreen.transition = SlideTransition()
-        if direction == 'forward':
-            self.photoscreen.transition.direction = 'left'
-        elif direction == 'back':
-            self.photoscreen.transition.direction = 'right'
 
         # Reschedule Clock
         self.timer = Clock.schedule_interval(partial(self.showPhoto, 'forward'), self.photoduration)
 
         # show the photo
-        self.showPhoto(direction)
+        self.showPhoto(direction, slide=True)
 
-        self.photoscreen.transition = FadeTransition()
-
-    def showPhoto(self, direction="forward", *args):
+    def showPhoto(self, direction="forward", *args, slide=False):
         """Method to update the currently displayed photo."""
-        try:
-            print(direction, args)
-        except ValueError:
-            print(direction)
+        # Nothing to show yet
+        if not self.photos:
+            return
 
         # Get the current photo
         if direction == "forward":
@@ -221,21 +363,15 @@ class PhotoAlbumScreen(Screen, BlackHole):
             self.photoindex = (self.photoindex - 2) % len(self.photos)
             photo = self.photos[self.photoindex]
 
-        # Create a screen object to show that photo
-        scr = Photo(name=photo)
-
-        # Add it to our screen manager and display it
-        self.photoscreen.add_widget(scr)
-        self.photoscreen.current = photo
-
-        # If we've got an old photo
-        if self.oldPhoto:
-
-            # We can unload it
-            self.photoscreen.remove_widget(self.oldPhoto)
+        # Display it as soon as it's ready (straight away if it's been
+        # preloaded)
+        if slide:
+            transition = "left" if direction == "forward" else "right"
+        else:
+            transition = None
 
-        # Create reference to the new photo
-        self.oldPhoto = scr
+        self.cache.fetch(photo, partial(self.photoview.show,
+                                        slide=transition))
 
         # Increase our index for the next photo
         self.photoindex = (self.photoindex + 1) % len(self.photos)
@@ -244,3 +380,6 @@ class PhotoAlbumScreen(Screen, BlackHole):
         if self.photoindex == len(self.photos):
             if self.allow_shuffle:
                 shuffle(self.photos)
+
+        # Get the next photos ready
+        self.cache.prefetch(self.upcoming())
@@ -0,0 +1,103 @@
+"""Creates display-sized copies of photos.
+
+   Decoding a full size camera image (which may be 20MP+) takes a long time
+   and a lot of memory, but we only ever show it at the size of the screen.
+   The functions here shrink each photo once and save the result so it can
+   be loaded quickly next time.
+
+   These functions are run in a separate process (see photocache.py) so this
+   module mustn't import Kivy.
+"""
+import hashlib
+import os
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# JPEG quality of the saved thumbnails
+QUALITY = 90
+
+
+def thumbnail_name(folder, path, width, height):
+    """Returns the path of the thumbnail for the photo at path.
+
+       The size is part of the name so that thumbnails are remade if the
+       screen resolution changes.
+    """
+    key = "{}:{}x{}".format(path, width, height)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(folder, "{}.jpg".format(digest))
+
+
+def make_thumbnail(path, folder, width, height):
+    """Shrinks the photo at path so that it fits in width x height and saves
+       it in folder.
+
+       Returns the path of the thumbnail. The thumbnail isn't recreated if
+       it's newer than the photo.
+    """
+    thumb = thumbnail_name(folder, path, width, height)
+
+    try:
+        if os.stat(thumb).st_mtime >= os.stat(path).st_mtime:
+            # Mark it as recently used
+            os.utime(thumb, None)
+            return thumb
+    except OSError:
+        pass
+
+    img = Image.open(path)
+
+    # For JPEGs this lets the decoder skip most of the work
+    img.draft("RGB", (width, height))
+
+    # Make sure the photo is the right way up
+    img = ImageOps.exif_transpose(img)
+
+    img.thumbnail((width, height))
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # Save to a temporary file first so we never load a partial thumbnail
+    tmp = "{}.{}.tmp".format(thumb, os.getpid())
+    img.save(tmp, "JPEG", quality=QUALITY)
+    os.replace(tmp, thumb)
+
+    return thumb
+
+
+def prune_thumbnails(folder, max_files):
+    """Deletes the least recently used thumbnails so there are no more than
+       max_files in folder.
+    """
+    try:
+        names = [x for x in os.listdir(folder) if x.endswith(".jpg")]
+    except OSError:
+        return 0
+
+    if len(names) <= max_files:
+        return 0
+
+    thumbs = []
+    for name in names:
+        fname = os.path.join(folder, name)
+        try:
+            thumbs.append((os.stat(fname).st_mtime, fname))
+        except OSError:
+            pass
+
+    # Oldest first
+    thumbs.sort()
+    removed = 0
+
+    for _, fname in thumbs[:len(thumbs) - max_files]:
+        try:
+            os.remove(fname)
+            removed += 1
+        except OSError:
+            pass
+
+    return removed
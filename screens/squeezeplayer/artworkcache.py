@@ -0,0 +1,280 @@
+"""Album artwork cache for the squeezeplayer screen.
+
+   AsyncImage downloads its image again every time a playlist row or the
+   now playing panel is redrawn. The ArtworkCache keeps the artwork instead:
+
+     - covers are downloaded once, in the background, and saved on disk
+       (keyed by the LMS coverid or the remote artwork URL);
+     - each cover is resized to the sizes we actually show it at and the
+       resized copies are saved on disk too (this needs PIL/Pillow - without
+       it the downloaded image is used at every size); and
+     - the most recently used textures are kept in memory so scrolling back
+       through the playlist doesn't need to load anything.
+
+   Widgets should use ArtworkImage, which gets its texture from the cache.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from functools import partial
+from threading import get_ident
+
+from kivy.core.image import ImageLoader
+from kivy.graphics.texture import Texture
+from kivy.logger import Logger
+from kivy.properties import ListProperty, StringProperty
+from kivy.uix.image import Image
+
+from core.fetch import fetch
+from core.httpclient import http_get
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+# Where the artwork is saved
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "cache", "artwork")
+
+# Number of textures to keep in memory
+MAX_TEXTURES = 100
+
+# Number of files to keep on disk
+MAX_FILES = 2000
+
+# Size to download remote artwork at (the largest size we show)
+DOWNLOAD_SIZE = (800, 800)
+
+# Image shown while the artwork is loading or if there isn't any
+DEFAULT_IMAGE = "images/10x10_transparent.png"
+
+# Image types we might download (the file extension tells Kivy how to load
+# the file)
+SIGNATURES = ((b"\xff\xd8", "jpg"),
+              (b"\x89PNG", "png"),
+              (b"GIF8", "gif"))
+
+
+def artwork_name(folder, key, size=None, ext="png"):
+    """Returns the path of the file for the artwork (at the given size or
+       as downloaded if size is None).
+    """
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    if size is None:
+        return os.path.join(folder, "{}.{}".format(digest, ext))
+
+    return os.path.join(folder, "{}_{}x{}.png".format(digest, *size))
+
+
+def find_original(folder, key):
+    """Returns the path of the downloaded artwork or None if we don't have
+       it.
+    """
+    for _, ext in SIGNATURES:
+        path = artwork_name(folder, key, ext=ext)
+        if os.path.exists(path):
+            return path
+
+    return None
+
+
+def image_type(data):
+    for signature, ext in SIGNATURES:
+        if data.startswith(signature):
+            return ext
+
+    # Most artwork is JPEG
+    return "jpg"
+
+
+def save_file(path, data):
+    """Writes to a temporary file first so we never load a partial file."""
+    tmp = "{}.{}.tmp".format(path, get_ident())
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_artwork(folder, key, url, size):
+    """Returns the ImageData of the artwork at the given size, downloading
+       and resizing it if it's not on disk already. Run in a worker thread.
+    """
+    path = artwork_name(folder, key, size)
+
+    if not os.path.exists(path):
+        original = find_original(folder, key)
+
+        if original is None:
+            r = http_get(url)
+            r.raise_for_status()
+            original = artwork_name(folder, key, ext=image_type(r.content))
+            save_file(original, r.content)
+
+        if PILImage is None:
+            path = original
+
+        else:
+            img = PILImage.open(original)
+            img.thumbnail(size)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            tmp = "{}.{}.tmp".format(path, get_ident())
+            img.save(tmp, "PNG")
+            os.replace(tmp, path)
+
+    # Mark it as recently used
+    os.utime(path, None)
+
+    return ImageLoader.load(path)._data[0]
+
+
+def prune_artwork(folder, max_files):
+    """Deletes the least recently used files so there are no more than
+       max_files in folder.
+    """
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+
+    if len(names) <= max_files:
+        return
+
+    files = []
+    for name in names:
+        fname = os.path.join(folder, name)
+        try:
+            files.append((os.stat(fname).st_mtime, fname))
+        except OSError:
+            pass
+
+    # Oldest first
+    files.sort()
+    for _, fname in files[:len(files) - max_files]:
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+
+
+class ArtworkCache(object):
+    """Loads artwork in the background and keeps the textures.
+
+       folder:       where to save the artwork
+       max_textures: number of textures to keep in memory
+    """
+    def __init__(self, folder=CACHE_FOLDER, max_textures=MAX_TEXTURES):
+        self.folder = folder
+        self.max_textures = max_textures
+
+        # (key, size) -> Texture, least recently used first
+        self.textures = OrderedDict()
+
+        # (key, size) -> list of callbacks waiting for the artwork
+        self.waiting = {}
+
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+
+        # Tidy up old artwork
+        fetch(prune_artwork, self.folder, MAX_FILES)
+
+    def get(self, key, url, size, callback):
+        """Calls callback with the texture for the artwork (straight away if
+           it's in memory) or None if it couldn't be loaded.
+        """
+        size = tuple(int(x) for x in size)
+        item = (key, size)
+
+        texture = self.textures.get(item)
+        if texture is not None:
+            self.textures.move_to_end(item)
+            callback(texture)
+            return
+
+        # Only load each cover once
+        if item in self.waiting:
+            self.waiting[item].append(callback)
+            return
+
+        self.waiting[item] = [callback]
+        fetch(load_artwork, self.folder, key, url, size,
+              on_result=partial(self.loaded, item),
+              on_error=partial(self.failed, item))
+
+    def loaded(self, item, imagedata):
+        texture = Texture.create_from_data(imagedata)
+        if imagedata.flip_vertical:
+            texture.flip_vertical()
+
+        self.textures[item] = texture
+        while len(self.textures) > self.max_textures:
+            self.textures.popitem(last=False)
+
+        for callback in self.waiting.pop(item, []):
+            callback(texture)
+
+    def failed(self, item, error):
+        Logger.warning("Squeezeplayer: unable to load artwork for {}: "
+                       "{!r}".format(item[0], error))
+
+        for callback in self.waiting.pop(item, []):
+            callback(None)
+
+    def clear(self):
+        """Drops the textures held in memory."""
+        self.textures.clear()
+
+
+# The cache is created the first time it's needed.
+_cache = None
+
+
+def get_artwork_cache():
+    """Returns the shared ArtworkCache instance."""
+    global _cache
+
+    if _cache is None:
+        _cache = ArtworkCache()
+
+    return _cache
+
+
+class ArtworkImage(Image):
+    """Image which shows cached artwork.
+
+       key:     artwork key (from ArtworkResolver.getKey)
+       url:     where to download the artwork from
+       artsize: size to load the artwork at
+    """
+    key = StringProperty("")
+    url = StringProperty("")
+    artsize = ListProperty([50, 50])
+    default = StringProperty(DEFAULT_IMAGE)
+
+    def __init__(self, **kwargs):
+        super(ArtworkImage, self).__init__(**kwargs)
+        self.source = self.default
+        self.bind(key=self.load, url=self.load, artsize=self.load)
+        self.load()
+
+    def load(self, *args):
+        if not self.key or not self.url:
+            self.texture = None
+            self.source = self.default
+            return
+
+        get_artwork_cache().get(self.key, self.url, self.artsize,
+                                partial(self.show, self.key))
+
+    def show(self, key, texture):
+        # The widget may have been given different artwork in the meantime
+        if key != self.key:
+            return
+
+        if texture is None:
+            self.source = self.default
+        else:
+            self.source = ""
+            self.texture = texture
@@ -1,4 +1,7 @@
-from urllib import urlencode
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
 
 class ArtworkResolver(object):
     """Class object to help provide an easy way of obtaining a URL to a
@@ -109,3 +112,24 @@ class ArtworkResolver(object):
         # or it's a local file, so let's get the link
         else:
             return self.__getLocalURL(track)
+
+    def getKey(self, track):
+        """Method for getting a key which identifies the artwork for the
+           selected track (e.g. for caching it).
+
+           Returns "cover:<coverid>" for local artwork, the artwork URL for
+           remote artwork or None if the track has no artwork.
+        """
+        try:
+            remote = int(track.get("remote", 0))
+            coverart = int(track.get("coverart", 0))
+        except (AttributeError, ValueError):
+            return None
+
+        if remote:
+            return track.get("artwork_url") or None
+
+        elif coverart and track.get("coverid"):
+            return "cover:{}".format(track["coverid"])
+
+        return None
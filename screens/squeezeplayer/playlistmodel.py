@@ -0,0 +1,262 @@
+"""Playlist model for the squeezeplayer screen.
+
+   Fetching the whole playlist every time it changes doesn't work for long
+   playlists (a party queue can have thousands of tracks). Instead the
+   PlaylistModel:
+
+     - only asks the server how many tracks there are when the playlist is
+       loaded (in the background);
+     - fetches the track metadata in pages, in the background, when the
+       rows are actually needed (i.e. scrolled into view); and
+     - applies "playlist delete/move/clear/addtracks" notifications to the
+       tracks it already has rather than starting again.
+
+   The model doesn't create any widgets. Whoever displays it sets on_reset
+   (called when every row needs redrawing) and on_update (called with the
+   start and stop index of rows which have changed). on_load is called once
+   a reload has finished (e.g. to show the current track).
+"""
+from functools import partial
+
+from kivy.logger import Logger
+
+from core.fetch import fetch
+
+# Number of tracks to fetch in each request
+PAGE_SIZE = 50
+
+
+def get_playlist_state(player):
+    """Returns (number of tracks, index of the current track) for the
+       player's playlist. Run in a worker thread.
+    """
+    count, pos = player.server.request_batch(
+        ["%s playlist tracks ?" % (player.ref),
+         "%s playlist index ?" % (player.ref)])
+
+    try:
+        count = int(count)
+    except ValueError:
+        count = 0
+
+    try:
+        pos = int(pos)
+    except ValueError:
+        pos = 0
+
+    return count, pos
+
+
+class PlaylistModel(object):
+    """Tracks in the current player's playlist.
+
+       player:    pylms Player object
+       taglist:   list of tags to request for each track
+       page_size: number of tracks to fetch at once
+    """
+    def __init__(self, player, taglist, page_size=PAGE_SIZE):
+        self.player = player
+        self.taglist = taglist
+        self.page_size = page_size
+
+        # Track info dicts or None if we haven't fetched the track yet
+        self.tracks = []
+
+        # Index of the current track
+        self.pos = 0
+
+        # Page number -> FetchJob for pages being fetched
+        self.jobs = {}
+
+        # FetchJob for the length of the playlist (see reload and extend)
+        self.job = None
+
+        self.on_reset = None
+        self.on_update = None
+        self.on_load = None
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def track(self, index):
+        """Returns the info for the track at index or None if it hasn't
+           been fetched yet (or there's no such track).
+        """
+        if 0 <= index < len(self.tracks):
+            return self.tracks[index]
+
+        return None
+
+    def set_player(self, player):
+        # Don't show the old player's tracks while the new ones load
+        self.player = player
+        self.clear()
+        self.reload()
+
+    def reload(self):
+        """Starts again with an empty playlist of the right length (once
+           the server has told us what that is). Track info is fetched when
+           it's requested.
+        """
+        self.cancel()
+        self.job = fetch(get_playlist_state, self.player,
+                         on_result=self.loaded, on_error=self.load_failed)
+
+    def loaded(self, state):
+        self.job = None
+        count, self.pos = state
+
+        self.tracks = [None] * count
+        self.reset()
+
+        if self.on_load is not None:
+            self.on_load()
+
+    def load_failed(self, error):
+        self.job = None
+        Logger.warning("Squeezeplayer: unable to load playlist: "
+                       "{!r}".format(error))
+
+    def cancel(self):
+        """Cancels any fetches (e.g. because the tracks have moved)."""
+        for job in self.jobs.values():
+            job.cancel()
+
+        self.jobs = {}
+
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def reset(self):
+        if self.on_reset is not None:
+            self.on_reset()
+
+    def updated(self, start, stop):
+        if self.on_update is not None and start < stop:
+            self.on_update(start, stop)
+
+    def request(self, index):
+        """Makes sure the page containing index is being fetched."""
+        if self.track(index) is not None or not (0 <= index < len(self)):
+            return
+
+        page = index // self.page_size
+        if page in self.jobs:
+            return
+
+        self.jobs[page] = fetch(self.player.playlist_get_info,
+                                taglist=self.taglist,
+                                start=page * self.page_size,
+                                amount=self.page_size,
+                                on_result=partial(self.page_loaded, page),
+                                on_error=partial(self.page_failed, page))
+
+    def page_loaded(self, page, items):
+        self.jobs.pop(page, None)
+
+        for item in items:
+            index = item.get("position")
+            if index is not None and 0 <= index < len(self.tracks):
+                self.tracks[index] = item
+
+        start = page * self.page_size
+        self.updated(start, min(start + self.page_size, len(self.tracks)))
+
+    def page_failed(self, page, error):
+        self.jobs.pop(page, None)
+        Logger.warning("Squeezeplayer: unable to fetch playlist: "
+                       "{!r}".format(error))
+
+    def set_position(self, pos):
+        """Sets the current track."""
+        old, self.pos = self.pos, pos
+        if old != pos:
+            self.updated(old, old + 1)
+            self.updated(pos, pos + 1)
+
+    def set_track(self, index, track):
+        """Stores info for a track which has been fetched separately."""
+        if 0 <= index < len(self.tracks):
+            self.tracks[index] = track
+            self.updated(index, index + 1)
+
+    def apply(self, event):
+        """Updates the playlist from a playlist notification.
+
+           Expected events are:
+             [player_ref] playlist delete [index]
+             [player_ref] playlist move [from] [to]
+             [player_ref] playlist clear
+             [player_ref] playlist addtracks ...
+
+           Anything else reloads the playlist.
+        """
+        words = event.split() if event else []
+        command = words[2] if len(words) > 2 else None
+
+        # We're still waiting for the server to tell us about the playlist
+        # and its answer may be from before this change, so just ask again.
+        if self.job is not None:
+            self.reload()
+            return
+
+        try:
+            if command == "delete":
+                self.delete(int(words[3]))
+            elif command == "move":
+                self.move(int(words[3]), int(words[4]))
+            elif command == "clear":
+                self.clear()
+            elif command in ("add", "addtracks"):
+                self.extend()
+            else:
+                self.reload()
+
+        except (IndexError, ValueError):
+            self.reload()
+
+    def delete(self, index):
+        del self.tracks[index]
+        if index < self.pos:
+            self.pos -= 1
+
+        # Pages being fetched would now be in the wrong place
+        self.cancel()
+        self.reset()
+
+    def move(self, source, dest):
+        track = self.tracks.pop(source)
+        self.tracks.insert(dest, track)
+
+        if self.pos == source:
+            self.pos = dest
+        elif source < self.pos <= dest:
+            self.pos -= 1
+        elif dest <= self.pos < source:
+            self.pos += 1
+
+        self.cancel()
+        self.reset()
+
+    def clear(self):
+        self.cancel()
+        self.tracks = []
+        self.pos = 0
+        self.reset()
+
+    def extend(self):
+        """Tracks have been added to the end of the playlist."""
+        self.job = fetch(self.player.playlist_track_count,
+                         on_result=self.extended, on_error=self.load_failed)
+
+    def extended(self, count):
+        self.job = None
+        old = len(self.tracks)
+
+        if count > old:
+            self.tracks.extend([None] * (count - old))
+            self.updated(old, count)
+
+        elif count < old:
+            self.reload()
@@ -3,17 +3,76 @@ An asynchronous client that listens to messages broadcast by the server.
 
 The client also accepts callback functions.
 
-The client subclasses python threading so methods are built-in to the class
-object.
+The client runs an asyncio event loop in a background thread. Notifications
+are read with a stream reader (so they're handled as soon as they arrive)
+and matched against the registered callbacks using a prefix trie. The
+callbacks themselves are run on the Kivy clock (i.e. on the main thread) so
+they can update the screen safely.
+
+If the connection is lost the client keeps trying to reconnect, waiting a
+little longer after each failed attempt.
 """
+import asyncio
 from threading import Thread
-from telnetlib import IAC, NOP
-import socket
+
+try:
+    from kivy.clock import Clock
+except ImportError:
+    Clock = None
 
 from pylms.server import Server
 
+# Delay (in seconds) before the first reconnection attempt. This is doubled
+# after every failed attempt up to MAX_BACKOFF.
+MIN_BACKOFF = 1
+MAX_BACKOFF = 60
+
+# Longest notification we'll read (bytes). Some (e.g. when a long playlist is
+# loaded) are bigger than the stream reader's 64 KiB default. Anything
+# longer than this is skipped.
+LINE_LIMIT = 1024 * 1024
+
+
+class EventTrie(object):
+    """Prefix trie of subscribed events.
+
+       Events are stored word by word e.g. "playlist pause" is stored as
+       "playlist" -> "pause". Looking up a notification returns the callback
+       for the longest subscribed event that the notification starts with.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, event, callback):
+        node = self.root
+        for word in event.split():
+            node = node.setdefault(word, {})
+        node[None] = callback
+
+    def remove(self, event):
+        node = self.root
+        for word in event.split():
+            node = node.get(word)
+            if node is None:
+                return
+        node.pop(None, None)
+
+    def match(self, words):
+        """Returns the callback for the longest event matching the start of
+           the list of words (or None).
+        """
+        node = self.root
+        found = node.get(None)
+        for word in words:
+            node = node.get(word)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
 
-class CallbackServer(Server, Thread):
+class CallbackServer(Server):
 
     MIXER_ALL = "mixer"
     VOLUME_CHANGE = "mixer volume"
@@ -29,11 +88,13 @@ class CallbackServer(Server, Thread):
     PLAYLIST_LOADED = "playlist load_done"
     PLAYLIST_REMOVE = "playlist delete"
     PLAYLIST_CLEAR = "playlist clear"
+    PLAYLIST_MOVE = "playlist move"
     PLAYLIST_CHANGED = [PLAYLIST_LOAD_TRACKS,
                         PLAYLIST_LOADED,
                         PLAYLIST_ADD_TRACKS,
                         PLAYLIST_REMOVE,
-                        PLAYLIST_CLEAR]
+                        PLAYLIST_CLEAR,
+                        PLAYLIST_MOVE]
 
     CLIENT_ALL = "client"
     CLIENT_NEW = "client new"
@@ -42,12 +103,20 @@ class CallbackServer(Server, Thread):
 
     SYNC = "sync"
 
-    def __init__(self, **kwargs):
+    def __init__(self, on_connect=None, on_disconnect=None, **kwargs):
+        """on_connect and on_disconnect are called (with no parameters)
+           whenever the connection to the server is made or lost.
+        """
         super(CallbackServer, self).__init__(**kwargs)
         self.callbacks = {}
+        self.trie = EventTrie()
         self.notifications = []
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
         self.abort = False
-        self.ending = "\n".encode(self.charset)
+        self.connected = False
+        self.loop = None
+        self.thread = None
 
     def add_callback(self, event, callback):
         """Add a callback.
@@ -65,6 +134,7 @@ class CallbackServer(Server, Thread):
 
     def __add_callback(self, event, callback):
         self.callbacks[event] = callback
+        self.trie.add(event, callback)
         notification = event.split(" ")[0]
         if notification not in self.notifications:
             self.notifications.append(notification)
@@ -84,62 +154,170 @@ class CallbackServer(Server, Thread):
 
     def __remove_callback(self, event):
         del self.callbacks[event]
+        self.trie.remove(event)
 
     def check_event(self, event):
         """Checks whether any of the requested notification types match the
            received notification. If there's a match, we run the requested
            callback function passing the notification as the only parameter.
+
+           Notifications usually start with the player reference so we try
+           matching from the second word as well as the first.
         """
-        for cb in self.callbacks:
-            if cb in event:
-                self.callbacks[cb](self.unquote(event))
-                break
+        words = [self.unquote(w) for w in event.split(" ")]
+        event = self.unquote(event)
 
-    def check_connection(self):
-        """Method to check whether we can still connect to the server.
+        callback = self.trie.match(words[1:]) or self.trie.match(words)
 
-           Sets the flag to stop the server if no collection is available.
-        """
-        # Create a socket object
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if callback is not None:
+            self.dispatch(callback, event)
+
+    def dispatch(self, callback, *args):
+        """Runs the callback on the main thread."""
+        if callback is None:
+            return
+
+        if Clock is not None:
+            Clock.schedule_once(lambda dt: self.deliver(callback, *args), 0)
+        else:
+            self.deliver(callback, *args)
+
+    def deliver(self, callback, *args):
+        # Notifications which were queued before we were stopped are dropped
+        if not self.abort:
+            callback(*args)
+
+    def start(self):
+        """Starts listening for notifications in a background thread."""
+        self.abort = False
+
+        # The loop is made here (rather than in the thread) so stop works
+        # even if it's called before the thread has got going.
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.run, args=(self.loop,),
+                             name="lms-callbacks")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stops listening and closes the connection."""
+        self.abort = True
+        loop = self.loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self.cancel)
+            except RuntimeError:
+                # The loop has already finished
+                pass
+
+    def cancel(self):
+        # Run in the loop so the listener's task has been created by now
+        for task in asyncio.all_tasks():
+            task.cancel()
 
-        # Set a timeout - we don't want this to block unnecessarily
-        s.settimeout(2)
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
 
+    def run(self, loop):
         try:
-            # Try to connect
-            s.connect((self.hostname, self.port))
+            loop.run_until_complete(loop.create_task(self.listen()))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+            if self.loop is loop:
+                self.loop = None
+
+    async def listen(self):
+        """Keeps a connection to the server open, reconnecting as needed."""
+        backoff = MIN_BACKOFF
+
+        while not self.abort:
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.hostname, self.port,
+                                            limit=LINE_LIMIT), 5)
+            except (OSError, asyncio.TimeoutError):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+
+            try:
+                await self.subscribe(reader, writer)
 
-        except socket.error:
-            # We can't connect so stop the server
-            self.abort = True
+                self.connected = True
+                backoff = MIN_BACKOFF
+                self.dispatch(self.on_connect)
 
-        # Close our socket object
-        s.close()
+                while True:
+                    line = await self.readline(reader)
 
-    def run(self):
-        self.connect()
+                    # Server closed the connection
+                    if not line:
+                        break
+
+                    line = line.rstrip(b"\r\n")
+                    if line:
+                        self.check_event(line.decode(self.charset, "replace"))
+
+            except (OSError, asyncio.IncompleteReadError):
+                pass
+
+            finally:
+                writer.close()
+                if self.connected:
+                    self.connected = False
+                    self.dispatch(self.on_disconnect)
+
+            if not self.abort:
+                await asyncio.sleep(backoff)
+
+    async def subscribe(self, reader, writer):
+        """Logs in (if needed) and tells the server which notifications we
+           want.
+        """
+        commands = []
+        if self.username:
+            commands.append("login %s %s" % (self.username, self.password))
 
         # If we've already defined callbacks then we know which events we're
         # listening out for
         if self.notifications:
-            nots = ",".join(self.notifications)
-            self.request("subscribe {}".format(nots))
+            commands.append("subscribe {}".format(",".join(self.notifications)))
 
         # If not, let's just listen for everything.
         else:
-            self.request("listen")
+            commands.append("listen 1")
 
-        while not self.abort:
+        for command in commands:
+            writer.write(("%s\n" % (command)).encode(self.charset))
+        await writer.drain()
+
+        # Read the answers so they're not mistaken for notifications
+        for _ in commands:
+            await self.readline(reader)
+
+    async def readline(self, reader):
+        """Returns the next line from the server (b"" once the connection
+           has closed). Lines longer than LINE_LIMIT are skipped rather than
+           stopping the listener.
+        """
+        skipping = False
+
+        while True:
             try:
-                # Include a timeout to stop blocking if no server
-                data = self.telnet.read_until(self.ending, timeout=1)[:-1]
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                return b"" if skipping else e.partial
+            except asyncio.LimitOverrunError as e:
+                # Throw away what we've got of the line and carry on until
+                # we reach its end.
+                await reader.readexactly(e.consumed)
+                skipping = True
+                continue
 
-                # We've got a notification, so let's see if it's one we're
-                # watching.
-                if data:
-                    self.check_event(data)
+            if not skipping:
+                return line
 
-            # Server is unavailable so exit gracefully
-            except EOFError:
-                self.abort = True
+            # That was the end of the long line
+            skipping = False
@@ -0,0 +1,148 @@
+"""
+Persistent, pipelined connection to the Logitech Media Server CLI.
+
+The CLI answers every command with a single line which starts with the
+command itself (URL quoted) and answers commands in the order they were
+sent. That means we don't need to wait for one answer before sending the
+next command: a whole batch of commands can be written to the socket in one
+go and the answers read back afterwards, so a batch only costs one round
+trip to the server.
+
+Each answer is matched back to its command by checking that it echoes the
+command's first word (the command name or the player reference). Anything
+else (e.g. the late answer to a batch that timed out) is discarded.
+"""
+import socket
+from threading import RLock
+
+try:
+    from urllib.parse import unquote
+except ImportError:
+    from urllib import unquote
+
+
+class Connection(object):
+    """
+    Connection
+    """
+
+    def __init__(self, hostname="localhost", port=9090, charset="utf8",
+                 timeout=2):
+        """
+        Constructor
+
+        timeout is the number of seconds to wait to connect. The time to
+        wait for answers is set for each request.
+        """
+        self.hostname = hostname
+        self.port = port
+        self.charset = charset
+        self.timeout = timeout
+        self.sock = None
+        self.buffer = b""
+
+        # Requests can be made from more than one thread so only let one
+        # batch use the socket at a time
+        self.lock = RLock()
+
+    @property
+    def connected(self):
+        return self.sock is not None
+
+    def connect(self):
+        """
+        Connect
+        """
+        self.close()
+        self.sock = socket.create_connection((self.hostname, self.port),
+                                             timeout=self.timeout)
+
+    def close(self):
+        """
+        Close the socket. Any unread answers are thrown away.
+        """
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except socket.error:
+                pass
+
+        self.sock = None
+        self.buffer = b""
+
+    def send(self, commands):
+        """
+        Writes the commands to the socket in a single write.
+        """
+        data = "".join("%s\n" % (command) for command in commands)
+        self.sock.sendall(data.encode(self.charset))
+
+    def read_line(self, timeout=None):
+        """
+        Returns the next line from the server (without the newline) or None
+        if nothing arrived within timeout seconds.
+
+        Raises EOFError if the server closed the connection.
+        """
+        while b"\n" not in self.buffer:
+            self.sock.settimeout(timeout)
+            try:
+                data = self.sock.recv(4096)
+            except socket.timeout:
+                return None
+
+            if not data:
+                self.close()
+                raise EOFError("Connection closed by server")
+
+            self.buffer += data
+
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line.rstrip(b"\r")
+
+    def request(self, commands, timeout=1):
+        """
+        Sends a batch of commands and returns a list of the answers (as
+        bytes), in the same order as the commands.
+
+        If the server doesn't answer everything within timeout seconds then
+        the missing answers are returned as empty strings and the connection
+        is closed, so that late answers can't be mistaken for answers to the
+        next batch. The next request reconnects.
+        """
+        with self.lock:
+            if not self.connected:
+                self.connect()
+
+            try:
+                self.send(commands)
+            except socket.error:
+                # The server has probably dropped the connection so try once
+                # more with a new one
+                self.connect()
+                self.send(commands)
+
+            answers = []
+            pending = list(commands)
+
+            while pending:
+                line = self.read_line(timeout)
+
+                if line is None:
+                    self.close()
+                    answers += [b""] * len(pending)
+                    break
+
+                if self.matches(pending[0], line):
+                    answers.append(line)
+                    pending.pop(0)
+
+            return answers
+
+    def matches(self, command, line):
+        """
+        Returns True if line is the answer to command.
+        """
+        expected = command.split(" ", 1)[0]
+        echoed = line.split(b" ", 1)[0].decode(self.charset, "replace")
+        return unquote(echoed) == expected
@@ -27,9 +27,13 @@ class Player(object):
 
     # internals
 
-    def __init__(self, server=None, index=None, update=True, charset="utf8"):
+    def __init__(self, server=None, index=None, update=True, charset="utf8",
+                 info=None):
         """
         Constructor
+
+        info is a dict of properties from Server.get_players_info. If it's
+        given the player doesn't need to query the server.
         """
         self.server = server
         self.logger = None
@@ -64,7 +68,10 @@ class Player(object):
         self.track_remote = None
         self.track_current_title = None
         self.track_path = None
-        self.update(index, update=update)
+        if info is not None:
+            self.update_from_info(index, info)
+        else:
+            self.update(index, update=update)
 
     def __repr__(self):
         return "Player: %s" % (self.ref)
@@ -77,30 +84,67 @@ class Player(object):
     def update(self, index, update=True):
         """Update Player Properties from Server"""
         self.index = index
-        self.ref = self.server.request("player id %i ?" % index)
-        self.name = self.server.request("player name %i ?" % index)
+        commands = ["player id %i ?" % index,
+                    "player name %i ?" % index]
         if update:
-            self.uuid = str(self.__unquote(
-                self.server.request("player uuid %i ?" % index)
-            ))
-            self.ip_address = str(self.__unquote(
-                self.server.request("player ip %i ?" % index)
-            ))
-            self.model = str(self.__unquote(
-                self.server.request("player model %i ?" % index)
-            ))
-            self.display_type = str(self.__unquote(
-                self.server.request("player displaytype %i ?" % index)
-            ))
-            self.can_power_off = bool(self.__unquote(
-                self.server.request("player canpoweroff %i ?" % index)
-            ))
-            self.is_player = bool(self.__unquote(
-                self.server.request("player isplayer %i ?" % index)
-            ))
-            self.is_connected = bool(self.__unquote(
-                self.server.request("player connected %i ?" % index)
-            ))
+            commands += ["player %s %i ?" % (prop, index) for prop in
+                         ("uuid", "ip", "model", "displaytype", "canpoweroff",
+                          "isplayer", "connected")]
+
+        # Send all the queries in one go
+        results = self.server.request_batch(commands)
+        self.ref, self.name = results[:2]
+        if update:
+            uuid, ip, model, display, poweroff, player, connected = \
+                [self.__unquote(r) for r in results[2:]]
+            self.uuid = str(uuid)
+            self.ip_address = str(ip)
+            self.model = str(model)
+            self.display_type = str(display)
+            self.can_power_off = (poweroff == "1")
+            self.is_player = (player == "1")
+            self.is_connected = (connected == "1")
+
+    def update_from_info(self, index, info):
+        """Update Player Properties from the result of a players query"""
+        self.index = index
+        self.ref = info.get("playerid")
+        self.name = info.get("name")
+        self.uuid = str(info.get("uuid", ""))
+        self.ip_address = str(info.get("ip", ""))
+        self.model = str(info.get("model", ""))
+        self.display_type = str(info.get("displaytype", ""))
+        self.can_power_off = (info.get("canpoweroff") == "1")
+        self.is_player = (info.get("isplayer") == "1")
+        self.is_connected = (info.get("connected") == "1")
+
+    def get_status(self):
+        """Get Player Status
+        Returns a dict of the player's status (mode, time, mixer volume,
+        playlist_cur_index, playlist_tracks etc.) from a single status
+        query. Also updates the matching properties."""
+        response = self.request("status - 1", True)
+        status = {}
+        for token in response.split(" "):
+            token = self.__unquote(token)
+            if ":" not in token:
+                continue
+            key, value = token.split(":", 1)
+            # Everything after this is about the tracks in the playlist
+            if key == "playlist index":
+                break
+            status[key] = value
+
+        self.mode = status.get("mode", self.mode)
+        try:
+            self.time = float(status.get("time", 0))
+        except ValueError:
+            self.time = float(0)
+        try:
+            self.volume = int(status.get("mixer volume", self.volume))
+        except (TypeError, ValueError):
+            pass
+        return status
 
     ## getters/setters
 
@@ -347,11 +391,14 @@ class Player(object):
         except ValueError:
             return 0
 
-    def playlist_get_info(self, taglist=None):
-        """Get info about the tracks in the current playlist"""
-        amount = self.playlist_track_count()
+    def playlist_get_info(self, taglist=None, start=0, amount=None):
+        """Get info about the tracks in the current playlist
+        (or amount tracks from start if given)"""
+        if amount is None:
+            amount = self.playlist_track_count()
         tags = " tags:{}".format(",".join(taglist)) if taglist else ""
-        response = self.request('status 0 %i %s' % (amount, tags), True)
+        response = self.request('status %i %i %s' % (start, amount, tags),
+                                True)
         encoded_list = response.split('playlist%20index')[1:]
         playlist = []
         for encoded in encoded_list:
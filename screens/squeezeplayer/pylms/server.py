@@ -19,8 +19,8 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 """
 
-import telnetlib
 import urllib
+from pylms.connection import Connection
 from pylms.player import Player
 
 
@@ -45,7 +45,7 @@ class Server(object):
         super(Server, self).__init__(**kwargs)
         self.debug = False
         self.logger = None
-        self.telnet = None
+        self.connection = None
         self.logged_in = False
         self.hostname = hostname
         self.port = port
@@ -65,13 +65,17 @@ class Server(object):
         self.get_players(update=update)
 
     def disconnect(self):
-        self.telnet.close()
+        self.connection.close()
 
     def telnet_connect(self):
         """
         Telnet Connect
+
+        The connection is kept open and shared by all requests.
         """
-        self.telnet = telnetlib.Telnet(self.hostname, self.port, timeout=2)
+        self.connection = Connection(self.hostname, self.port,
+                                     charset=self.charset, timeout=2)
+        self.connection.connect()
 
     def login(self):
         """
@@ -84,12 +88,26 @@ class Server(object):
         """
         Request
         """
-        # self.logger.debug("Telnet: %s" % (command_string))
-        self.telnet.write(self.__encode(command_string + "\n"))
+        return self.request_batch([command_string], preserve_encoding)[0]
+
+    def request_batch(self, commands, preserve_encoding=False):
+        """
+        Request Batch
+        Sends all the commands at once (so they only need one round trip to
+        the server) and returns a list of the results in the same order.
+        """
         # Include a timeout to stop unnecessary blocking
-        response = self.telnet.read_until(self.__encode("\n"),timeout=1)[:-1]
+        responses = self.connection.request(commands, timeout=1)
+        return [self.__result(command_string, response, preserve_encoding)
+                for command_string, response in zip(commands, responses)]
+
+    def __result(self, command_string, response, preserve_encoding=False):
+        """
+        Removes the echoed command from the response
+        """
+        response = self.__decode(response)
         if not preserve_encoding:
-            response = self.__decode(self.__unquote(response))
+            response = self.__unquote(response)
         else:
             command_string_quoted = \
                 command_string[0:command_string.find(':')] + \
@@ -162,12 +180,48 @@ class Server(object):
         Get Players
         """
         self.players = []
-        player_count = self.get_player_count()
-        for i in range(player_count):
-            player = Player(server=self, index=i-1, update=update)
-            self.players.append(player)
+        if update:
+            # Everything we need comes back in a single query
+            for info in self.get_players_info():
+                player = Player(server=self, index=int(info["playerindex"]),
+                                info=info)
+                self.players.append(player)
+        else:
+            player_count = self.get_player_count()
+            for i in range(player_count):
+                player = Player(server=self, index=i-1, update=update)
+                self.players.append(player)
         return self.players
 
+    def get_players_info(self, start=0, count=100):
+        """
+        Get Players Info
+        Returns a list of dicts with the properties of each player (ref,
+        name, uuid, ip, model etc.) from a single "players" query
+        """
+        result = self.request("players %i %i" % (start, count), True)
+        return self.parse_items(result, "playerindex")
+
+    def parse_items(self, result, first_key):
+        """
+        Parse Items
+        Splits a quoted "key:value key:value ..." result into a list of
+        dicts. A new dict is started each time first_key is found. Anything
+        before the first first_key (e.g. count) is ignored.
+        """
+        quotedColon = self.__quote(':')
+        items = []
+        for token in result.split(" "):
+            if quotedColon not in token:
+                continue
+            key, value = token.split(quotedColon, 1)
+            key = self.__unquote(key)
+            if key == first_key:
+                items.append({})
+            if items:
+                items[-1][key] = self.__unquote(value)
+        return items
+
     def get_player(self, ref=None):
         """
         Get Player
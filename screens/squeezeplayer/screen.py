@@ -1,6 +1,7 @@
 import os
 import inspect
 import sys
+from functools import partial
 
 from kivy.clock import Clock
 from kivy.properties import (StringProperty,
@@ -15,19 +16,24 @@ from kivy.uix.button import Button
 from kivy.uix.image import AsyncImage
 from kivy.uix.label import Label
 from kivy.uix.progressbar import ProgressBar
-from kivy.uix.screenmanager import Screen
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.slider import Slider
 from kivy.uix.dropdown import DropDown
 
 from core.bgimage import BGImageButton
 from core.bglabel import BGLabelButton
+from core.fetch import fetch
+from core.lifecycle import LifecycleScreen
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from pylms.server import Server as LMSServer
 from pylms.player import Player as LMSPlayer
 from pylms.callback_server import CallbackServer as LMSCallbackServer
+from artworkcache import ArtworkImage, DOWNLOAD_SIZE
 from artworkresolver import ArtworkResolver
+from playlistmodel import PlaylistModel
 
 # TAGLIST - sets the relevant fields we need for our playlist queries:
 # a - artist	Artist name.
@@ -43,6 +49,21 @@ TAGLIST = ["a", "c", "d", "j", "K", "l", "x"]
 
 folder = os.path.dirname(os.path.abspath(__file__))
 
+
+def get_track_info(player, pos, track=None):
+    """Returns (track info, time elapsed) for the track at pos in the
+       player's playlist. track is the info from the playlist model, if it
+       has it; otherwise just that one track is fetched. Run in a worker
+       thread.
+    """
+    if track is None:
+        info = player.playlist_get_info(taglist=TAGLIST, start=pos, amount=1)
+        if info:
+            track = info[0]
+
+    return track, player.get_time_elapsed()
+
+
 class SqueezePlayerItem(ButtonBehavior, BoxLayout):
     """Class to represent a squeeze player instance on the network."""
     status = StringProperty("images/10x10_transparent.png")
@@ -69,47 +90,44 @@ class SqueezePlayerItem(ButtonBehavior, BoxLayout):
         self.basescreen.changePlayer(self.ref)
 
 
-class SqueezePlaylistItem(ButtonBehavior, BoxLayout):
-    """Class object for displaying playlist items."""
-    artwork = StringProperty("images/10x10_transparent.png")
-    artist = StringProperty("Loding playlist")
-    trackname = StringProperty("Loding playlist")
+class SqueezePlaylistItem(RecycleDataViewBehavior, ButtonBehavior, BoxLayout):
+    """Class object for displaying playlist items.
+
+       The items are reused by the PlaylistView as the playlist is scrolled
+       so all the information comes from the data for the row.
+    """
+    artkey = StringProperty("")
+    arturl = StringProperty("")
+    artist = StringProperty("Loading...")
+    trackname = StringProperty("Loading...")
     posnum = StringProperty("")
     current = BooleanProperty(False)
 
     def __init__(self, **kwargs):
         super(SqueezePlaylistItem, self).__init__(**kwargs)
-        # Create references to underlying objects
-        self.player = kwargs["player"]
-        self.np = kwargs["np"]
+        self.rv = None
+        self.index = 0
 
-        # Set the display properties
-        try:
-            self.artwork = kwargs["track"]["art"]
-            self.artist = kwargs["track"]["artist"]
-            self.trackname = kwargs["track"]["title"]
-            self.posnum = str(kwargs["track"]["pos"])
+    def refresh_view_attrs(self, rv, index, data):
+        """Called by the PlaylistView when the item is used for a row."""
+        self.rv = rv
+        self.index = index
 
-        # Sometimes the server hasn't loaded all the metadata yet
-        except KeyError:
+        # We need the track info now it's about to be seen
+        if not data.get("loaded") and rv.model is not None:
+            rv.model.request(index)
 
-            # Create a dummy entry in the playlist
-            self.artwork = "10x10_transparent.png"
-            self.artist = "Loading..."
-            self.trackname = "Loading..."
-            self.posnum = "0"
+        return super(SqueezePlaylistItem, self).refresh_view_attrs(rv, index,
+                                                                   data)
 
-            # but schedule a refresh of the playlist
-            Clock.schedule_once(self.np.refresh_playlist, 2)
-
-        # Check if we're the current track
-        self.updatePlaylistPosition(self.np.cur_track["pos"])
+    def on_press(self, *args):
+        if self.rv is not None and self.rv.model is not None:
+            self.rv.model.player.playlist_play_index(self.index)
 
-    def updatePlaylistPosition(self, playpos):
-        self.current = int(self.posnum) == playpos
 
-    def on_press(self, *args):
-        self.player.playlist_play_index((int(self.posnum) - 1))
+class PlaylistView(RecycleView):
+    """Shows the playlist. Only the visible rows have widgets."""
+    model = ObjectProperty(None, allownone=True)
 
 
 class SqueezeNowPlaying(Accordion):
@@ -160,13 +178,14 @@ class SqueezeNowPlaying(Accordion):
         self.pl_vol = -1
 
         # Draw the playlist
-        self.updatePlaylist(kwargs["playlist"])
+        self.setPlaylist(kwargs["playlist"])
 
         # Get the volume of current player
         self.vol = int(float(self.player.get_volume()))
 
         # Get the status of the player
         self.paused = None
+        self.status_job = None
         self.checkStatus()
         self.updatePlayTime(self.cur_track)
 
@@ -185,6 +204,9 @@ class SqueezeNowPlaying(Accordion):
         Clock.unschedule(self.check_timer)
         self.prog_timer = None
         self.check_timer = None
+        if self.status_job is not None:
+            self.status_job.cancel()
+            self.status_job = None
 
     def start(self):
         """Restart the schedules."""
@@ -208,39 +230,42 @@ class SqueezeNowPlaying(Accordion):
            can drift from the actual time. This function checks the time
            intermittently and updates accordingly.
         """
+        # Get the mode and elapsed time in a single query (in the
+        # background). Don't queue another if the last one hasn't finished.
+        if self.status_job is not None and self.status_job.active:
+            return
+
+        self.status_job = fetch(self.player.get_status,
+                                on_result=partial(self.statusChecked,
+                                                  bool(args)),
+                                on_error=self.statusFailed)
+
+    def statusChecked(self, timed, status):
+        """Shows the status fetched by checkStatus. timed is True if the check
+           was made by the Clock.
+        """
+        self.status_job = None
+
         # Sometimes some of the pause callbacks are missed. This is a safety
         # precaustion but should only run if the call back has been missed.
-        paused = self.player.get_mode() != "play"
+        paused = status.get("mode") != "play"
         if paused != self.paused:
             self.play_pause(paused)
 
         # This section only runs when the function has been called by the
         # Clock.
-        if args:
-            try:
-                self.elapsed = self.player.get_time_elapsed()
-            except ValueError:
-                self.elapsed = 0
-                self.paused = True
-
+        if timed:
+            self.elapsed = self.player.time
             self.updatePlayTime()
 
+    def statusFailed(self, error):
+        # We'll try again on the next check
+        self.status_job = None
+
     def update(self, cur_track):
         """Updates the player for the information of the currently playing
            track.
         """
-        # If it's a new track then we need to update the playlist to make
-        # sure the currently playing track is highlighted.
-        if cur_track["pos"] != self.cur_track["pos"]:
-            for c in self.sv_playlist.children:
-
-                # This will raise an error when it tries to update the
-                # "Refresh" button, so let's make sure we catch it.
-                try:
-                    c.updatePlaylistPosition(cur_track["pos"])
-                except AttributeError:
-                    pass
-
         # Set the local flag (so we can check it later)
         self.cur_track = cur_track
 
@@ -307,18 +332,6 @@ class SqueezeNowPlaying(Accordion):
         self.endtime = "{0:.0f}:{1:02.0f}".format(dm, ds)
         self.playprog.value = pr
 
-    def btn_refresh_playlist(self):
-        """Creates a Refresh button for the playlist screen and binds it
-           to the refresh_playlist method.
-        """
-        btn = BGLabelButton(text="Refresh Playlist",
-                            size=(780,30),
-                            size_hint=(None, None),
-                            bgcolour=[0, 0, 0, 0.5])
-        btn.bind(on_press=self.refresh_playlist)
-
-        return btn
-
     def refresh_playlist(self, *args):
         """Requests a refresh of the playlist."""
         # We need to fake an event for the current player.
@@ -327,32 +340,45 @@ class SqueezeNowPlaying(Accordion):
         self.sq_root.track_changed()
 
 
-    def updatePlaylist(self, pl):
-        """Method to display playlist for current player."""
-        # Get the playlist info
-        self.playlist = pl
-        pos = self.playlist["pos"]
-        plyl = self.playlist["playlist"]
+    def setPlaylist(self, model):
+        """Method to display the playlist model for the current player."""
+        self.playlist = model
+        model.on_reset = self.resetPlaylist
+        model.on_update = self.updatePlaylist
+        self.sv_playlist.model = model
+        self.resetPlaylist()
 
-        # Clear the playlist
-        self.sv_playlist.clear_widgets()
+    def playlistRow(self, index):
+        """Returns the data for a row of the playlist view."""
+        track = self.playlist.track(index)
+        row = {"posnum": str(index + 1),
+               "current": index == self.playlist.pos,
+               "loaded": track is not None}
 
-        self.sv_playlist.add_widget(self.btn_refresh_playlist())
+        # Sometimes the server hasn't loaded all the metadata yet
+        try:
+            row["arturl"] = self.awr.getURL(track, size=DOWNLOAD_SIZE)
+            row["artkey"] = self.awr.getKey(track) or ""
+            row["artist"] = track["artist"]
+            row["trackname"] = track["title"]
 
-        # Loop over the playlist
-        for i, tr in enumerate(plyl):
+        except (KeyError, TypeError):
+            row["arturl"] = ""
+            row["artkey"] = ""
+            row["artist"] = "Loading..."
+            row["trackname"] = "Loading..."
 
-            # Set the artwork and position values
-            tr["art"] = self.awr.getURL(tr)
-            tr["pos"] = i + 1
+        return row
 
-            # Create the playlist item object
-            item = SqueezePlaylistItem(track=tr,
-                                       player=self.player,
-                                       np=self)
+    def resetPlaylist(self):
+        """Redraws every row of the playlist."""
+        self.sv_playlist.data = [self.playlistRow(i)
+                                 for i in range(len(self.playlist))]
 
-            # add it to the screen
-            self.sv_playlist.add_widget(item)
+    def updatePlaylist(self, start, stop):
+        """Redraws the rows which have changed."""
+        self.sv_playlist.data[start:stop] = [self.playlistRow(i)
+                                             for i in range(start, stop)]
 
     def vol_change(self, value, update=True):
         """Method or handling volume changes."""
@@ -385,7 +411,7 @@ class SqueezeNowPlaying(Accordion):
         self.player.next()
 
 
-class SqueezePlayerScreen(Screen):
+class SqueezePlayerScreen(LifecycleScreen):
     """Main screen object for SqueezePlayer.
 
        This screen handles the main initial contact with the server and sets
@@ -393,6 +419,7 @@ class SqueezePlayerScreen(Screen):
     """
     cur_track = DictProperty({"name": "Loading..."})
     currentArt = StringProperty("images/10x10_transparent.png")
+    currentArtKey = StringProperty("")
 
     def __init__(self, **kwargs):
         super(SqueezePlayerScreen, self).__init__(**kwargs)
@@ -428,22 +455,46 @@ class SqueezePlayerScreen(Screen):
         self.timer = None
         self.cbs = None
         self.sync_groups = []
-        self.checker = None
+        self.playlistmodel = None
 
-    def on_enter(self):
+        # Requests to the server which are made in the background
+        self.logon_job = None
+        self.track_job = None
+
+        # We only talk to the server while the screen is being shown
+        self.add_service(self.connect, self.disconnect)
+
+    def connect(self):
         """Start the screen running."""
         self.timer = Clock.schedule_once(self.update, 0.1)
-        if self.now_playing:
-            self.now_playing.start()
 
-    def on_leave(self):
-        """Stop the screen."""
+    def disconnect(self):
+        """Stop the screen. We stop listening to the server (and close our
+           connections) as we won't hear about changes while we're hidden.
+           Everything is fetched again when the screen is next shown.
+        """
         Clock.unschedule(self.timer)
+        for job in (self.logon_job, self.track_job):
+            if job is not None:
+                job.cancel()
+        self.logon_job = None
+        self.track_job = None
         if self.now_playing:
             self.now_playing.quit()
+        if self.playlistmodel is not None:
+            self.playlistmodel.cancel()
+        if self.cbs:
+            self.cbs.stop()
+            self.cbs = None
+        if self.lms:
+            self.lms.disconnect()
+            self.lms = None
+        self.backendonline = False
 
     def lmsLogon(self, host, port):
-        """Log on to the Logitect Server and return a Server object."""
+        """Log on to the Logitect Server and return a Server object. Run in
+           a worker thread (see logon).
+        """
         try:
             sc = LMSServer(hostname=host, port=port)
             sc.connect()
@@ -451,13 +502,24 @@ class SqueezePlayerScreen(Screen):
             sc = None
         return sc
 
+    def logon(self, on_result):
+        """Logs on to the server in the background. on_result is passed the
+           Server object (or None if we couldn't log on).
+        """
+        if self.logon_job is not None:
+            self.logon_job.cancel()
+
+        self.logon_job = fetch(self.lmsLogon, self.host, self.telnetport,
+                               on_result=on_result,
+                               on_error=lambda error: on_result(None))
+
     def changePlayer(self, player):
         """Method to change the current player and update the screen."""
         if player != self.cur_player:
             self.cur_player = player
             self.squeezePlayer = self.getPlayer(self.cur_player)
             self.now_playing.player = self.squeezePlayer
-            self.playlist_changed()
+            self.playlistmodel.set_player(self.squeezePlayer)
             self.track_changed()
             self.now_playing.update_players(self.squeezeplayers)
 
@@ -480,22 +542,59 @@ class SqueezePlayerScreen(Screen):
         else:
             return self.squeezeplayers[0]
 
-    # Get current track information
-    def getCurrentTrackInfo(self, playlist, pos):
-        """Method to update the current playing track info with extra info."""
-        track = {}
+    def showCurrentTrack(self, pos):
+        """Fetches the info for the track at pos (in the background) and
+           shows it on the Now Playing screen.
+        """
+        if self.track_job is not None:
+            self.track_job.cancel()
+            self.track_job = None
 
         # Need to check if there's a playlist, if not this would cause a crash
-        if playlist:
-            track = playlist[pos]
+        if not len(self.playlistmodel):
+            self.trackFetched(pos, (None, 0))
+            return
+
+        # We may not have fetched that part of the playlist yet, in which
+        # case just the one track is fetched.
+        self.track_job = fetch(get_track_info, self.squeezePlayer, pos,
+                               self.playlistmodel.track(pos),
+                               on_result=partial(self.trackFetched, pos),
+                               on_error=self.trackFailed)
+
+    def trackFetched(self, pos, result):
+        self.track_job = None
+        track, elapsed = result
+
+        if track and self.playlistmodel.track(pos) is None:
+            self.playlistmodel.set_track(pos, track)
+
+        self.ct = self.getCurrentTrackInfo(pos, track, elapsed)
+        if self.now_playing:
+            self.now_playing.update(self.ct)
+
+    def trackFailed(self, error):
+        self.track_job = None
+
+    # Get current track information
+    def getCurrentTrackInfo(self, pos, track=None, elapsed=0):
+        """Method to update the current playing track info with extra info.
+           track is the track's info (None if the playlist is empty) and
+           elapsed the time it has been playing.
+        """
+        if track:
+            # Copy it so we don't change the model's track info
+            track = dict(track)
             track["pos"] = pos + 1
-            track["elapsed"] = self.squeezePlayer.get_time_elapsed()
+            track["elapsed"] = elapsed
 
             # Get the artwork - get large version if possible...
-            track["art"] = self.awr.getURL(track, size=(800, 800))
+            track["art"] = self.awr.getURL(track, size=DOWNLOAD_SIZE)
+            track["artkey"] = self.awr.getKey(track) or ""
 
             # ...as we'll use as background too
             self.currentArt = track["art"]
+            self.currentArtKey = track["artkey"]
 
         # No playlist so send some dummy info
         else:
@@ -505,14 +604,18 @@ class SqueezePlayerScreen(Screen):
                      "elapsed": 0,
                      "duration": 1,
                      "art": "10x10_transparent.png",
+                     "artkey": "",
                      "pos": 0}
 
         return track
 
     def getCallbackServer(self):
         """Method to create and set up a callback server."""
-        # Create the server
-        cbs = LMSCallbackServer(hostname=self.host, port=self.telnetport)
+        # Create the server. It reconnects by itself if the connection is
+        # lost and tells us when that happens.
+        cbs = LMSCallbackServer(hostname=self.host, port=self.telnetport,
+                                on_connect=self.server_connected,
+                                on_disconnect=self.server_disconnected)
 
         # Se up our callbacks
         cbs.add_callback(cbs.VOLUME_CHANGE, self.volume_change)
@@ -522,20 +625,41 @@ class SqueezePlayerScreen(Screen):
         cbs.add_callback(cbs.PLAYLIST_CHANGE_TRACK, self.track_changed)
         cbs.add_callback(cbs.SYNC, self.sync_event)
 
-        # Deamonise the object so it dies if the main program dies.
-        cbs.daemon = True
-
         return cbs
 
     def getCallbackPlayer(self, event):
         """Return the player reference from the callback event."""
         return self.cur_player if event is None else event.split(" ")[0]
 
-    def checkCallbackServer(self, *args):
-        """Checks if there's still a connection to the server and deletes
-           callback server instance if there isn't.
+    def server_connected(self):
+        """Callback for when the callback server (re)connects to LMS.
+
+           If we'd lost the server then we need to log on again and redraw
+           the screen.
+        """
+        if not self.backendonline:
+            self.logon(self.reconnected)
+
+    def reconnected(self, lms):
+        """Redraws the screen once we've logged on again after losing the
+           server.
         """
-        self.cbs.check_connection()
+        self.logon_job = None
+        if lms and self.cbs and not self.backendonline:
+            self.lms = lms
+            self.backendonline = True
+            self.checkForPlayers()
+
+    def server_disconnected(self):
+        """Callback for when the callback server loses its connection."""
+        self.backendonline = False
+
+        # Stop timers for now playing screen
+        if self.now_playing:
+            self.now_playing.quit()
+
+        self.drawNoServer()
+        self.inactive = True
 
     def cur_or_sync(self, ref):
         """Method to determine if the event player is our player or in a sync
@@ -634,14 +758,17 @@ class SqueezePlayerScreen(Screen):
         if (self.cur_or_sync(self.getCallbackPlayer(event)) and
                 self.now_playing):
 
-            # Update the screen
-            self.now_playing.updatePlaylist(self.getCurrentPlaylist())
+            # Update the playlist with the change
+            self.playlistmodel.apply(event)
 
             try:
                 ev = event.split()
                 if ev[2] == "clear":
                     # We know there are no tracks.
-                    self.ct = self.getCurrentTrackInfo({}, 0)
+                    if self.track_job is not None:
+                        self.track_job.cancel()
+                        self.track_job = None
+                    self.ct = self.getCurrentTrackInfo(0)
                     self.now_playing.update(self.ct)
 
             except (IndexError, AttributeError):
@@ -657,18 +784,24 @@ class SqueezePlayerScreen(Screen):
         if (self.cur_or_sync(self.getCallbackPlayer(event)) and
                 self.now_playing):
 
-            # Work out where we are in the playlist
-            pos = int(self.squeezePlayer.playlist_get_position())
-            self.playlistposition = pos
-            plyl = {"pos": self.playlistposition,
-                    "playlist": self.playlist}
+            # Work out where we are in the playlist (in the background)
+            if self.track_job is not None:
+                self.track_job.cancel()
 
-            # Get the info for the current track
-            self.ct = self.getCurrentTrackInfo(self.playlist,
-                                               self.playlistposition)
+            self.track_job = fetch(self.squeezePlayer.playlist_get_position,
+                                   on_result=self.positionChanged,
+                                   on_error=self.trackFailed)
 
-            # Update the screen
-            self.now_playing.update(self.ct)
+    def positionChanged(self, pos):
+        """Shows the current track once we know where we are in the
+           playlist.
+        """
+        self.track_job = None
+        self.playlistposition = int(pos)
+        self.playlistmodel.set_position(self.playlistposition)
+
+        # Get the info for the current track and update the screen
+        self.showCurrentTrack(self.playlistposition)
 
     def sync_event(self, event=None):
         """Method to handle sync callback.
@@ -676,16 +809,11 @@ class SqueezePlayerScreen(Screen):
            Expected event:
              [player_ref] sync
         """
-        self.now_playing.updatePlaylist(self.getCurrentPlaylist())
+        # The current track is shown again once the playlist has loaded
+        # (see playlist_loaded)
+        self.playlistmodel.reload()
         self.squeezeplayers = self.getSqueezePlayers(self.lms)
         self.sync_groups = self.lms.get_sync_groups()
-        pos = int(self.squeezePlayer.playlist_get_position())
-        self.playlistposition = pos
-        plyl = {"pos": self.playlistposition,
-                "playlist": self.playlist}
-        self.ct = self.getCurrentTrackInfo(self.playlist,
-                                           self.playlistposition)
-        self.now_playing.update(self.ct)
 
     def drawNoServer(self):
         """Method to tell the user that there's no server."""
@@ -733,21 +861,22 @@ class SqueezePlayerScreen(Screen):
             self.inactive = True
 
     def getCurrentPlaylist(self):
-        """Method to return the playlist for the current player."""
-        # Get the playlist and current position
-        self.playlist = self.squeezePlayer.playlist_get_info(taglist=TAGLIST)
-        try:
-            pos = int(self.squeezePlayer.playlist_get_position())
-        except ValueError:
-            pos = 0
-
-        self.playlistposition = pos
+        """Method to return the playlist model for the current player. Only
+           the length of the playlist is fetched here (in the background);
+           the tracks are fetched as they're needed.
+        """
+        self.playlistmodel = PlaylistModel(self.squeezePlayer, TAGLIST)
+        self.playlistmodel.on_load = self.playlist_loaded
+        self.playlistmodel.reload()
+        self.playlistposition = self.playlistmodel.pos
 
-        # Combine into a dict
-        plyl = {"pos": self.playlistposition,
-                "playlist": self.playlist}
+        return self.playlistmodel
 
-        return plyl
+    def playlist_loaded(self):
+        """Shows the current track once the playlist has been (re)loaded."""
+        if self.now_playing:
+            self.playlistposition = self.playlistmodel.pos
+            self.showCurrentTrack(self.playlistposition)
 
     def createPlayerScreen(self):
         """Method to create the Now Playing screen."""
@@ -757,9 +886,9 @@ class SqueezePlayerScreen(Screen):
         # Get the playlist
         plyl = self.getCurrentPlaylist()
 
-        # Get the current track info
-        self.ct = self.getCurrentTrackInfo(self.playlist,
-                                           self.playlistposition)
+        # The playlist is still loading so there's no track to show yet.
+        # It's shown once the playlist has loaded (see playlist_loaded).
+        self.ct = self.getCurrentTrackInfo(self.playlistposition)
 
         # Create the Now Playing object
         self.now_playing = SqueezeNowPlaying(cur_track=self.ct,
@@ -785,59 +914,45 @@ class SqueezePlayerScreen(Screen):
 
     def update(self, *args):
         """Method to be run on clock interval."""
-        # Set default update time
-        interval = 5
-
-        # Check if there is a CallbackServer instance.
+        # Check if there is a CallbackServer instance. Once there is, it
+        # looks after the connection itself so there's nothing to do here.
         if not self.cbs:
 
-            # No CallbackServer. Can we connect to LMS?
-            self.lms = self.lmsLogon(self.host, self.telnetport)
-
-            # If so then we can set up a few things
-            if self.lms:
+            # No CallbackServer. Can we connect to LMS? (see logged_on)
+            self.logon(self.logged_on)
 
-                # Create a CallbackServer instance...
-                self.cbs = self.getCallbackServer()
+    def logged_on(self, lms):
+        """Sets up the screen once we've (tried to) log on to the server."""
+        self.logon_job = None
 
-                # ...and start it running
-                self.cbs.start()
+        # Set default update time
+        interval = 5
 
-                # Set up a timer to check if the server is active
-                check = self.checkCallbackServer
-                self.checker = Clock.schedule_interval(check, 5)
+        self.lms = lms
 
-                # If we don't have a Now Playing screen initialised
-                if not self.now_playing:
+        # If we could then we can set up a few things
+        if self.lms:
+            self.backendonline = True
 
-                    # then we need to make one
-                    self.checkForPlayers()
+            # Create a CallbackServer instance...
+            self.cbs = self.getCallbackServer()
 
-                    # We've got a callback server running so we don't need
-                    # a regular interval now but we may want to test the
-                    # connection every 15 seconds or so
-                    interval = 15
+            # ...and start it running
+            self.cbs.start()
 
-            else:
-
-                # There's no active server found
-                self.drawNoServer()
-                self.inactive = True
+            # Draw the Now Playing screen (again if we've been hidden
+            # as it will be out of date)
+            self.checkForPlayers()
 
         else:
 
-            # If the callback server has died (e.g. no connection)...
-            if not self.cbs.isAlive():
-
-                # Stop checking for the connection
-                Clock.unschedule(self.checker)
-
-                # Stop timers for now playing screen
-                if self.now_playing:
-                    self.now_playing.quit()
+            # There's no active server found
+            self.drawNoServer()
+            self.inactive = True
 
-                # Remove the callback server
-                del self.cbs
-                self.cbs = None
+            # so try again later
+            self.timer = Clock.schedule_once(self.update, interval)
 
-        self.timer = Clock.schedule_once(self.update, interval)
+    def unload(self):
+        """Stop listening to the server when the screen is removed."""
+        self.disconnect()
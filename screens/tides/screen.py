@@ -1,12 +1,9 @@
 from kivy.uix.label import Label
 from kivy.properties import DictProperty, StringProperty
-from kivy.clock import Clock
-from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.logger import Logger
 
-import requests
 import time
 from datetime import datetime
 import dateutil.parser
@@ -16,14 +13,26 @@ import pytz
 import json
 import locale
 
+from core.cache import cached_fetch, refresh
+from core.httpclient import http_get
+from core.lifecycle import LifecycleScreen
+from core.ticker import SECOND
+
 class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
 
 MIN_TIDES = 7
 
+# How long before we check for new tide data (seconds). Cached data older
+# than TIDES_MAX_AGE won't be shown at all.
+TIDES_TTL = 6 * 60 * 60
+TIDES_MAX_AGE = 24 * 60 * 60
+
 TYPES_MAP = {"english": {"High": "HW", "Low": "LW"}, "french": { "High": "HM", "Low": "BM" }}
 
+TIDES_URL = "https://www.worldtides.info/api?extremes&lat={lat}&lon={lon}&length=172800&key={key}"
+
 class TideException(Exception):
     """
     Generic class for Tide exception
@@ -34,6 +43,29 @@ class TideException(Exception):
     def __str__(self):
         return str(self.value)
 
+def build_url(location, key):
+    lon = location['coords']['lon']
+    lat = location['coords']['lat']
+    return TIDES_URL.format(key=key, lon=lon, lat=lat)
+
+
+def get_tides(url):
+    """Retrieves the tide data. This is run in a worker thread so it mustn't
+       touch any widgets.
+    """
+    #with open('screens/tides/result.json') as data_file:
+    #    tides = json.load(data_file)
+    tides = http_get(url).json()
+    if tides == None or not 'status' in tides:
+        raise TideException("Unknown error")
+    if tides['status'] != 200:
+        if 'error' in tides:
+            raise TideException(tides['error'])
+        else:
+            raise TideException("Unknown error")
+    return tides
+
+
 class Tide(BoxLayout):
     desc = StringProperty("")
 
@@ -47,46 +79,43 @@ class Tide(BoxLayout):
         summary["type_i18n"] = TYPES_MAP[self.language][summary["type"]]
         self.desc = ("{type_i18n:s}\n{ldate:s}").format(**summary)
 
-class TidesSummary(Screen, BlackHole):
-    tidesurl = "https://www.worldtides.info/api?extremes&lat={lat}&lon={lon}&length=172800&key={key}"
+class TidesSummary(LifecycleScreen, BlackHole):
     timedata = DictProperty(None)
     next_t = DictProperty(None)
     prev_t = DictProperty(None)
     location = DictProperty(None)
 
     def __init__(self, **kwargs):
-        # Init data by checking cache then calling API
+        # The initial data is fetched by TidesScreen
         self.location = kwargs["location"]
         self.key = kwargs["key"]
         self.language = kwargs["language"]
+        self.tides = kwargs["tides"]
+        self.url_tides = build_url(self.location, self.key)
+        self.job = None
         if self.language == "french":
             locale.setlocale(locale.LC_ALL, 'fr_FR.UTF-8')
-        self.get_data()
         self.get_time()
         self.get_next()
         super(TidesSummary, self).__init__(**kwargs)
-        self.timer = None
+
+        # We only need to update the clock every second (and only while
+        # it's being shown).
+        self.timer = self.add_tick(self.update, SECOND)
         self.tides_list = self.ids.tides_list
         self.build_tides_list()
 
-    def buildURL(self, location):
-        lon = location['coords']['lon']
-        lat = location['coords']['lat']
-        return self.tidesurl.format(key=self.key, lon=lon, lat=lat)
-
     def get_data(self):
-        self.url_tides = self.buildURL(self.location)
-        #with open('screens/tides/result.json') as data_file:    
-        #    self.tides = json.load(data_file)
-        self.tides = requests.get(self.url_tides).json()
-        if self.tides == None or not 'status' in self.tides:
-            raise TideException("Unknown error")
-        if self.tides['status'] != 200:
-            if 'error' in self.tides:
-                raise TideException(self.tides['error'])
-            else:
-                raise TideException("Unknown error")
-        return True
+        """Refreshes the tide data in the background."""
+        if self.job and self.job.active:
+            return
+
+        self.job = refresh(self.url_tides, get_tides, self.url_tides,
+                           on_result=self.set_data)
+
+    def set_data(self, tides):
+        self.tides = tides
+        self.build_tides_list()
 
     def get_time(self):
         """Sets self.timedata to current time."""
@@ -133,10 +162,7 @@ class TidesSummary(Screen, BlackHole):
         self.tides['extremes'] = [x for x in self.tides['extremes'] if x not in oldentries]
         # fetch new one if our set is small
         if len(self.tides['extremes']) <= MIN_TIDES:
-            try:
-                self.get_data()
-            except:
-                pass
+            self.get_data()
         if hasattr(self, "tides_list"):
             self.build_tides_list()
         return True
@@ -160,23 +186,15 @@ class TidesSummary(Screen, BlackHole):
     def update(self, dt):
         self.get_time()
 
-    def on_enter(self):
-        # We only need to update the clock every second.
-        self.timer = Clock.schedule_interval(self.update, 1)
-
-    def on_pre_enter(self):
+    def on_activate(self):
         self.get_time()
 
-    def on_pre_leave(self):
-        # Save resource by unscheduling the updates.
-        Clock.unschedule(self.timer)
-
     def is_setup(self):
         if self.tides:
             return True
         return False
 
-class TidesScreen(Screen, BlackHole):
+class TidesScreen(LifecycleScreen, BlackHole):
     def __init__(self, **kwargs):
         super(TidesScreen, self).__init__(**kwargs)
         self.running = False
@@ -185,31 +203,54 @@ class TidesScreen(Screen, BlackHole):
         self.key = kwargs["params"]["key"]
         self.language = kwargs["params"]["language"]
         self.scrmgr = self.ids.tides_scrmgr
+        self.summary = None
+        self.job = None
 
-    def on_enter(self):
+    def on_activate(self):
+        # The summary is activated (and deactivated) along with this screen
         if not self.running:
-            try:
-                self.ids.tides_lbl_load.text = "Loading tides"
-                ts = TidesSummary(location = self.location,
-                        key = self.key,
-                        language = self.language
-                )
-                if ts == None or not ts.is_setup():
-                    self.ids.tides_lbl_load.text = "Unable to load tides"
-                    return
-                # and add to our screen manager.
-                self.scrmgr.add_widget(ts)
-                self.running = True
-                self.flt.remove_widget(self.ids.tides_base_box)
-            except IOError as err:
-                self.ids.tides_lbl_load.text = "Error: " + str(err)
-                pass
-            except TideException as err:
-                self.ids.tides_lbl_load.text = "Error: " + str(err)
-                pass
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.scrmgr.children:
-                if c.name == self.scrmgr.current:
-                    c.on_enter()
+            # Don't start another request if we're still waiting for one
+            if self.job and self.job.active:
+                return
+
+            # Show the last tides we got straight away (if they're still
+            # useful) while we check for new ones.
+            self.ids.tides_lbl_load.text = "Loading tides"
+            url = build_url(self.location, self.key)
+            self.job = cached_fetch(url, get_tides, url,
+                                    ttl=TIDES_TTL,
+                                    max_age=TIDES_MAX_AGE,
+                                    on_result=self.show_tides,
+                                    on_error=self.show_error)
+
+    def on_deactivate(self):
+        if self.job:
+            self.job.cancel()
+
+    def show_tides(self, tides):
+        # We've already got a summary (e.g. from the cache) so just give it
+        # the new data.
+        if self.summary is not None:
+            self.summary.set_data(tides)
+            return
+
+        ts = TidesSummary(location = self.location,
+                key = self.key,
+                language = self.language,
+                tides = tides
+        )
+        if ts == None or not ts.is_setup():
+            self.ids.tides_lbl_load.text = "Unable to load tides"
+            return
+        # and add to our screen manager.
+        self.scrmgr.add_widget(ts)
+        self.summary = ts
+        self.running = True
+        self.flt.remove_widget(self.ids.tides_base_box)
+
+    def show_error(self, err):
+        # Keep showing the cached tides if we've got them
+        if self.running:
+            return
+
+        self.ids.tides_lbl_load.text = "Error: " + str(err)
@@ -11,8 +11,8 @@ projects.
 # We can therefore insert the current time to get details on the next trains
 from datetime import datetime
 
-# Simple way of submitting web requests (easier to use than urllib2)
-import requests
+# Shared web client (keeps connections open between requests)
+from core.httpclient import http_get
 
 # BeautifulSoup is the tool we'll use for scraping the pages
 from bs4 import BeautifulSoup
@@ -38,7 +38,7 @@ SUFFIX = "{start}/{dest}/{dep_day}/{dep_time}/{direction}"
 
 # Simple method to submit web request
 def __getPage(url):
-    r = requests.get(url)
+    r = http_get(url)
     if r.status_code == 200:
         return r.text
     else:
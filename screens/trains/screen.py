@@ -4,11 +4,13 @@ import time
 
 from kivy.clock import Clock
 from kivy.uix.label import Label
-from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.stacklayout import StackLayout
 from kivy.properties import StringProperty, ListProperty
 
+from core.fetch import fetch
+from core.lifecycle import LifecycleScreen
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import nationalrail as NR
@@ -17,7 +19,7 @@ class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
 
-class TrainJourney(Screen):
+class TrainJourney(LifecycleScreen):
     desc = StringProperty("")
     headers = {"departing": "Dep.",
                "arriving": "Arr.",
@@ -36,8 +38,12 @@ class TrainJourney(Screen):
         self.running = False
         self.nextupdate = 0
         self.timer = None
+        self.job = None
+
+        # We only look up the trains while the journey is being shown
+        self.add_service(self.start_updates, self.stop_updates)
 
-    def on_enter(self):
+    def start_updates(self):
         # Calculate when the next update is due.
         if (time.time() > self.nextupdate):
             dt = 0.5
@@ -46,16 +52,25 @@ class TrainJourney(Screen):
 
         self.timer = Clock.schedule_once(self.getTrains, dt)
 
-    def on_leave(self):
+    def stop_updates(self):
         Clock.unschedule(self.timer)
+        if self.job:
+            self.job.cancel()
 
     def getTrains(self, *args):
+        # Look up the trains in the background so we don't block the UI.
+        self.job = fetch(self.fetchTrains, on_result=self.drawTrains)
+
+    def fetchTrains(self):
+        """Retrieves the train data. Runs in a worker thread."""
         # Try loading the train data but handle any failure gracefully.
         try:
-            trains = NR.lookup(self.frm, self.to)
+            return NR.lookup(self.frm, self.to)
         except:
-            trains = None
+            return None
 
+    def drawTrains(self, trains):
+        """Updates the screen with the train data."""
         # If we've got trains then we need to set up the screen
         if trains:
             # Get rid of the previous widgets.
@@ -126,7 +141,7 @@ class TrainDetail(BoxLayout):
         self.platform = t.get("from_platform", "")
 
 
-class TrainScreen(Screen, BlackHole):
+class TrainScreen(LifecycleScreen, BlackHole):
     def __init__(self, params, **kwargs):
         self.params = params
         super(TrainScreen, self).__init__(**kwargs)
@@ -138,29 +153,16 @@ class TrainScreen(Screen, BlackHole):
         self.scrid = 0
         self.myscreens = ["{to}{from}".format(**x) for x in self.journeys]
 
-    def on_enter(self):
+    def on_activate(self):
         # If the screen hasn't been run before then we need to set up the
-        # screens for the necessary train journeys.
+        # screens for the necessary train journeys. The journey that's shown
+        # is activated (and deactivated) along with this screen.
         if not self.running:
             for journey in self.journeys:
                 nm = "{to}{from}".format(**journey)
                 self.scrmgr.add_widget(TrainJourney(journey=journey, name=nm))
             self.running = True
 
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.scrmgr.children:
-                if c.name == self.scrmgr.current:
-                    c.on_enter()
-
-    def on_leave(self):
-        # Fixes bug where nested screens don't have "on_enter" or
-        # "on_leave" methods called.
-        for c in self.scrmgr.children:
-            if c.name == self.scrmgr.current:
-                c.on_leave()
-
     def next_screen(self, rev=True):
         a = self.myscreens
         n = -1 if rev else 1
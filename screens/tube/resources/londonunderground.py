@@ -6,8 +6,8 @@ Please note, if you use TfL data in your application you should
 acknowledge the source of your data as appropriate.
 """
 
-# Simple way of submitting web requests (easier to use than urllib2)
-import requests
+# Shared web client (keeps connections open between requests)
+from core.httpclient import http_get
 
 # we'll use the basic eTree parser to parse the XML file
 from lxml import etree
@@ -23,7 +23,7 @@ BASE_URL = "http://cloud.tfl.gov.uk/TrackerNet/LineStatus"
 
 
 def __getTubeData():
-    r = requests.get(BASE_URL)
+    r = http_get(BASE_URL)
     if r.status_code == 200:
         return r.content
     else:
@@ -12,6 +12,8 @@ from kivy.properties import (ObjectProperty,
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 
+from core.fetch import fetch
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from resources.londonunderground import TubeStatus
@@ -46,6 +48,7 @@ class TubeScreen(Screen, BlackHole):
         self.build_dict()
         super(TubeScreen, self).__init__(**kwargs)
         self.timer = None
+        self.job = None
 
     def hex_to_kcol(self, hexcol):
         """Method to turn hex colour code to Kivy compatible list."""
@@ -77,12 +80,22 @@ class TubeScreen(Screen, BlackHole):
         self.tube["update"] = "Waiting for data..."
 
     def update(self, dt):
+        # Get the tube data in the background so we don't block the UI.
+        if self.job and self.job.active:
+            return
+
+        self.job = fetch(self.fetch_status, on_result=self.show_status)
+
+    def fetch_status(self):
+        """Retrieves the line status. Runs in a worker thread."""
         # Get the tube data or handle failure to retrieve data.
         try:
-            raw = TubeStatus()
+            return TubeStatus()
         except:
-            raw = None
+            return None
 
+    def show_status(self, raw):
+        """Updates the screen with the line status."""
         # If we've got data, let's show the status
         if raw:
             temp = {x["name"][:3].upper(): x["status"] for x in raw}
@@ -117,6 +130,8 @@ class TubeScreen(Screen, BlackHole):
 
     def on_leave(self):
         Clock.unschedule(self.timer)
+        if self.job:
+            self.job.cancel()
 
     def show_info(self, line):
         """If user clicks on tube line we need to show extra data.
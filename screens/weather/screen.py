@@ -1,17 +1,24 @@
 import os
 import sys
-import requests
 import time
 
 from kivy.uix.label import Label
-from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.properties import StringProperty
 from kivy.clock import Clock
 from kivy.uix.scrollview import ScrollView
 
+from core.cache import cached_fetch
+from core.httpclient import http_get
+from core.lifecycle import LifecycleScreen
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# How long a forecast is good for (seconds). We'll still show a cached
+# forecast up to WEATHER_MAX_AGE old while we get a new one.
+WEATHER_TTL = 60 * 60
+WEATHER_MAX_AGE = 12 * 60 * 60
+
 class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
@@ -59,7 +66,7 @@ class WeatherForecastDay(BoxLayout):
                         "Low: {lw}\nRain: {po}%").format(dg="C", **fc)
 
 
-class WeatherSummary(Screen):
+class WeatherSummary(LifecycleScreen):
     """Screen to show weather summary for a selected location."""
     location = StringProperty("")
 
@@ -72,8 +79,13 @@ class WeatherSummary(Screen):
         self.bx_hourly = self.ids.bx_hourly
         self.nextupdate = 0
         self.timer = None
+        self.job = None
+        self.hasdata = False
 
-    def on_enter(self):
+        # We only update the forecast while it's being shown
+        self.add_service(self.start, self.stop)
+
+    def start(self):
         # Check if the next update is due
         if (time.time() > self.nextupdate):
             dt = 0.5
@@ -82,24 +94,65 @@ class WeatherSummary(Screen):
 
         self.timer = Clock.schedule_once(self.getData, dt)
 
-    def on_leave(self):
+    def stop(self):
         Clock.unschedule(self.timer)
+        if self.job:
+            self.job.cancel()
 
     def getData(self, *args):
+        # Show the last forecast we had (if any) and fetch a new one in the
+        # background so we don't block the UI.
+        self.job = cached_fetch(self.url_forecast, self.fetchData,
+                                ttl=WEATHER_TTL,
+                                max_age=WEATHER_MAX_AGE,
+                                on_result=self.drawData)
+
+    def fetchData(self):
+        """Retrieves the forecast data. Runs in a worker thread.
+
+           Returns None unless we got both the daily and hourly data (so that
+           we don't cache an incomplete forecast).
+        """
         # Try to get the daily data but handle any failure to do so.
         try:
-            self.forecast = requests.get(self.url_forecast).json()
-            days = self.forecast["forecast"]["simpleforecast"]["forecastday"]
+            forecast = http_get(self.url_forecast).json()
+            days = forecast["forecast"]["simpleforecast"]["forecastday"]
         except:
             days = None
 
         # Try to get the hourly data but handle any failure to do so.
         try:
-            self.hourly = requests.get(self.url_hourly).json()
-            hours = self.hourly["hourly_forecast"]
+            hourly = http_get(self.url_hourly).json()
+            hours = hourly["hourly_forecast"]
         except:
             hours = None
 
+        if days and hours:
+            return days, hours
+        else:
+            return None
+
+    def drawData(self, data):
+        """Updates the screen with the forecast data."""
+        # This may be called more than once (cached data and then new data)
+        # so make sure we don't end up with two timers.
+        Clock.unschedule(self.timer)
+
+        if data:
+            days, hours = data
+            self.hasdata = True
+
+        # We couldn't get an update but we're already showing a forecast so
+        # leave it there and try again later.
+        elif self.hasdata:
+            dt = 5 * 60
+            self.nextupdate = time.time() + dt
+            self.timer = Clock.schedule_once(self.getData, dt)
+            return
+
+        else:
+            days = hours = None
+
         # Clear the screen of existing widgets
         self.bx_forecast.clear_widgets()
         self.bx_hourly.clear_widgets()
@@ -145,7 +198,7 @@ class WeatherSummary(Screen):
         self.timer = Clock.schedule_once(self.getData, dt)
 
 
-class WeatherScreen(Screen, BlackHole):
+class WeatherScreen(LifecycleScreen, BlackHole):
     forecast = "http://api.wunderground.com/api/{key}/forecast/q/{location}"
     hourly = "http://api.wunderground.com/api/{key}/hourly/q/{location}"
 
@@ -160,9 +213,10 @@ class WeatherScreen(Screen, BlackHole):
         self.scrid = 0
         self.myscreens = [x["address"] for x in self.locations]
 
-    def on_enter(self):
+    def on_activate(self):
         # If the screen hasn't been displayed before then let's load up
-        # the locations
+        # the locations. The summary that's shown is activated (and
+        # deactivated) along with this screen.
         if not self.running:
             for location in self.locations:
 
@@ -181,20 +235,6 @@ class WeatherScreen(Screen, BlackHole):
             # set the flag so we don't do this again.
             self.running = True
 
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.scrmgr.children:
-                if c.name == self.scrmgr.current:
-                    c.on_enter()
-
-    def on_leave(self):
-        # Fixes bug where nested screens don't have "on_enter" or
-        # "on_leave" methods called.
-        for c in self.scrmgr.children:
-            if c.name == self.scrmgr.current:
-                c.on_leave()
-
     def buildURLs(self, location):
         return (self.forecast.format(key=self.key, location=location),
                 self.hourly.format(key=self.key, location=location))
@@ -14,6 +14,9 @@ from kivy.uix.scrollview import ScrollView
 from darksky.api import DarkSky, DarkSkyAsync
 from darksky.types import languages, units, weather
 
+from core.fetch import fetch
+from core.lifecycle import LifecycleScreen
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
@@ -82,7 +85,7 @@ class WeatherForecastDay(BoxLayout):
         self.weather = "{su}".format(dg="°F", **fc)
 
 
-class WeatherSummary(Screen):
+class WeatherSummary(LifecycleScreen):
     """Screen to show weather summary for a selected location."""
     location_label = StringProperty("")
 
@@ -98,8 +101,12 @@ class WeatherSummary(Screen):
         self.bx_hourly = self.ids.bx_hourly
         self.nextupdate = 0
         self.timer = None
+        self.job = None
+
+        # We only update the forecast while it's being shown
+        self.add_service(self.start, self.stop)
 
-    def on_enter(self):
+    def start(self):
         # Check if the next update is due
         if (time.time() > self.nextupdate):
             dt = 0.5
@@ -108,12 +115,20 @@ class WeatherSummary(Screen):
 
         self.timer = Clock.schedule_once(self.getData, dt)
 
-    def on_leave(self):
+    def stop(self):
         Clock.unschedule(self.timer)
+        if self.job:
+            self.job.cancel()
 
     def getData(self, *args):
-        # Get the forecast
-        self._forecast = self._darksky.get_forecast(
+        # Fetch the data in the background so we don't block the UI.
+        self.job = fetch(self.fetchData,
+                         on_result=self.drawData,
+                         on_error=self.fetchFailed)
+
+    def fetchData(self):
+        """Retrieves the forecast. Runs in a worker thread."""
+        return self._darksky.get_forecast(
             float(self._location[0]), float(self._location[1]),
             extend=False,  # default `False`
             lang=languages.ENGLISH,  # default `ENGLISH`
@@ -122,6 +137,23 @@ class WeatherSummary(Screen):
             # timezone='UTC'  # default None - will be set by DarkSky API automatically
         )
 
+    def fetchFailed(self, error):
+        """Tells the user we couldn't get the forecast and tries again
+           later.
+        """
+        self.bx_forecast.clear_widgets()
+        self.bx_hourly.clear_widgets()
+        error_label = Label(text="Error getting weather data.")
+        self.bx_forecast.add_widget(error_label)
+
+        dt = 5 * 60
+        self.nextupdate = time.time() + dt
+        self.timer = Clock.schedule_once(self.getData, dt)
+
+    def drawData(self, forecast):
+        """Updates the screen with the forecast."""
+        self._forecast = forecast
+
         # Clear the screen of existing overlays
         self.bx_forecast.clear_widgets()
         self.bx_hourly.clear_widgets()
@@ -167,7 +199,7 @@ class WeatherSummary(Screen):
         self.timer = Clock.schedule_once(self.getData, dt)
 
 
-class DarkSkyWeatherScreen(Screen, BlackHole):
+class DarkSkyWeatherScreen(LifecycleScreen, BlackHole):
     forecast = "http://api.wunderground.com/api/{key}/forecast/q/{location}"
     hourly = "http://api.wunderground.com/api/{key}/hourly/q/{location}"
 
@@ -185,9 +217,10 @@ class DarkSkyWeatherScreen(Screen, BlackHole):
 
         self.default_api_key_text = "<api-key-goes-here>"
 
-    def on_enter(self):
+    def on_activate(self):
         # If the screen hasn't been displayed before then let's load up
-        # the locations
+        # the locations. The summary that's shown is activated (and
+        # deactivated) along with this screen.
         if not self.running:
             if self._key == "<api-key-goes-here>":
                 es = WeatherError(label_text="DarkSky Weather: Please Update API Key")
@@ -204,22 +237,8 @@ class DarkSkyWeatherScreen(Screen, BlackHole):
                     # and add to our screen manager.
                     self.screen_manager.add_widget(ws)
 
-                # set the flag so we don't do this again.
-                self.running = True
-
-        else:
-            # Fixes bug where nested screens don't have "on_enter" or
-            # "on_leave" methods called.
-            for c in self.screen_manager.children:
-                if c.name == self.screen_manager.current:
-                    c.on_enter()
-
-    def on_leave(self):
-        # Fixes bug where nested screens don't have "on_enter" or
-        # "on_leave" methods called.
-        for c in self.screen_manager.children:
-            if c.name == self.screen_manager.current:
-                c.on_leave()
+            # set the flag so we don't do this again.
+            self.running = True
 
     def next_screen(self, rev=True):
         a = self.my_screens
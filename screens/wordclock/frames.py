@@ -0,0 +1,76 @@
+"""Frame table for the word clock.
+
+   The clock only changes every five minutes so there are just 288 different
+   things it can show in a day. Rather than working out which letters should
+   be lit every time the screen updates, we work out all 288 "frames" when
+   the layout is loaded.
+
+   Each frame is stored as a bitset (an int where bit n is set if letter n
+   is lit). We also keep the XOR of each frame with the one before it, which
+   tells us exactly which letters need to change when the time moves on.
+
+   This module mustn't import Kivy.
+"""
+
+# Number of five minute states in a day
+STATES = 24 * 12
+
+
+def state_index(hour, minute):
+    """Returns the number of the five minute state for the time."""
+    return hour * 12 + minute // 5
+
+
+def time_keys(config, hour, minute):
+    """Returns the MAP keys (hour, minute, am/pm) for the time (24 hour
+       clock). The minute is rounded down to the last five minutes.
+    """
+    minute -= minute % 5
+    ampm = "am" if hour < 12 else "pm"
+
+    # Is our language one where we need to increment the hour after 30 mins
+    # e.g. 9:40 is "Twenty to ten"
+    if config.HOUR_INCREMENT and (minute > config.HOUR_INCREMENT_TIME):
+        hour += 1
+
+    # Change to 12 hour clock
+    hour %= 12
+    if hour == 0:
+        hour = 12
+
+    return "h{:02d}".format(hour), "m{:02d}".format(minute), ampm
+
+
+def frame_bits(config, hour, minute):
+    """Returns the bitset of the letters which are lit at the time."""
+    d = config.MAP
+    h, m, ampm = time_keys(config, hour, minute)
+
+    frame = 0
+    for x in d.get("all", []) + d[h] + d[m] + d.get(ampm, []):
+        frame |= 1 << x
+
+    return frame
+
+
+def build_frames(config):
+    """Returns a tuple of (frames, deltas) for the layout.
+
+       frames[n] is the bitset for state n and deltas[n] is the bitset of
+       letters which change between state n - 1 and state n (state 0 follows
+       the last state of the day).
+    """
+    frames = [frame_bits(config, n // 12, (n % 12) * 5) for n in range(STATES)]
+    deltas = [frames[n] ^ frames[n - 1] for n in range(STATES)]
+
+    return frames, deltas
+
+
+def bits(value):
+    """Generator of the numbers of the set bits in value."""
+    n = 0
+    while value:
+        if value & 1:
+            yield n
+        value >>= 1
+        n += 1
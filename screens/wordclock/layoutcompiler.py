@@ -0,0 +1,224 @@
+"""Layout compiler for the word clock.
+
+   Mistakes in a layout's MAP (e.g. a letter index past the end of the
+   LAYOUT or a missing "m35" key) used to show up only at run time, as a
+   letter that silently failed to light or a crash at a particular time of
+   day. The compiler checks a layout before it's used and turns it into the
+   frame table used by the screen (see frames.py).
+
+   The frame table is saved in a small binary file, along with a hash of the
+   layout file, so the layout only needs to be compiled again when it
+   changes.
+
+   All the bundled layouts can be checked (through every five minute slot of
+   the day) by running this file:
+
+       python layoutcompiler.py [layout.py ...]
+
+   This module mustn't import Kivy.
+"""
+import hashlib
+import importlib.util
+import os
+import struct
+import sys
+
+from frames import STATES, build_frames, frame_bits
+
+# Variables which every layout must have
+REQUIRED = ("LAYOUT", "MAP", "COLS", "SIZE", "FONTSIZE", "HOUR_INCREMENT")
+
+# Keys which must be in every MAP...
+HOUR_KEYS = ["h{:02d}".format(h) for h in range(1, 13)]
+MINUTE_KEYS = ["m{:02d}".format(m) for m in range(0, 60, 5)]
+
+# ...and the ones which may be
+OPTIONAL_KEYS = ["all", "am", "pm"]
+
+# Header of the frame table file: magic, layout hash and bytes per frame
+MAGIC = b"WCF1"
+HEADER = struct.Struct("<4s20sH")
+
+LAYOUTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+
+
+class LayoutError(ValueError):
+    """The layout isn't valid. The message lists the problems."""
+    def __init__(self, errors):
+        self.errors = errors
+        super(LayoutError, self).__init__("; ".join(errors))
+
+
+def validate(config):
+    """Returns a list of the problems with the layout (empty if it's
+       valid).
+    """
+    errors = []
+
+    missing = [name for name in REQUIRED if not hasattr(config, name)]
+    if missing:
+        return ["missing {}".format(", ".join(missing))]
+
+    size = len(config.LAYOUT)
+
+    if not isinstance(config.COLS, int) or config.COLS < 1:
+        errors.append("COLS must be a positive number")
+    elif size % config.COLS:
+        errors.append("LAYOUT has {} letters which isn't a multiple of COLS "
+                      "({})".format(size, config.COLS))
+
+    if config.HOUR_INCREMENT:
+        limit = getattr(config, "HOUR_INCREMENT_TIME", None)
+        if not isinstance(limit, int) or not 0 <= limit < 60:
+            errors.append("HOUR_INCREMENT_TIME must be a number of minutes "
+                          "(0-59) when HOUR_INCREMENT is set")
+
+    keys = set(config.MAP)
+    for key in HOUR_KEYS + MINUTE_KEYS:
+        if key not in keys:
+            errors.append("MAP has no \"{}\"".format(key))
+
+    unknown = keys - set(HOUR_KEYS + MINUTE_KEYS + OPTIONAL_KEYS + ["h00"])
+    for key in sorted(unknown):
+        errors.append("MAP has unknown key \"{}\"".format(key))
+
+    for key in sorted(keys):
+        for x in config.MAP[key]:
+            if not isinstance(x, int) or not 0 <= x < size:
+                errors.append("MAP[\"{}\"] has {!r} which isn't a letter "
+                              "(0-{})".format(key, x, size - 1))
+
+    if errors:
+        return errors
+
+    # Finally check that every time of day lights something
+    for state in range(STATES):
+        hour, minute = state // 12, (state % 12) * 5
+        try:
+            if not frame_bits(config, hour, minute):
+                errors.append("nothing is lit at {:02d}:{:02d}"
+                              "".format(hour, minute))
+        except KeyError as e:
+            errors.append("no {} for {:02d}:{:02d}".format(e, hour, minute))
+
+    return errors
+
+
+def compile_layout(config):
+    """Returns (frames, deltas) for the layout. Raises LayoutError if the
+       layout isn't valid.
+    """
+    errors = validate(config)
+    if errors:
+        raise LayoutError(errors)
+
+    return build_frames(config)
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def save_frames(path, digest, frames, size):
+    """Saves the frame table. size is the number of letters."""
+    nbytes = (size + 7) // 8
+    data = [HEADER.pack(MAGIC, digest, nbytes)]
+    data += [frame.to_bytes(nbytes, "little") for frame in frames]
+
+    # Write to a temporary file first so we never load a partial table
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(b"".join(data))
+    os.replace(tmp, path)
+
+
+def load_frames(path, digest):
+    """Returns the saved frame table or None if there isn't one for this
+       version of the layout.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except (IOError, OSError):
+        return None
+
+    try:
+        magic, saved, nbytes = HEADER.unpack_from(data)
+    except struct.error:
+        return None
+
+    if (magic != MAGIC or saved != digest or
+            len(data) != HEADER.size + nbytes * STATES):
+        return None
+
+    start = HEADER.size
+    return [int.from_bytes(data[start + n * nbytes:start + (n + 1) * nbytes],
+                           "little") for n in range(STATES)]
+
+
+def load_layout_frames(config, source, folder):
+    """Returns (frames, deltas) for the layout loaded from the file source,
+       using the table saved in folder if it's up to date. Raises
+       LayoutError if the layout has to be compiled and isn't valid.
+    """
+    digest = file_hash(source)
+    name = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(folder, "{}.frames".format(name))
+
+    frames = load_frames(path, digest)
+    if frames is not None:
+        deltas = [frames[n] ^ frames[n - 1] for n in range(STATES)]
+        return frames, deltas
+
+    frames, deltas = compile_layout(config)
+
+    # Not being able to save the table isn't a problem
+    try:
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        save_frames(path, digest, frames, len(config.LAYOUT))
+    except (IOError, OSError):
+        pass
+
+    return frames, deltas
+
+
+def import_layout(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location("layouts." + name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main(paths):
+    """Checks the layouts (or all the bundled ones). Returns the number of
+       layouts with problems.
+    """
+    if not paths:
+        paths = sorted(os.path.join(LAYOUTS, name)
+                       for name in os.listdir(LAYOUTS)
+                       if name.endswith(".py") and name != "__init__.py")
+
+    failed = 0
+    for path in paths:
+        name = os.path.basename(path)
+        try:
+            errors = validate(import_layout(path))
+        except Exception as e:
+            errors = ["can't be loaded: {!r}".format(e)]
+
+        if errors:
+            failed += 1
+            print("{}: FAILED".format(name))
+            for error in errors:
+                print("    {}".format(error))
+        else:
+            print("{}: OK".format(name))
+
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main(sys.argv[1:]) else 0)
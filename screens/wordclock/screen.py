@@ -1,18 +1,21 @@
-import imp
 import os
 import sys
 from datetime import datetime as DT
 
 from kivy.animation import Animation
-from kivy.clock import Clock
+from kivy.logger import Logger
 from kivy.properties import BooleanProperty, StringProperty, ListProperty
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.screenmanager import Screen
 
+from core.registry import load_module
+from core.ticker import subscribe, FIVE_MINUTES
 
-def round_down(num, divisor):
-    return num - (num % divisor)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from frames import STATES, bits, state_index
+from layoutcompiler import LayoutError, load_layout_frames
 
 
 class WordClockLetter(Label):
@@ -58,11 +61,16 @@ class WordClockScreen(Screen, BlackHole):
         super(WordClockScreen, self).__init__(**kwargs)
         self.running = False
         self.timer = None
-        self.oldtime = None
+
+        # Current state (five minute slot of the day) and bitset of the
+        # letters which are lit
+        self.state = None
+        self.frame = 0
 
         # Set up some variables to help load the chosen layout.
         self.basepath = os.path.dirname(os.path.abspath(__file__))
         self.layouts = os.path.join(self.basepath, "layouts")
+        self.cache = os.path.join(self.basepath, "cache")
         #self.lang = kwargs["params"]["language"].lower()
         #self.colour = self.get_colour(kwargs["params"]["colour"])
 
@@ -75,79 +83,72 @@ class WordClockScreen(Screen, BlackHole):
             self.setup()
             self.running = True
 
-        # Set the interval timer
-        self.timer = Clock.schedule_interval(self.update, 1)
+        # Show the time now and then wait for the next change
+        self.update()
+        self.timer = subscribe(self.update, FIVE_MINUTES, widget=self)
 
     def on_leave(self):
-        Clock.unschedule(self.timer)
+        if self.timer:
+            self.timer.cancel()
 
-    def update(self, *args):
+    def update(self, nw=None):
         # What time is it?
-        nw = DT.now()
-        hour = nw.hour
-        minute = round_down(nw.minute, 5)
-
-        # Is our language one where we need to increment the hour after 30 mins
-        # e.g. 9:40 is "Twenty to ten"
-        if self.config.HOUR_INCREMENT and (minute > self.config.HOUR_INCREMENT_TIME):
-            hour += 1
-
-        # Convert rounded time to string
-        tm = "{:02d}:{:02d}".format(hour, minute)
+        nw = nw or DT.now()
+        state = state_index(nw.hour, nw.minute)
 
         # If it's the same as the last update then we don't need to do anything
-        if tm != self.oldtime:
-
-            # Change to 12 hour clock
-            if hour == 24:
-                hour = 0
-            elif hour > 12:
-                hour -= 12
-
-            if hour == 0:
-                hour = 12
-
-            # Morning or afternoon?
-            ampm = "am" if nw.hour < 12 else "pm"
+        if state != self.state:
 
-            # Get necessary key names
-            h = "h{:02d}".format(hour)
-            m = "m{:02d}".format(minute)
+            # The letters that need to change are either in the table (if
+            # this is the next state) or worked out from the current frame.
+            frame = self.frames[state]
+            if self.state is not None and state == (self.state + 1) % STATES:
+                delta = self.deltas[state]
+            else:
+                delta = frame ^ self.frame
 
-            # Load the map
-            d = self.config.MAP
+            # Only toggle the letters which have changed
+            for x in bits(delta):
+                self.letters[x].toggle(bool(frame >> x & 1))
 
-            # Build list of the letters we need
-            tm = d.get("all", []) + d[h] + d[m] + d.get(ampm, [])
-
-            # Build a map of all letters saying whether they're on or off
-            st = [x in tm for x in range(len(self.config.LAYOUT))]
-
-            # Create a list of tuples of (letter, state)
-            updt = zip(self.letters, st)
-
-            # Loop over the list and toggle the letter
-            for z in updt:
-                z[0].toggle(z[1])
+            self.state = state
+            self.frame = frame
 
     def loadLayout(self):
-        """Simple method to import the layout. If the module can't be found
-           then it defaults to loading the English layout.
+        """Simple method to import the layout and its frame table. If the
+           module can't be found or isn't valid then it defaults to loading
+           the English layout.
         """
         module = os.path.join(self.layouts, "{}.py".format(self.lang))
 
         try:
-            config = imp.load_source("layouts.{}".format(self.lang), module)
+            config = load_module("layouts.{}".format(self.lang), module)
+            frames = load_layout_frames(config, module, self.cache)
+
+        except LayoutError as e:
+            Logger.error("Wordclock: {} layout is invalid: "
+                         "{}".format(self.lang, e))
+
+            # Nothing to fall back to
+            if self.lang == "english":
+                raise
+
+            self.lang = "english"
+            return self.loadLayout()
 
-        except ImportError:
+        except (IOError, ImportError):
             self.lang = "english"
-            config = imp.load_source("layouts.{}".format(self.lang), module)
+            module = os.path.join(self.layouts, "{}.py".format(self.lang))
+            config = load_module("layouts.{}".format(self.lang), module)
+            frames = load_layout_frames(config, module, self.cache)
 
-        return config
+        return config, frames
 
     def setup(self):
-        # Get the layout
-        self.config = self.loadLayout()
+        # Get the layout and the letters which are lit at each time of day
+        self.config, (self.frames, self.deltas) = self.loadLayout()
+        self.state = None
+        self.frame = 0
 
         # We'll want to keep a list of all the letter objects
         self.letters = []
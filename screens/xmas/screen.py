@@ -1,11 +1,12 @@
 from datetime import datetime
 
-from kivy.clock import Clock
 from kivy.properties import StringProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.screenmanager import Screen
 
+from core.ticker import subscribe, MINUTE
+
 class BlackHole(object):
     def __init__(self, **kw):
         super(BlackHole, self).__init__()
@@ -34,10 +35,13 @@ class XmasScreen(Screen, BlackHole):
         return datetime(yr, 12, 25, 0, 0)
 
     def on_enter(self):
-        self.timer = Clock.schedule_interval(self.update, 1)
+        # The countdown only shows minutes so there's no need to update it
+        # any more often than that.
+        self.timer = subscribe(self.update, MINUTE, widget=self)
 
     def on_leave(self):
-        Clock.unschedule(self.timer)
+        if self.timer:
+            self.timer.cancel()
 
     def update(self, *args):
         nw = datetime.now()
@@ -0,0 +1,42 @@
+"""Tests for the persistent response cache."""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import ResponseCache
+
+
+def test_set_and_get(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.set("http://example.com/a", {"temp": 12})
+
+    value, age = cache.get("http://example.com/a")
+
+    assert value == {"temp": 12}
+    assert 0 <= age < 5
+    assert cache.get("http://example.com/b") is None
+
+
+def test_threads_storing_the_same_key(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    failures = []
+    monkeypatch.setattr("core.cache.Logger.warning", failures.append)
+
+    def store(n):
+        for i in range(50):
+            cache.set("key", {"thread": n, "i": i})
+
+    threads = [threading.Thread(target=store, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every write succeeded, the entry is whole and nothing was left behind
+    assert failures == []
+    value, _ = cache.get("key")
+    assert value["i"] == 49
+    assert [name for name in os.listdir(str(tmp_path))
+            if name.endswith(".tmp")] == []
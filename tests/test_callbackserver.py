@@ -0,0 +1,97 @@
+"""Tests for the squeezeplayer's LMS callback server."""
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "screens", "squeezeplayer"))
+
+from pylms import callback_server
+from pylms.callback_server import CallbackServer
+
+# Longest we'll wait for the listener (seconds)
+TIMEOUT = 5
+
+
+class NotificationHandler(socketserver.StreamRequestHandler):
+    """Answers the subscribe command and sends the server's notifications."""
+    def handle(self):
+        self.rfile.readline()
+        self.wfile.write(b"subscribe ok\n")
+        for chunk in self.server.notifications:
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            time.sleep(0.05)
+
+        # Wait for the client to hang up
+        self.rfile.read()
+
+
+@pytest.fixture
+def lms():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0),
+                                             NotificationHandler)
+    server.daemon_threads = True
+    server.notifications = []
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={"poll_interval": 0.05})
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_clock(monkeypatch):
+    # Call the callbacks straight away rather than on the Kivy clock
+    monkeypatch.setattr(callback_server, "Clock", None)
+    monkeypatch.setattr(callback_server, "LINE_LIMIT", 1000)
+
+
+def listen(server, count):
+    """Returns the first count volume notifications the client hears."""
+    events = []
+    client = CallbackServer(hostname="127.0.0.1",
+                            port=server.server_address[1])
+    client.add_callback(client.VOLUME_CHANGE, events.append)
+    client.add_callback(client.PLAYLIST_ALL, events.append)
+    client.start()
+
+    end = time.time() + TIMEOUT
+    while len(events) < count and time.time() < end:
+        time.sleep(0.01)
+
+    client.stop()
+    client.thread.join(TIMEOUT)
+    assert not client.is_alive()
+
+    return events
+
+
+def test_long_lines_are_skipped(lms):
+    lms.notifications = [
+        b"aa:bb playlist addtracks " + b"x" * 5000 + b"\n",
+        b"aa:bb mixer volume 10\n",
+        # A long line which arrives in two parts
+        b"aa:bb playlist addtracks " + b"y" * 2500,
+        b"y" * 2500 + b"\naa:bb mixer volume 20\n"]
+
+    assert listen(lms, 2) == ["aa:bb mixer volume 10",
+                              "aa:bb mixer volume 20"]
+
+
+def test_stop_before_the_thread_has_started():
+    # Nothing is listening on the port so the client would keep retrying
+    client = CallbackServer(hostname="127.0.0.1", port=1)
+    client.start()
+    client.stop()
+
+    client.thread.join(TIMEOUT)
+    assert not client.is_alive()
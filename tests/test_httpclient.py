@@ -0,0 +1,79 @@
+"""Tests for the shared HTTP client's retries."""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.httpclient import HTTPClient
+
+
+class UnavailableHandler(BaseHTTPRequestHandler):
+    """Answers every request with a 503 and counts them."""
+    def reply(self):
+        self.server.requests.append(self.command)
+        self.send_response(503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD = do_OPTIONS = do_POST = do_PUT = reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UnavailableHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={"poll_interval": 0.05})
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    client = HTTPClient(retries=2, backoff=0)
+    yield client
+    client.close()
+
+
+def url(server):
+    return "http://127.0.0.1:{}/".format(server.server_address[1])
+
+
+@pytest.mark.parametrize("method", ["GET", "HEAD", "OPTIONS"])
+def test_idempotent_requests_are_retried(server, client, method):
+    r = client.request(method, url(server))
+
+    assert r.status_code == 503
+    assert server.requests == [method] * 3
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT"])
+def test_other_requests_are_not_retried(server, client, method):
+    r = client.request(method, url(server), data=b"x")
+
+    assert r.status_code == 503
+    assert server.requests == [method]
+
+
+def test_retries_can_be_asked_for(server, client):
+    client.post(url(server), retries=1, data=b"x")
+
+    assert server.requests == ["POST"] * 2
+
+
+def test_retries_can_be_turned_off(server, client):
+    client.get(url(server), retries=0)
+
+    assert server.requests == ["GET"]
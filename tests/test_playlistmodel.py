@@ -0,0 +1,146 @@
+"""Tests for the squeezeplayer's playlist model."""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, "screens", "squeezeplayer"))
+
+from kivy.clock import Clock
+
+from playlistmodel import PlaylistModel
+
+
+class FakeServer(object):
+    """Answers the playlist queries like LMS. Requests made on the main
+       thread are recorded so the tests can check there aren't any.
+    """
+    def __init__(self, player):
+        self.player = player
+
+    def request_batch(self, commands):
+        self.player.called()
+        answers = {"tracks": str(len(self.player.playlist)),
+                   "index": str(self.player.index)}
+        return [answers[command.split()[2]] for command in commands]
+
+
+class FakePlayer(object):
+    def __init__(self, count, index=0):
+        self.ref = "00:11:22:33:44:55"
+        self.playlist = ["track {}".format(n) for n in range(count)]
+        self.index = index
+        self.server = FakeServer(self)
+        self.main_thread_calls = 0
+
+    def called(self):
+        if threading.current_thread() is threading.main_thread():
+            self.main_thread_calls += 1
+
+    def playlist_track_count(self):
+        self.called()
+        return len(self.playlist)
+
+    def playlist_get_info(self, taglist=None, start=0, amount=1):
+        self.called()
+        return [{"position": n, "title": self.playlist[n]}
+                for n in range(start, min(start + amount,
+                                          len(self.playlist)))]
+
+
+def wait_for(condition, timeout=5):
+    """Runs the Clock until condition() is true."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        Clock.tick()
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def player():
+    return FakePlayer(120, index=7)
+
+
+@pytest.fixture
+def model(player):
+    model = PlaylistModel(player, ["a", "l"], page_size=50)
+    model.loads = 0
+
+    def loaded():
+        model.loads += 1
+
+    model.on_load = loaded
+    return model
+
+
+def test_reload_runs_in_the_background(model, player):
+    model.reload()
+
+    # Nothing has changed until the answer arrives
+    assert len(model) == 0
+
+    wait_for(lambda: model.loads == 1)
+
+    assert len(model) == 120
+    assert model.pos == 7
+    assert player.main_thread_calls == 0
+
+
+def test_extend_runs_in_the_background(model, player):
+    model.reload()
+    wait_for(lambda: model.loads == 1)
+
+    updates = []
+    model.on_update = lambda start, stop: updates.append((start, stop))
+    player.playlist += ["new 1", "new 2"]
+
+    model.apply("{} playlist addtracks".format(player.ref))
+    assert len(model) == 120
+
+    wait_for(lambda: updates)
+
+    assert len(model) == 122
+    assert updates == [(120, 122)]
+    assert player.main_thread_calls == 0
+
+
+def test_change_while_loading_reloads(model, player):
+    model.reload()
+
+    # The answer to the first reload may not include this track
+    player.playlist.append("new")
+    model.apply("{} playlist addtracks".format(player.ref))
+
+    wait_for(lambda: model.loads == 1)
+    Clock.tick()
+
+    assert len(model) == 121
+    assert model.loads == 1
+
+
+def test_pages_are_fetched_when_needed(model, player):
+    model.reload()
+    wait_for(lambda: model.loads == 1)
+
+    model.request(60)
+    wait_for(lambda: model.track(60) is not None)
+
+    assert model.track(60)["title"] == "track 60"
+    assert model.track(10) is None
+    assert player.main_thread_calls == 0
+
+
+def test_set_player_forgets_the_old_tracks(model):
+    model.reload()
+    wait_for(lambda: model.loads == 1)
+
+    model.set_player(FakePlayer(3))
+    assert len(model) == 0
+
+    wait_for(lambda: model.loads == 2)
+    assert len(model) == 3
@@ -0,0 +1,63 @@
+"""Tests for the shared tick service."""
+import gc
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.ticker import TickService, MINUTE
+
+
+class Overlay(object):
+    """Subscribes to the service like the clock overlay does."""
+    def __init__(self, service):
+        self.calls = 0
+        self.tick = service.subscribe(self.update, MINUTE)
+
+    def update(self, when):
+        self.calls += 1
+
+
+def test_subscriber_is_not_kept_alive():
+    service = TickService()
+    Overlay(service)
+    gc.collect()
+
+    # The deleted overlay's subscription is dropped and nobody needs waking
+    service.schedule()
+    assert service.ticks == []
+    assert service.event is None
+
+
+def test_cancelled_subscriber_is_dropped():
+    service = TickService()
+    overlay = Overlay(service)
+    overlay.tick.cancel()
+
+    assert service.ticks == []
+    assert service.event is None
+
+
+def test_live_subscriber_is_called():
+    service = TickService()
+    overlay = Overlay(service)
+    gc.collect()
+
+    service.tick()
+
+    assert overlay.calls == 1
+    assert service.ticks == [overlay.tick]
+    overlay.tick.cancel()
+
+
+def test_function_is_kept():
+    service = TickService()
+    calls = []
+    tick = service.subscribe(lambda when: calls.append(when))
+    gc.collect()
+
+    service.tick()
+
+    assert len(calls) == 1
+    tick.cancel()
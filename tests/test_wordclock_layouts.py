@@ -0,0 +1,230 @@
+"""Tests for the word clock's layout compiler and frame table.
+
+   Run from the top of the repository with:
+
+       python -m pytest -q tests
+"""
+import os
+import shutil
+import sys
+import types
+
+import pytest
+
+WORDCLOCK = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "screens", "wordclock")
+sys.path.append(WORDCLOCK)
+
+import layoutcompiler
+from frames import STATES, bits, state_index
+from layoutcompiler import (LayoutError, compile_layout, import_layout,
+                            load_layout_frames, validate)
+
+LAYOUTS = sorted(os.path.join(layoutcompiler.LAYOUTS, name)
+                 for name in os.listdir(layoutcompiler.LAYOUTS)
+                 if name.endswith(".py") and name != "__init__.py")
+
+
+def layout_id(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def old_update(config, hour, minute):
+    """The letters the screen used to light at hour:minute, worked out the
+       way its update method did every time it was called.
+    """
+    minute = minute - (minute % 5)
+    ampm = "am" if hour < 12 else "pm"
+
+    if config.HOUR_INCREMENT and (minute > config.HOUR_INCREMENT_TIME):
+        hour += 1
+
+    if hour == 24:
+        hour = 0
+    elif hour > 12:
+        hour -= 12
+
+    if hour == 0:
+        hour = 12
+
+    d = config.MAP
+    tm = (d.get("all", []) + d["h{:02d}".format(hour)] +
+          d["m{:02d}".format(minute)] + d.get(ampm, []))
+
+    return [x for x in range(len(config.LAYOUT)) if x in tm]
+
+
+def copy_layout(config, **changes):
+    """Returns a copy of the layout (with its own MAP) with the given
+       variables changed.
+    """
+    copy = types.SimpleNamespace(**{name: getattr(config, name)
+                                    for name in dir(config)
+                                    if name.isupper()})
+    copy.MAP = {key: list(value) for key, value in config.MAP.items()}
+    for name, value in changes.items():
+        setattr(copy, name, value)
+    return copy
+
+
+@pytest.fixture
+def english():
+    return import_layout(os.path.join(layoutcompiler.LAYOUTS, "english.py"))
+
+
+@pytest.mark.parametrize("path", LAYOUTS, ids=layout_id)
+def test_bundled_layouts_are_valid(path):
+    assert validate(import_layout(path)) == []
+
+
+@pytest.mark.parametrize("path", LAYOUTS, ids=layout_id)
+def test_frames_match_old_update(path):
+    config = import_layout(path)
+    frames, deltas = compile_layout(config)
+
+    assert len(frames) == len(deltas) == STATES
+
+    # Every minute of the day, not just the five minute boundaries
+    for hour in range(24):
+        for minute in range(60):
+            frame = frames[state_index(hour, minute)]
+            assert list(bits(frame)) == old_update(config, hour, minute), \
+                "{:02d}:{:02d}".format(hour, minute)
+
+    for n in range(STATES):
+        assert frames[n - 1] ^ deltas[n] == frames[n]
+
+
+def test_missing_minute_is_rejected(english):
+    config = copy_layout(english)
+    del config.MAP["m35"]
+
+    with pytest.raises(LayoutError) as error:
+        compile_layout(config)
+
+    assert 'MAP has no "m35"' in error.value.errors
+
+
+def test_letter_past_the_end_is_rejected(english):
+    config = copy_layout(english)
+    config.MAP["h03"].append(len(english.LAYOUT))
+
+    errors = validate(config)
+
+    assert len(errors) == 1
+    assert errors[0].startswith('MAP["h03"] has {}'.format(
+        len(english.LAYOUT)))
+
+
+def test_unknown_key_is_rejected(english):
+    config = copy_layout(english)
+    config.MAP["m60"] = [0]
+
+    assert validate(config) == ['MAP has unknown key "m60"']
+
+
+def test_layout_must_fill_the_grid(english):
+    config = copy_layout(english, LAYOUT=english.LAYOUT + "X")
+
+    assert any("multiple of COLS" in e for e in validate(config))
+
+
+def test_missing_variable_is_rejected(english):
+    config = copy_layout(english)
+    del config.HOUR_INCREMENT
+
+    assert validate(config) == ["missing HOUR_INCREMENT"]
+
+
+def test_hour_increment_needs_a_time(english):
+    config = copy_layout(english, HOUR_INCREMENT_TIME=60)
+
+    assert len(validate(config)) == 1
+
+
+def test_unlit_time_is_rejected(english):
+    config = copy_layout(english)
+    for key in ("all", "am", "pm", "m00", "h12"):
+        config.MAP[key] = []
+
+    errors = validate(config)
+
+    assert "nothing is lit at 00:00" in errors
+    assert "nothing is lit at 12:00" in errors
+
+
+@pytest.fixture
+def layout_file(tmp_path):
+    """A copy of the english layout which the tests can change."""
+    path = tmp_path / "english.py"
+    shutil.copy(os.path.join(layoutcompiler.LAYOUTS, "english.py"), path)
+    return str(path)
+
+
+def test_frames_are_cached(layout_file, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    config = import_layout(layout_file)
+
+    expected = load_layout_frames(config, layout_file, cache)
+    assert os.path.exists(os.path.join(cache, "english.frames"))
+
+    # The second time the table comes from the cache
+    def fail(config):
+        raise AssertionError("the layout was compiled again")
+
+    monkeypatch.setattr(layoutcompiler, "compile_layout", fail)
+
+    assert load_layout_frames(config, layout_file, cache) == expected
+
+
+def test_cache_is_invalidated_when_layout_changes(layout_file, tmp_path):
+    cache = str(tmp_path / "cache")
+    config = import_layout(layout_file)
+    old_frames, _ = load_layout_frames(config, layout_file, cache)
+
+    table = os.path.join(cache, "english.frames")
+    with open(table, "rb") as f:
+        saved = f.read()
+
+    # Edit the layout so that "IT IS" isn't lit any more. The file's
+    # modification time changes too.
+    with open(layout_file, "a") as f:
+        f.write('\nMAP["all"] = []\n')
+    mtime = os.stat(layout_file).st_mtime_ns + 1000000000
+    os.utime(layout_file, ns=(mtime, mtime))
+
+    config = import_layout(layout_file)
+    frames, deltas = load_layout_frames(config, layout_file, cache)
+
+    assert frames != old_frames
+    assert frames == compile_layout(config)[0]
+    assert not any(frame & 1 for frame in frames)
+
+    # and the new table was saved
+    with open(table, "rb") as f:
+        assert f.read() != saved
+
+
+def test_broken_layout_is_not_cached(layout_file, tmp_path):
+    cache = str(tmp_path / "cache")
+
+    with open(layout_file, "a") as f:
+        f.write('\ndel MAP["m35"]\n')
+
+    with pytest.raises(LayoutError):
+        load_layout_frames(import_layout(layout_file), layout_file, cache)
+
+    assert not os.path.exists(os.path.join(cache, "english.frames"))
+
+
+def test_stale_cache_file_is_ignored(layout_file, tmp_path):
+    cache = str(tmp_path / "cache")
+    config = import_layout(layout_file)
+    expected = load_layout_frames(config, layout_file, cache)
+
+    # A truncated table (e.g. from a crash while writing it)
+    path = os.path.join(cache, "english.frames")
+    with open(path, "r+b") as f:
+        f.truncate(100)
+
+    assert load_layout_frames(config, layout_file, cache) == expected
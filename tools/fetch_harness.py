@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""Checks that slow web requests don't stall the Kivy main loop.
+
+   A local stub HTTP server answers every request after DELAY seconds. We
+   then run the Kivy Clock (without a window) at about 60 frames a second
+   while making requests to the server, first the old way (calling
+   http_get from a Clock callback on the main thread) and then through the
+   shared fetch service (core.fetch).
+
+   The frame times are reported for both. With the fetch service the frame
+   times should stay flat however slow the server is. The script exits with
+   an error if any frame took longer than --limit.
+
+       python tools/fetch_harness.py [--delay 2] [--requests 8] [--limit 0.05]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.clock import Clock
+
+from core.fetch import fetch, get_fetch_service
+from core.httpclient import http_get
+
+# Time between frames (seconds)
+FRAME = 1 / 60.0
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers every GET after the server's delay."""
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        body = json.dumps({"path": self.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(delay):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.delay = delay
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stub-http")
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def run_frames(duration):
+    """Runs the Clock for duration seconds. Returns the frame times."""
+    frames = []
+    end = time.perf_counter() + duration
+    last = time.perf_counter()
+
+    while time.perf_counter() < end:
+        Clock.tick()
+        now = time.perf_counter()
+        frames.append(now - last)
+        last = now
+
+        # Sleep for the rest of the frame
+        time.sleep(max(0, FRAME - (time.perf_counter() - now)))
+
+    return frames
+
+
+def blocking(url, count):
+    """Requests made on the main thread (as the screens used to)."""
+    results = []
+    for n in range(count):
+        Clock.schedule_once(
+            lambda dt, n=n: results.append(http_get("{}/{}".format(url, n))),
+            n * 0.1)
+    return results
+
+
+def background(url, count):
+    """Requests made through the fetch service."""
+    results = []
+    for n in range(count):
+        fetch(http_get, "{}/{}".format(url, n), on_result=results.append)
+    return results
+
+
+def report(name, frames, results, count):
+    frames = sorted(frames)
+    p99 = frames[int(len(frames) * 0.99) - 1]
+    print("{:<11} frames: {:5d}  median: {:6.1f} ms  p99: {:7.1f} ms  "
+          "max: {:7.1f} ms  responses: {}/{}".format(
+              name, len(frames), frames[len(frames) // 2] * 1000,
+              p99 * 1000, frames[-1] * 1000, len(results), count))
+    return frames[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--delay", type=float, default=2,
+                        help="seconds the stub server takes to answer")
+    parser.add_argument("--requests", type=int, default=8,
+                        help="number of requests in each run")
+    parser.add_argument("--limit", type=float, default=0.05,
+                        help="longest acceptable frame with the fetch "
+                             "service (seconds)")
+    args = parser.parse_args()
+
+    server = start_server(args.delay)
+    url = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    # Give each run long enough for all the responses to arrive
+    duration = args.delay * (args.requests + 1) + 1
+
+    results = blocking(url, args.requests)
+    report("main thread", run_frames(duration), results, args.requests)
+
+    results = background(url, args.requests)
+    worst = report("fetch", run_frames(duration), results, args.requests)
+
+    get_fetch_service().shutdown()
+    server.shutdown()
+
+    if worst > args.limit:
+        print("FAILED: a frame took {:.1f} ms with the fetch service".format(
+            worst * 1000))
+        return 1
+
+    print("OK: frame times stayed under {:.0f} ms".format(args.limit * 1000))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""Times the football page parsers against saved sample pages.
+
+   The football screens used to load every BBC page into a full
+   BeautifulSoup tree (with whichever parser bs4 picked) and search it
+   again for each team. footballresources.parsers now picks out just the
+   fragments we need, using lxml if it's installed.
+
+   For each saved page this times the old way of reading it (copied below)
+   and the new parser with each backend that's installed, and checks that
+   they find the same things. Pages are matched on their file name:
+   livescores*.html is a live scores page and match*.html a match page.
+
+   Note that the new bs4 backend is only used when lxml isn't installed, in
+   which case the old code was also using html.parser.
+
+       python tools/football_parsers.py [--number 20] [PAGE ...]
+
+   With no pages the samples in tools/samples/football are used. To time a
+   real page, save it first, e.g.
+
+       curl -o livescores-today.html "http://www.bbc.co.uk/sport/shared/..."
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import timeit
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "screens", "football"))
+
+from footballresources import parsers
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+SAMPLES = os.path.join(ROOT, "tools", "samples", "football")
+
+# The old code is copied as it was, so bs4 complains about the guessed
+# parser and findAll
+warnings.simplefilter("ignore")
+
+
+def old_live_scores(page):
+    """The live scores page as footballscores used to read it."""
+    raw = BeautifulSoup(page)
+
+    data = raw.find("div", {"id": "matches-wrapper"})
+    matches = []
+
+    if data:
+        for match in data.findAll("tr", {"id": re.compile(r'^match-row')}):
+            mclass = {"class": "elapsed-time"}
+            matches.append(
+                (match.find("span", {"class": "team-home"}).text,
+                 match.find("span", {"class": "team-away"}).text,
+                 match.find("span", {"class": "score"}).text.strip(),
+                 match.find("span", mclass).text.strip()))
+
+    return matches
+
+
+def new_live_scores(page):
+    parsed = parsers.parseLiveScores(page)
+    return [(m["hometeam"], m["awayteam"], m["score"], m["elapsed"])
+            for m in parsed["matches"]]
+
+
+def old_incidents(page):
+    """The match page as footballscores used to read it."""
+    bs = BeautifulSoup(page)
+    iclass = {"class": "incidents-table"}
+    incidents = []
+
+    itclass = {"class": re.compile(r"\bincident-type \b")}
+    for incident in bs.find("table", iclass).findAll("tr"):
+        i = incident.find("td", itclass)
+        if i:
+            incidents.append(
+                (incident.find("td", {"class": "incident-player-home"})
+                 .text.strip(),
+                 incident.find("td", {"class": "incident-player-away"})
+                 .text.strip(),
+                 incident.find("td", {"class": "incident-time"})
+                 .text.strip()))
+
+    return incidents
+
+
+def new_incidents(page):
+    return [(i["home"], i["away"], i["time"])
+            for i in parsers.parseIncidents(page)]
+
+
+# File name prefix -> (old reader, new reader)
+PAGES = {"livescores": (old_live_scores, new_live_scores),
+         "match": (old_incidents, new_incidents)}
+
+
+def backends():
+    """Returns the new parser's backends that are installed."""
+    found = []
+    if parsers.lxml is not None:
+        found.append("lxml")
+    if parsers.BeautifulSoup is not None:
+        found.append("bs4")
+    return found
+
+
+def best(func, page, number):
+    """Returns the quickest time (seconds) of a call to func(page)."""
+    timer = timeit.Timer(lambda: func(page))
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("pages", nargs="*",
+                        help="saved pages (default: the samples)")
+    parser.add_argument("--number", type=int, default=20,
+                        help="calls in each timing run")
+    args = parser.parse_args()
+
+    if BeautifulSoup is None:
+        print("The old parser needs BeautifulSoup (bs4)")
+        return 1
+
+    pages = args.pages or sorted(glob.glob(os.path.join(SAMPLES, "*.html")))
+    failed = False
+    default = parsers.BACKEND
+
+    for path in pages:
+        name = os.path.basename(path)
+        kind = [k for k in PAGES if name.startswith(k)]
+        if not kind:
+            print("{}: skipped (unknown page)".format(name))
+            continue
+
+        old, new = PAGES[kind[0]]
+        with open(path, "rb") as f:
+            page = f.read()
+
+        expected = old(page)
+        before = best(old, page, args.number)
+        print("{:<24} {:>6.1f} KB  old: {:7.2f} ms".format(
+            name, len(page) / 1024.0, before * 1000))
+
+        for backend in backends():
+            parsers.BACKEND = backend
+            try:
+                if new(page) != expected:
+                    print("    {}: results differ from the old "
+                          "parser".format(backend))
+                    failed = True
+
+                after = best(new, page, args.number)
+            finally:
+                parsers.BACKEND = default
+
+            print("    new ({:<4}): {:7.2f} ms  ({:.1f}x)".format(
+                backend, after * 1000, before / after))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""Compares the CPU cost of the ISS tracker before and after the ground
+   track.
+
+   The ISS screen used to ask ephem for the ISS's position every second and
+   for 20 more positions every 30 seconds to draw its path, all on the main
+   thread. It now works out the track for the next few orbits in one go (in
+   the background) and the marker and path are read from that.
+
+   This simulates --hours of the screen being shown (without Kivy) and
+   reports the CPU time each way. For the ground track the time spent on
+   the main thread (position and path) and in the background (calculating
+   the track) are shown separately, for ephem and (if installed) sgp4.
+
+       python tools/iss_track.py [--hours 1]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "screens", "isstracker"))
+
+import ephem
+
+import orbit
+from orbit import GroundTrack
+
+# Same as the screen (seconds)
+PATH_DURATION = 100 * 60
+PATH_INTERVAL = 30
+
+
+def load_tle():
+    """Returns the TLE data that comes with the screen."""
+    with open(os.path.join(ROOT, "screens", "isstracker",
+                           "iss_tle.json")) as f:
+        return [str(x) for x in json.load(f)["tle"]]
+
+
+def epoch(tle):
+    """Returns the time (unix timestamp) of the TLE data. ephem won't
+       calculate positions more than a few weeks away from it.
+    """
+    when = ephem.readtle(*tle)._epoch.datetime()
+    return when.replace(tzinfo=timezone.utc).timestamp()
+
+
+def utc(timestamp):
+    """Returns the timestamp as a naive UTC datetime (as ephem wants)."""
+    when = datetime.fromtimestamp(timestamp, timezone.utc)
+    return when.replace(tzinfo=None)
+
+
+def old_tracker(tle, start, seconds):
+    """The screen's old calculations. Returns the CPU time (seconds)."""
+    iss = ephem.readtle(*tle)
+    cpu = time.process_time()
+
+    for s in range(seconds):
+        now = utc(start + s)
+
+        # The marker
+        iss.compute(now)
+        float(iss.sublat / ephem.degree), float(iss.sublong / ephem.degree)
+
+        # The path (a marker every 5 minutes)
+        if s % PATH_INTERVAL == 0:
+            for i in range(20):
+                iss.compute(now + timedelta(0, i * 300))
+                (float(iss.sublat / ephem.degree),
+                 float(iss.sublong / ephem.degree))
+
+    return time.process_time() - cpu
+
+
+class Worker(object):
+    """Stands in for core.fetch: jobs are kept and run later so their time
+       can be counted separately.
+    """
+    def __init__(self):
+        self.jobs = []
+        self.cpu = 0
+        self.count = 0
+
+    def run(self, func, *args, on_result=None, on_error=None):
+        self.jobs.append((func, args, on_result))
+
+    def work(self):
+        while self.jobs:
+            func, args, on_result = self.jobs.pop(0)
+            cpu = time.process_time()
+            result = func(*args)
+            self.cpu += time.process_time() - cpu
+            self.count += 1
+            on_result(result)
+
+
+def new_tracker(tle, start, seconds):
+    """The ground track. Returns the CPU time (seconds) on the main thread,
+       in the background and the number of times the track was calculated.
+    """
+    worker = Worker()
+    track = GroundTrack(tle, run=worker.run)
+    main = 0
+
+    for s in range(seconds):
+        now = start + s
+
+        cpu = time.process_time()
+        track.position(now)
+        if s % PATH_INTERVAL == 0:
+            track.path(now, PATH_DURATION)
+        main += time.process_time() - cpu
+
+        # The result arrives before the next tick
+        worker.work()
+
+    return main, worker.cpu, worker.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--hours", type=float, default=1,
+                        help="length of time to simulate")
+    args = parser.parse_args()
+
+    tle = load_tle()
+    start = epoch(tle)
+    seconds = int(args.hours * 3600)
+
+    print("CPU time for {:g} hour(s) of the ISS screen:".format(args.hours))
+    print("  old (ephem every second):  {:8.1f} ms".format(
+        old_tracker(tle, start, seconds) * 1000))
+
+    backends = [("ephem", None)]
+    if orbit.np is not None:
+        backends.insert(0, ("sgp4", orbit.np))
+
+    numpy = orbit.np
+    for name, np in backends:
+        orbit.np = np
+        try:
+            used, background, count = new_tracker(tle, start, seconds)
+        finally:
+            orbit.np = numpy
+
+        print("  ground track ({:<5}):      {:8.1f} ms on the main thread, "
+              "{:.1f} ms in the background ({} track(s))".format(
+                  name, used * 1000, background * 1000, count))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""Counts how much work the clock overlay does to keep the time up to date.
+
+   The overlay used to wake up every second, build its markup template and
+   format the time, and hand the result to its label. It now only rebuilds
+   the template when the settings change, wakes up once a minute (on the
+   minute) and only touches the label when the text has changed.
+
+   This runs the old overlay (copied below) and the current one side by
+   side for --minutes, each feeding a label, and reports per hour:
+
+     wakeups:   calls to the overlay's update
+     templates: markup templates built
+     formats:   times formatted with strftime
+     renders:   label textures rendered
+     cpu:       time spent in the update and rendering
+
+   Labels need an OpenGL context so this has to be run where Kivy can open
+   a window (e.g. on the Pi itself).
+
+       python tools/overlay_redraws.py [--minutes 3] [--format 12h]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, "overlays", "clock"))
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.properties import StringProperty
+from kivy.uix.label import Label
+from kivy.uix.relativelayout import RelativeLayout
+
+from overlay import ClockOverlay
+
+# Time between frames (seconds)
+FRAME = 1 / 60.0
+
+
+class Counts(object):
+    def __init__(self):
+        self.wakeups = 0
+        self.templates = 0
+        self.formats = 0
+        self.renders = 0
+        self.cpu = 0
+
+
+class OldClockOverlay(RelativeLayout):
+    """The overlay as it was, with counters added."""
+    clock_overlay_text = StringProperty()
+
+    def __init__(self, params, **kwargs):
+        super(OldClockOverlay, self).__init__(**kwargs)
+        self.counts = Counts()
+
+        self.clock_format = params['clock_format']
+        self.icon_size_percent = params['icon_size_percent']
+
+        self.icon_size = [size_val * self.icon_size_percent / 100 for size_val in Window.size]
+        self.clock_overlay_text = self._get_current_date()
+
+        self.clock_refresh_rate = 1  # seconds
+        self.clk = Clock.schedule_interval(self.update_time, int(self.clock_refresh_rate))
+
+    def _get_current_date(self):
+        self.counts.templates += 1
+        self.counts.formats += 1
+
+        if '24h' in self.clock_format:
+            date_str = '[color=FFFFFF][b][size={}]%H:%M[/size]\n[size={}]%a, %d %B[/size][/color][/b]'.format(
+                int(self.icon_size[0]), int(self.icon_size[1]))
+        else:
+            date_str = '[color=FFFFFF][b][size={}]%I:%M[/size][size={}] %p[/size]\n[size=25]%a, %d %B[/size][/b][/color]'.format(
+                int(self.icon_size[0]), int(self.icon_size[1]))
+        return time.strftime(date_str)
+
+    def update_time(self, dt):
+        self.counts.wakeups += 1
+        start = time.process_time()
+        self.clock_overlay_text = self._get_current_date()
+        self.counts.cpu += time.process_time() - start
+
+    def unload(self):
+        self.clk.cancel()
+
+
+class NewClockOverlay(ClockOverlay):
+    """The current overlay with counters added."""
+    def __init__(self, params, **kwargs):
+        self.counts = Counts()
+        super(NewClockOverlay, self).__init__(params, **kwargs)
+
+    def build_template(self, *args):
+        self.counts.templates += 1
+        super(NewClockOverlay, self).build_template(*args)
+
+    def _get_current_date(self, when=None):
+        self.counts.formats += 1
+        return super(NewClockOverlay, self)._get_current_date(when)
+
+    def update_time(self, when=None):
+        self.counts.wakeups += 1
+        start = time.process_time()
+        super(NewClockOverlay, self).update_time(when)
+        self.counts.cpu += time.process_time() - start
+
+
+class CountingLabel(Label):
+    """The overlay's label, counting each time its texture is rendered."""
+    def __init__(self, counts, **kwargs):
+        self.counts = counts
+        super(CountingLabel, self).__init__(**kwargs)
+
+    def texture_update(self, *largs):
+        start = time.process_time()
+        super(CountingLabel, self).texture_update(*largs)
+        self.counts.cpu += time.process_time() - start
+        self.counts.renders += 1
+
+
+def show(overlay):
+    """Gives the overlay a label showing its text (as its kv rule does)."""
+    label = CountingLabel(overlay.counts, markup=True,
+                          text=overlay.clock_overlay_text)
+    overlay.bind(clock_overlay_text=label.setter("text"))
+    overlay.add_widget(label)
+    return label
+
+
+def run_frames(duration):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        Clock.tick()
+        time.sleep(max(0, FRAME - (time.perf_counter() - start)))
+
+
+def report(name, counts, minutes):
+    scale = 60.0 / minutes
+    print("{:<8} wakeups: {:6.0f}  templates: {:6.0f}  formats: {:6.0f}  "
+          "renders: {:4.0f}  cpu: {:7.1f} ms".format(
+              name, counts.wakeups * scale, counts.templates * scale,
+              counts.formats * scale, counts.renders * scale,
+              counts.cpu * scale * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--minutes", type=float, default=3,
+                        help="how long to run for (the counts are scaled "
+                             "to an hour)")
+    parser.add_argument("--format", default="12h", choices=["12h", "24h"],
+                        help="clock format")
+    args = parser.parse_args()
+
+    params = {"clock_format": args.format, "icon_size_percent": 5}
+    overlays = [("old", OldClockOverlay(params)),
+                ("current", NewClockOverlay(params))]
+
+    for _, overlay in overlays:
+        show(overlay)
+
+    # Don't count setting up
+    Clock.tick()
+    for _, overlay in overlays:
+        overlay.counts = Counts()
+        for child in overlay.children:
+            child.counts = overlay.counts
+
+    run_frames(args.minutes * 60)
+
+    print("Per hour, from {:g} minutes:".format(args.minutes))
+    for name, overlay in overlays:
+        overlay.unload()
+        report(name, overlay.counts, args.minutes)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
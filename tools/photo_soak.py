@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""Soak test for the photo album's PhotoCache and TexturePool.
+
+   A folder of sample photos (plain PNG files of a few different sizes) is
+   made in a temporary folder and the PhotoCache is run through many
+   transitions, showing and releasing each photo the same way the PhotoView
+   does. The Kivy Clock is ticked between transitions so the background
+   decoding is delivered as it would be on the screen.
+
+   Every --every transitions we report the number of textures the pool has
+   created, the process's resident memory and the frame times since the
+   last report. Once the pool has warmed up it shouldn't need to create any
+   more textures and the memory shouldn't keep growing; the script exits
+   with an error if either happens.
+
+   Textures need an OpenGL context so this has to be run where Kivy can open
+   a window (e.g. on the Pi itself).
+
+       python tools/photo_soak.py [--transitions 10000] [--size 800x480]
+"""
+import argparse
+import os
+import resource
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, "screens", "photoalbum"))
+
+from kivy.clock import Clock
+
+from core.fetch import get_fetch_service
+from photocache import PhotoCache, PREFETCH
+
+# Sizes of the sample photos as a fraction of the screen. Some fill the
+# screen and some don't so the pool has to cope with both.
+SAMPLES = [(1, 1), (1, 0.75), (0.75, 1), (0.5, 0.5), (1, 0.6), (0.6, 1)]
+
+# Longest we'll wait for a photo to be decoded (seconds)
+TIMEOUT = 10
+
+
+def write_png(path, width, height, shade):
+    """Saves a plain RGB PNG (so we don't need PIL to make samples)."""
+    row = b"\0" + bytes([shade, 255 - shade, (shade * 7) % 256]) * width
+    pixels = zlib.compress(row * height)
+
+    def chunk(kind, data):
+        crc = zlib.crc32(kind + data) & 0xffffffff
+        return (struct.pack(">I", len(data)) + kind + data +
+                struct.pack(">I", crc))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2,
+                                           0, 0, 0)))
+        f.write(chunk(b"IDAT", pixels))
+        f.write(chunk(b"IEND", b""))
+
+
+def make_samples(folder, size, count):
+    photos = []
+    for n in range(count):
+        fw, fh = SAMPLES[n % len(SAMPLES)]
+        path = os.path.join(folder, "photo{:03d}.png".format(n))
+        write_png(path, int(size[0] * fw), int(size[1] * fh),
+                  (n * 40) % 256)
+        photos.append(path)
+
+    return photos
+
+
+def rss():
+    """Returns the resident memory of the process (MB)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1048576.0
+    except (IOError, OSError):
+        # Peak rather than current, but better than nothing
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class Viewer(object):
+    """Holds on to the photo being shown and releases the last one, like
+       PhotoView does once a transition has finished.
+    """
+    def __init__(self):
+        self.current = None
+        self.shown = 0
+
+    def show(self, photo):
+        if self.current is not None:
+            self.current.release()
+        self.current = photo
+        self.shown += 1
+
+
+def wait_for(viewer, count, frames):
+    """Ticks the Clock until the viewer has shown count photos. The time of
+       each tick is added to frames.
+    """
+    end = time.perf_counter() + TIMEOUT
+    while viewer.shown < count:
+        if time.perf_counter() > end:
+            raise RuntimeError("photo {} wasn't loaded".format(count))
+
+        start = time.perf_counter()
+        Clock.tick()
+        frames.append(time.perf_counter() - start)
+
+
+def report(transitions, pool, frames):
+    frames = sorted(frames) or [0]
+    print("{:>6} transitions  textures created: {:3d}  rss: {:7.1f} MB  "
+          "median frame: {:5.1f} ms  max frame: {:6.1f} ms".format(
+              transitions, pool.created, rss(),
+              frames[len(frames) // 2] * 1000, frames[-1] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--transitions", type=int, default=10000,
+                        help="number of photos to show")
+    parser.add_argument("--photos", type=int, default=12,
+                        help="number of sample photos to cycle through")
+    parser.add_argument("--size", default="800x480",
+                        help="screen size (WIDTHxHEIGHT)")
+    parser.add_argument("--every", type=int, default=1000,
+                        help="transitions between reports")
+    parser.add_argument("--rss-limit", type=float, default=20,
+                        help="most the memory may grow after warming up "
+                             "(MB)")
+    args = parser.parse_args()
+
+    # The window has to exist before any textures are made. It's not
+    # imported at the top as the thumbnail worker (which is started with
+    # "spawn") imports this file too.
+    from kivy.core.window import Window
+
+    size = [int(x) for x in args.size.split("x")]
+    folder = tempfile.mkdtemp(prefix="photo_soak")
+    photos = make_samples(folder, size, args.photos)
+
+    cache = PhotoCache(os.path.join(folder, "thumbs"), size)
+    viewer = Viewer()
+
+    warm = None
+    frames = []
+
+    try:
+        for n in range(args.transitions):
+            # The same calls the screen makes to show the next photo
+            cache.fetch(photos[n % len(photos)], viewer.show)
+            cache.prefetch([photos[(n + 1 + i) % len(photos)]
+                            for i in range(PREFETCH)])
+            wait_for(viewer, n + 1, frames)
+
+            if (n + 1) % args.every == 0 or n + 1 == args.transitions:
+                report(n + 1, cache.pool, frames)
+                frames = []
+
+                # Everything should be in the pool after the first report
+                if warm is None:
+                    warm = (cache.pool.created, rss())
+
+    finally:
+        if viewer.current is not None:
+            viewer.current.release()
+        cache.shutdown()
+        get_fetch_service().shutdown()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    created, memory = warm
+    if cache.pool.created > created:
+        print("FAILED: {} textures were created after warming up".format(
+            cache.pool.created - created))
+        return 1
+
+    if rss() - memory > args.rss_limit:
+        print("FAILED: memory grew by {:.1f} MB after warming up".format(
+            rss() - memory))
+        return 1
+
+    print("OK: no new textures and memory stayed within {:.0f} MB".format(
+        args.rss_limit))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())